@@ -0,0 +1,7 @@
+"""Benchmarks for python-pt-br.
+
+These are not part of the test suite. Run them as modules from the
+repository root, e.g.:
+
+    python -m benchmarks.scaling
+"""
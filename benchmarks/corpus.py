@@ -0,0 +1,158 @@
+"""Deterministic pt-BR corpora for the benchmarks.
+
+generate() builds synthetic source from a seeded random generator, so the
+same parameters always give the same text. The mix is controlled by:
+- keyword_density: share of code lines written with pt-BR keywords and
+  built-ins (the rest use the Python equivalents)
+- string_ratio: share of lines that are string literals full of pt-BR
+  words, which must not be translated
+- comment_ratio: share of comment lines, also full of pt-BR words
+- fstring_density: share of lines with an f-string whose replacement
+  fields hold pt-BR code
+
+examples() returns the scripts in examples/.
+
+Usage (prints a corpus to stdout):
+    python -m benchmarks.corpus [--size 10KB] [--keyword-density 0.5] ...
+"""
+
+import argparse
+import glob
+import os
+import random
+from typing import Dict
+
+from benchmarks.scaling import parse_size
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code blocks as (pt-BR, Python) pairs of the same block
+BLOCKS = [
+    (
+        "se {a} e nao {b}:\n    imprimir({a})\n",
+        "if {a} and not {b}:\n    print({a})\n",
+    ),
+    (
+        "para {a} em intervalo(comprimento({b})):\n    {c} = soma([{a}, {c}])\n",
+        "for {a} in range(len({b})):\n    {c} = sum([{a}, {c}])\n",
+    ),
+    (
+        "enquanto {a} ou {b}:\n    quebra\n",
+        "while {a} or {b}:\n    break\n",
+    ),
+    (
+        "funcao {a}({b}, {c}):\n    retorna maximo({b}, {c})\n",
+        "def {a}({b}, {c}):\n    return max({b}, {c})\n",
+    ),
+    (
+        "{a} = lista(mapa(str, {b})) se {c} senao nulo\n",
+        "{a} = list(map(str, {b})) if {c} else None\n",
+    ),
+    (
+        "classe {a}:\n    {b} = inteiro({c}) se verdadeiro senao falso\n",
+        "class {a}:\n    {b} = int({c}) if True else False\n",
+    ),
+    (
+        "para {a} em {b}:\n    se nao {a}:\n        continua\n",
+        "for {a} in {b}:\n    if not {a}:\n        continue\n",
+    ),
+]
+
+# Words for strings and comments (translatable words that must stay put)
+WORDS = [
+    "para", "se", "senao", "enquanto", "imprimir", "retorna", "funcao",
+    "e", "ou", "nao", "em", "valor", "total", "lista", "resultado",
+]  # fmt: skip
+
+NAMES = ["valor", "total", "itens", "contador", "resultado", "dados", "x", "y"]
+
+DEFAULTS = {
+    "size": 100 * 1024,
+    "keyword_density": 0.5,
+    "string_ratio": 0.1,
+    "comment_ratio": 0.1,
+    "fstring_density": 0.05,
+    "seed": 0,
+}
+
+
+def generate(
+    size: int = DEFAULTS["size"],
+    keyword_density: float = DEFAULTS["keyword_density"],
+    string_ratio: float = DEFAULTS["string_ratio"],
+    comment_ratio: float = DEFAULTS["comment_ratio"],
+    fstring_density: float = DEFAULTS["fstring_density"],
+    seed: int = DEFAULTS["seed"],
+) -> str:
+    """Generate a synthetic pt-BR source.
+
+    Args:
+        size: Minimum size of the source, in characters
+        keyword_density: Share of code blocks written in pt-BR
+        string_ratio: Share of lines that are string literals
+        comment_ratio: Share of lines that are comments
+        fstring_density: Share of lines with a pt-BR f-string
+        seed: Random seed; the same arguments give the same source
+
+    Returns:
+        The source code
+    """
+    rng = random.Random(seed)
+    pieces = []
+    length = 0
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+
+    def names() -> Dict[str, str]:
+        return dict(zip("abc", rng.sample(NAMES, 3)))
+
+    while length < size:
+        roll = rng.random()
+        if roll < comment_ratio:
+            piece = f"# {sentence()}\n"
+        elif roll < comment_ratio + string_ratio:
+            piece = f'{rng.choice(NAMES)} = "{sentence()}"\n'
+        elif roll < comment_ratio + string_ratio + fstring_density:
+            fields = names()
+            piece = (
+                'imprimir(f"{{{a} se {b} senao {c}}} e {{comprimento({b})}}")\n'
+            ).format(**fields)
+        else:
+            pt_br_block, python_block = rng.choice(BLOCKS)
+            block = pt_br_block if rng.random() < keyword_density else python_block
+            piece = block.format(**names())
+        pieces.append(piece)
+        length += len(piece)
+
+    return "".join(pieces)
+
+
+def examples() -> Dict[str, str]:
+    """Get the example scripts.
+
+    Returns:
+        Dict of file name -> source, in name order
+    """
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "examples", "*.py"))):
+        with open(path, encoding="utf-8") as f:
+            sources[os.path.basename(path)] = f.read()
+    return sources
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default=DEFAULTS["size"], type=parse_size)
+    ratios = ("keyword_density", "string_ratio", "comment_ratio", "fstring_density")
+    for name in ratios:
+        flag = "--" + name.replace("_", "-")
+        parser.add_argument(flag, default=DEFAULTS[name], type=float, dest=name)
+    parser.add_argument("--seed", default=DEFAULTS["seed"], type=int)
+    args = parser.parse_args()
+    print(generate(**vars(args)), end="")
+
+
+if __name__ == "__main__":
+    main()
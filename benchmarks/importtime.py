@@ -0,0 +1,181 @@
+"""Import-time budgets for 'import pt_br'.
+
+Runs each case several times in fresh interpreters with '-X importtime':
+- 'python -c "import pt_br"'
+- a plain-Python script file starting with 'import pt_br' (with pt-BR
+  words in its comments, so the main-script hook checks its .plain marker)
+- a pt-BR script file, whose rest comes from the bytecode cache
+
+For each case it reports the cumulative import time of pt_br (best run),
+which includes the main-script hook, and the slowest modules it pulled in.
+
+Exits with status 1 when a case is over its budget or imports a module it
+should not, so it can run in CI.
+
+Usage:
+    python -m benchmarks.importtime [--budget-ms 10] [--plain-budget-ms 30]
+        [--pt-br-budget-ms 60] [--runs 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules 'import pt_br' must leave for the first translated import
+HEAVY_MODULES = [
+    "re",
+    "typing",
+    "tokenize",
+    "importlib.abc",
+    "importlib.util",
+    "pt_br.translator",
+    "pt_br.mappings",
+    "pt_br.utils",
+]
+
+# Modules a plain script, once marked, must not need
+PLAIN_SCRIPT_HEAVY_MODULES = ["tokenize", "importlib.abc", "pt_br.translator"]
+
+PLAIN_SCRIPT = """import pt_br
+
+# se o total passar de 2, imprimir um aviso
+total = sum([1, 2])
+if total > 2:
+    pass
+"""
+
+# Only built-in calls: 'python script.py' compiles the script before the
+# hook runs, so pt-BR keywords would be a SyntaxError
+PT_BR_SCRIPT = """import pt_br
+
+total = soma([1, 2])
+imprimir(comprimento([total]))
+"""
+
+DEFAULT_BUDGET_MS = 10.0
+DEFAULT_PLAIN_BUDGET_MS = 30.0
+DEFAULT_PT_BR_BUDGET_MS = 60.0
+
+
+def import_times(env, args) -> dict:
+    """Run one case once in a fresh interpreter.
+
+    Args:
+        env: The environment
+        args: Interpreter arguments after '-X importtime'
+
+    Returns:
+        Dict of module name -> (self us, cumulative us) for pt_br and the
+        modules imported while importing it
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        fields = line[len("import time:") :].split("|")
+        if not line.startswith("import time:") or len(fields) != 3:
+            continue
+        try:
+            entries.append((fields[2].rstrip(), int(fields[0]), int(fields[1])))
+        except ValueError:
+            continue  # The header line
+
+    # Modules are listed as they finish: pt_br's subtree is the run of
+    # indented lines right before the 'pt_br' line
+    end = next(i for i, entry in enumerate(entries) if entry[0].strip() == "pt_br")
+    start = end
+    while start > 0 and entries[start - 1][0].startswith("  "):
+        start -= 1
+    return {name.strip(): (own, total) for name, own, total in entries[start : end + 1]}
+
+
+def measure(name, env, args, budget_ms, heavy_modules, runs) -> int:
+    """Measure one case, print its report and return its exit status."""
+    import_times(env, args)  # Warm up the bytecode caches
+    best = min(
+        (import_times(env, args) for _ in range(runs)), key=lambda t: t["pt_br"][1]
+    )
+    total_ms = best["pt_br"][1] / 1000
+
+    print(f"{name}: {total_ms:.2f} ms (budget {budget_ms:.2f} ms, best of {runs})")
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:8]
+    for module, (own, cumulative) in slowest:
+        print(
+            f"  {module:<32}{own / 1000:>8.2f} ms self"
+            f"{cumulative / 1000:>8.2f} ms total"
+        )
+
+    heavy = [module for module in heavy_modules if module in best]
+    status = 0
+    if heavy:
+        print(f"  FAIL: heavy modules imported: {', '.join(heavy)}")
+        status = 1
+    if total_ms > budget_ms:
+        print(f"  FAIL: over budget by {total_ms - budget_ms:.2f} ms")
+        status = 1
+    print()
+    return status
+
+
+def run(
+    budget_ms: float, plain_budget_ms: float, pt_br_budget_ms: float, runs: int
+) -> int:
+    """Run the benchmark, print a report and return the exit status."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Measure with bytecode caches in place, as users normally have them
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scripts = {}
+        for name, source in (("simples", PLAIN_SCRIPT), ("ptbr", PT_BR_SCRIPT)):
+            scripts[name] = os.path.join(directory, f"{name}.py")
+            with open(scripts[name], "w", encoding="utf-8") as f:
+                f.write(source)
+
+        cases = [
+            ("import pt_br", ["-c", "import pt_br"], budget_ms, HEAVY_MODULES),
+            (
+                "plain script",
+                [scripts["simples"]],
+                plain_budget_ms,
+                PLAIN_SCRIPT_HEAVY_MODULES,
+            ),
+            ("pt-BR script", [scripts["ptbr"]], pt_br_budget_ms, []),
+        ]
+        status = 0
+        for name, args, budget, heavy_modules in cases:
+            status |= measure(name, env, args, budget, heavy_modules, runs)
+
+    print("FAIL" if status else "OK")
+    return status
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", default=DEFAULT_BUDGET_MS, type=float)
+    parser.add_argument(
+        "--plain-budget-ms", default=DEFAULT_PLAIN_BUDGET_MS, type=float
+    )
+    parser.add_argument(
+        "--pt-br-budget-ms", default=DEFAULT_PT_BR_BUDGET_MS, type=float
+    )
+    parser.add_argument("--runs", default=10, type=int)
+    args = parser.parse_args()
+    sys.exit(
+        run(args.budget_ms, args.plain_budget_ms, args.pt_br_budget_ms, args.runs)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cold-start latency of the pt-br launcher, with and without the server.
+
+Runs a tiny pt-BR script many times as a new process and reports the
+wall-clock time per run for:
+- 'python -c pass' (the interpreter alone, for reference)
+- 'pt-br script.py' running the script itself (PT_BR_SERVER=0)
+- 'pt-br script.py' sending it to a 'pt-br --servidor' started for the run
+
+Usage:
+    python -m benchmarks.launcher [--runs 50]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "pt-br")
+
+SCRIPT = """para i em intervalo(3):
+    se i % 2 == 0:
+        imprimir("par", i)
+"""
+
+
+def time_runs(command, env, runs: int):
+    """Run a command `runs` times and return the elapsed times in ms."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def start_server(env, socket_path: str) -> subprocess.Popen:
+    """Start 'pt-br --servidor' and wait until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, LAUNCHER, "--servidor", "--socket", socket_path],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    server.stdout.readline()  # "Listening on ..."
+    return server
+
+
+def run(runs: int) -> None:
+    """Run the benchmark and print one row per configuration."""
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "ola.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(SCRIPT)
+        socket_path = os.path.join(directory, "servidor.sock")
+
+        env = dict(os.environ, PYTHONPATH=ROOT, PT_BR_SERVER_SOCKET=socket_path)
+        local_env = dict(env, PT_BR_SERVER="0")
+
+        cases = [
+            ("python -c pass", [sys.executable, "-c", "pass"], local_env),
+            ("pt-br (local)", [sys.executable, LAUNCHER, script], local_env),
+        ]
+        results = [(name, time_runs(cmd, case_env, runs)) for name, cmd, case_env in cases]
+
+        server = start_server(env, socket_path)
+        try:
+            command = [sys.executable, LAUNCHER, script]
+            results.append(("pt-br (server)", time_runs(command, env, runs)))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'case':<20}{'min ms':>10}{'median ms':>12}{'mean ms':>10}")
+    print("-" * 52)
+    for name, times in results:
+        print(
+            f"{name:<20}{min(times):>10.1f}{statistics.median(times):>12.1f}"
+            f"{statistics.mean(times):>10.1f}"
+        )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", default=50, type=int)
+    args = parser.parse_args()
+    run(args.runs)
+
+
+if __name__ == "__main__":
+    main()
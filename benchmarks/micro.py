@@ -0,0 +1,245 @@
+"""Translation microbenchmarks, with JSON results and a baseline.
+
+Runs each function on each corpus (see benchmarks.corpus) and measures:
+- latency percentiles (p50/p90/p99) of one call over --repeat runs
+- throughput in MB/s of source, from the median latency
+- peak memory allocated during one call (tracemalloc, in a separate run)
+
+Functions: translate_source, safe_replace_word, safe_replace_function,
+is_inside_string (at every vocabulary match) and count_translations.
+Every call gets a fresh copy of the source, so caches keyed by the
+source object (the span index) do not carry over between runs.
+
+Corpora: 'synthetic' (generate() with the default mix), 'dense' (every
+block in pt-BR), 'literals' (mostly strings, comments and f-strings) and
+'examples' (examples/*.py, joined).
+
+Results are written as JSON (--output) and compared with a baseline
+(--baseline, default benchmarks/baseline.json): cases whose median got
+slower than --threshold are reported, and the exit status is 1 if there
+are any. Use --save-baseline to record a new baseline. Run it before and
+after every change to the translation engine.
+
+Usage:
+    python -m benchmarks.micro [--size 100KB] [--repeat 20] [--output FILE]
+                               [--baseline FILE] [--save-baseline]
+                               [--threshold 0.1] [--only translate_source]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pt_br
+from pt_br.mappings import get_matcher
+from pt_br.translator import translate_source
+from pt_br.utils import (
+    count_translations,
+    is_inside_string,
+    safe_replace_function,
+    safe_replace_word,
+)
+
+from benchmarks import corpus
+from benchmarks.scaling import parse_size
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def lookup_every_match(source: str) -> None:
+    """Call is_inside_string() at every keyword and built-in call."""
+    for match in get_matcher().finditer(source):
+        is_inside_string(source, match.start())
+
+
+FUNCTIONS: Dict[str, Callable[[str], object]] = {
+    "translate_source": translate_source,
+    "safe_replace_word": lambda source: safe_replace_word(source, "para", "for"),
+    "safe_replace_function": lambda source: safe_replace_function(
+        source, "imprimir", "print"
+    ),
+    "is_inside_string": lookup_every_match,
+    "count_translations": count_translations,
+}
+
+
+def corpora(size: int) -> Dict[str, str]:
+    """Build the benchmark corpora."""
+    return {
+        "synthetic": corpus.generate(size),
+        "dense": corpus.generate(size, keyword_density=1.0),
+        "literals": corpus.generate(
+            size, string_ratio=0.4, comment_ratio=0.3, fstring_density=0.2
+        ),
+        "examples": "\n".join(corpus.examples().values()),
+    }
+
+
+def fresh(source: str) -> str:
+    """Copy a string into a new object (equal, but not identical)."""
+    return source[:1] + source[1:]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    rank = round(fraction * len(sorted_values))
+    index = min(len(sorted_values) - 1, max(0, rank - 1))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[str], object], source: str, repeat: int) -> dict:
+    """Benchmark one function on one source.
+
+    Args:
+        func: The function, called with the source
+        source: The source code
+        repeat: Number of timed calls
+
+    Returns:
+        Dict with size_bytes, mb_per_s, p50_ms, p90_ms, p99_ms, peak_kb
+    """
+    func(fresh(source))  # Warm-up: compiled regexes, imports
+
+    times = []
+    for _ in range(repeat):
+        copy = fresh(source)
+        start = time.perf_counter()
+        func(copy)
+        times.append(time.perf_counter() - start)
+    times.sort()
+
+    copy = fresh(source)
+    tracemalloc.start()
+    func(copy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = len(source.encode("utf-8"))
+    median = percentile(times, 0.5)
+    return {
+        "size_bytes": size,
+        "mb_per_s": round(size / median / 1e6, 3),
+        "p50_ms": round(median * 1000, 4),
+        "p90_ms": round(percentile(times, 0.9) * 1000, 4),
+        "p99_ms": round(percentile(times, 0.99) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(size: int, repeat: int, only: List[str]) -> dict:
+    """Run every benchmark and return the JSON-ready results."""
+    results = {}
+    for corpus_name, source in corpora(size).items():
+        for name, func in FUNCTIONS.items():
+            if only and name not in only:
+                continue
+            results[f"{corpus_name}/{name}"] = measure(func, source, repeat)
+
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "pt_br": pt_br.__version__,
+            "size": size,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def print_results(data: dict) -> None:
+    """Print the results as a table."""
+    header = f"{'case':<36}{'MB/s':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+    print(header + f"{'peak KB':>10}")
+    print("-" * (len(header) + 10))
+    for case, result in data["results"].items():
+        print(
+            f"{case:<36}{result['mb_per_s']:>9.2f}{result['p50_ms']:>10.3f}"
+            f"{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+            f"{result['peak_kb']:>10.1f}"
+        )
+
+
+def compare(data: dict, baseline: dict, threshold: float) -> List[str]:
+    """Compare results with a baseline and print the changes.
+
+    Args:
+        data: Current results
+        baseline: Baseline results (same format)
+        threshold: Relative slowdown of the median that counts as a
+            regression, e.g. 0.1 for 10%
+
+    Returns:
+        The cases that regressed
+    """
+    for key in ("python", "implementation", "platform", "size"):
+        if data["meta"].get(key) != baseline["meta"].get(key):
+            print(
+                f"Warning: baseline {key} is {baseline['meta'].get(key)!r}, "
+                f"now {data['meta'].get(key)!r}"
+            )
+
+    regressions = []
+    print(f"\n{'case':<36}{'base ms':>10}{'now ms':>10}{'change':>9}")
+    print("-" * 65)
+    for case, result in data["results"].items():
+        before = baseline["results"].get(case)
+        if before is None:
+            print(f"{case:<36}{'-':>10}{result['p50_ms']:>10.3f}{'new':>9}")
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            regressions.append(case)
+        print(
+            f"{case:<36}{before['p50_ms']:>10.3f}{result['p50_ms']:>10.3f}"
+            f"{change:>+9.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="100KB", type=parse_size)
+    parser.add_argument("--repeat", default=20, type=int)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="write the results as baseline"
+    )
+    parser.add_argument("--threshold", default=0.1, type=float)
+    parser.add_argument("--only", action="append", choices=list(FUNCTIONS), default=[])
+    args = parser.parse_args(argv)
+
+    data = run(args.size, args.repeat, args.only)
+    print_results(data)
+
+    for path in filter(None, [args.output, args.save_baseline and args.baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {path}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(data, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
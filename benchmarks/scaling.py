@@ -0,0 +1,114 @@
+"""Scaling benchmark for the span index and the translator.
+
+Builds pt-BR sources from 1 KB to 10 MB and times:
+- building the span index
+- is_inside_string() / is_inside_comment() lookups at every match
+- safe_replace_word() and safe_replace_function()
+- translate_source()
+
+If the cost is linear, the time per KB stays flat as the input grows.
+
+Usage:
+    python -m benchmarks.scaling [--max-size 10MB]
+"""
+
+import argparse
+import time
+
+from pt_br.translator import translate_source
+from pt_br.utils import (
+    SpanIndex,
+    is_inside_comment,
+    is_inside_string,
+    safe_replace_function,
+    safe_replace_word,
+)
+
+# A block with code, strings, comments, triple-quoted text and f-strings
+BLOCK = '''funcao processa(itens):
+    """Processa os itens.
+
+    para cada item, se for valido, imprime.
+    """
+    total = 0  # para somar
+    para item em itens:
+        se item e nao item == "para":
+            imprimir(f"item: {texto(item)} de {comprimento(itens)}")
+            total = total + inteiro(item)
+    retorna total
+'''
+
+SIZES = [
+    ("1KB", 1024),
+    ("10KB", 10 * 1024),
+    ("100KB", 100 * 1024),
+    ("1MB", 1024 * 1024),
+    ("10MB", 10 * 1024 * 1024),
+]
+
+
+def make_source(size: int) -> str:
+    """Repeat BLOCK until the source is at least `size` characters."""
+    return BLOCK * (size // len(BLOCK) + 1)
+
+
+def timed(func, *args) -> float:
+    """Run func(*args) once and return the elapsed time in seconds."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def lookup_every_match(source: str) -> None:
+    """Check the context of every 'para' occurrence."""
+    position = source.find("para")
+    while position != -1:
+        is_inside_string(source, position)
+        is_inside_comment(source, position)
+        position = source.find("para", position + 1)
+
+
+def run(max_size: int) -> None:
+    """Run the benchmark and print one row per input size."""
+    cases = [
+        ("span index", SpanIndex),
+        ("lookups", lookup_every_match),
+        ("safe_replace_word", lambda s: safe_replace_word(s, "para", "for")),
+        ("safe_replace_function", lambda s: safe_replace_function(s, "imprimir", "print")),
+        ("translate_source", translate_source),
+    ]
+
+    print(f"{'case':<24}{'size':>8}{'seconds':>12}{'us/KB':>10}")
+    print("-" * 54)
+    for name, func in cases:
+        for label, size in SIZES:
+            if size > max_size:
+                break
+            # A fresh copy so cached span indexes are not reused across cases
+            source = "".join(list(make_source(size)))
+            seconds = timed(func, source)
+            per_kb = seconds * 1e6 / (len(source) / 1024)
+            print(f"{name:<24}{label:>8}{seconds:>12.4f}{per_kb:>10.1f}")
+        print()
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as '512KB' or '10MB'."""
+    units = {"KB": 1024, "MB": 1024 * 1024}
+    text = text.upper()
+    for unit, factor in units.items():
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)]) * factor)
+    return int(text)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", default="10MB", type=parse_size)
+    args = parser.parse_args()
+    run(args.max_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Memory cost of source maps.
+
+Imports generated pt-BR modules and reports:
+- what every loaded module keeps (its registry entry, no map yet)
+- the size of a module's SourceMap once an error in it is rendered,
+  in total and per changed line
+- the time to build a map
+
+Usage:
+    python -m benchmarks.sourcemap [--modules 200] [--blocks 20]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pt_br  # noqa: F401  (installs the import hook)
+from pt_br import sourcemap
+
+from benchmarks.scaling import BLOCK
+
+
+def run(modules: int, blocks: int) -> None:
+    """Run the benchmark and print the results."""
+    source = BLOCK * blocks
+    with tempfile.TemporaryDirectory() as directory:
+        for n in range(modules):
+            with open(os.path.join(directory, f"modulo_{n}.py"), "w") as f:
+                f.write(source)
+        sys.path.insert(0, directory)
+        importlib.invalidate_caches()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for n in range(modules):
+            importlib.import_module(f"modulo_{n}")
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        registry = sum(
+            stat.size_diff
+            for stat in after.compare_to(before, "filename")
+            if stat.traceback[0].filename == sourcemap.__file__
+        )
+
+        filename = os.path.join(directory, "modulo_0.py")
+        start = time.perf_counter()
+        source_map = sourcemap.get_source_map(filename)
+        elapsed = (time.perf_counter() - start) * 1000
+
+    lines = source.count("\n")
+    print(f"modules: {modules}, {lines} lines each")
+    print(f"registry, per module:        {registry / modules:8.1f} bytes")
+    print(f"map once built, per module:  {source_map.nbytes():8d} bytes")
+    per_line = source_map.nbytes() / len(source_map.rows)
+    print(f"map, per changed line:       {per_line:8.1f} bytes")
+    print(f"map build time:              {elapsed:8.2f} ms")
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", default=200, type=int)
+    parser.add_argument("--blocks", default=20, type=int)
+    args = parser.parse_args()
+    run(args.modules, args.blocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""End-to-end startup benchmarks in fresh interpreters.
+
+Each case is a new Python process, timed from spawn to exit:
+- python -c pass                    (the interpreter alone, for reference)
+- python -c 'import pt_br'
+- python -m pt_br examples/hello_world.py
+- pt-br examples/hello_world.py     (the launcher, running locally)
+- python -c 'import pt_br, pacote'  (a generated package of --modules
+                                     pt-BR modules, through TranslatorFinder)
+- the same package from a zip archive on sys.path
+
+Every case runs with cold and warm caches. Bytecode goes to a
+PYTHONPYCACHEPREFIX directory instead of the source tree: 'cold' gives
+every run an empty one (nothing compiled, translated or cached yet, like
+a first run from a checkout), 'warm' shares one that a first, untimed run
+filled. The OS file cache is warm in both.
+
+Reports the wall-clock distribution (min, median, p90, max) per case,
+and optionally writes it as JSON.
+
+Usage:
+    python -m benchmarks.startup [--runs 20] [--modules 50] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import zipfile
+from typing import Dict, List
+
+from benchmarks import corpus
+from benchmarks.micro import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "pt-br")
+HELLO = os.path.join(ROOT, "examples", "hello_world.py")
+
+
+def make_package(directory: str, modules: int) -> None:
+    """Write a package of pt-BR modules that import cleanly.
+
+    Each module defines one function whose body is a synthetic corpus
+    (see benchmarks.corpus), so importing it compiles but runs nothing.
+    """
+    package = os.path.join(directory, "pacote")
+    os.makedirs(package)
+    names = [f"modulo_{n}" for n in range(modules)]
+    with open(os.path.join(package, "__init__.py"), "w", encoding="utf-8") as f:
+        f.write("".join(f"from . import {name}\n" for name in names))
+    for n, name in enumerate(names):
+        body = corpus.generate(2 * 1024, keyword_density=1.0, seed=n)
+        with open(os.path.join(package, f"{name}.py"), "w", encoding="utf-8") as f:
+            f.write("funcao executa():\n" + textwrap.indent(body, "    "))
+
+
+def make_archive(directory: str, path: str) -> None:
+    """Zip the package written by make_package()."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name in sorted(os.listdir(os.path.join(directory, "pacote"))):
+            z.write(os.path.join(directory, "pacote", name), f"pacote/{name}")
+
+
+def time_runs(command: List[str], env: Dict[str, str], runs: int, cold: bool):
+    """Run a command `runs` times and return the elapsed times in ms.
+
+    Args:
+        command: The command line
+        env: Environment; PYTHONPYCACHEPREFIX is set per run
+        runs: Number of timed runs
+        cold: Give every run an empty bytecode cache
+
+    Returns:
+        The elapsed times, sorted
+    """
+    cache_root = tempfile.mkdtemp(prefix="pt_br-startup-")
+    try:
+        warm_prefix = os.path.join(cache_root, "warm")
+        if not cold:
+            subprocess.run(
+                command,
+                env=dict(env, PYTHONPYCACHEPREFIX=warm_prefix),
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+
+        times = []
+        for n in range(runs):
+            prefix = os.path.join(cache_root, f"cold-{n}") if cold else warm_prefix
+            run_env = dict(env, PYTHONPYCACHEPREFIX=prefix)
+            start = time.perf_counter()
+            subprocess.run(command, env=run_env, stdout=subprocess.DEVNULL, check=True)
+            times.append((time.perf_counter() - start) * 1000)
+        return sorted(times)
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+
+def run(runs: int, modules: int) -> dict:
+    """Run every case and return the distributions."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PT_BR_SERVER="0")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_package(directory, modules)
+        package_env = dict(env, PYTHONPATH=os.pathsep.join([ROOT, directory]))
+        archive = os.path.join(directory, "pacote.zip")
+        make_archive(directory, archive)
+        archive_env = dict(env, PYTHONPATH=os.pathsep.join([ROOT, archive]))
+
+        cases = [
+            ("python -c pass", [sys.executable, "-c", "pass"], env),
+            ("import pt_br", [sys.executable, "-c", "import pt_br"], env),
+            ("python -m pt_br hello", [sys.executable, "-m", "pt_br", HELLO], env),
+            ("pt-br hello", [sys.executable, LAUNCHER, HELLO], env),
+            (
+                f"import {modules} modules",
+                [sys.executable, "-c", "import pt_br, pacote"],
+                package_env,
+            ),
+            (
+                f"import {modules} modules (zip)",
+                [sys.executable, "-c", "import pt_br, pacote"],
+                archive_env,
+            ),
+        ]
+
+        results = {}
+        for name, command, case_env in cases:
+            for cache in ("cold", "warm"):
+                times = time_runs(command, case_env, runs, cache == "cold")
+                results[f"{name} [{cache}]"] = {
+                    "min_ms": round(times[0], 2),
+                    "p50_ms": round(percentile(times, 0.5), 2),
+                    "p90_ms": round(percentile(times, 0.9), 2),
+                    "max_ms": round(times[-1], 2),
+                    "runs_ms": [round(t, 2) for t in times],
+                }
+
+    return {"runs": runs, "modules": modules, "python": sys.version, "results": results}
+
+
+def print_results(data: dict) -> None:
+    """Print one row per case."""
+    print(f"{'case':<34}{'min ms':>9}{'p50 ms':>9}{'p90 ms':>9}{'max ms':>9}")
+    print("-" * 70)
+    for case, result in data["results"].items():
+        print(
+            f"{case:<34}{result['min_ms']:>9.1f}{result['p50_ms']:>9.1f}"
+            f"{result['p90_ms']:>9.1f}{result['max_ms']:>9.1f}"
+        )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", default=20, type=int)
+    parser.add_argument("--modules", default=50, type=int)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    data = run(args.runs, args.modules)
+    print_results(data)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
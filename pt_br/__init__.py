@@ -15,6 +15,9 @@ How it works:
     4. The pt-BR code is automatically translated to Python
 
 No build steps, no CLI tools—just pure Python!
+
+Importing the package is kept cheap: it only registers the import hook
+(pt_br.hook). The public API below is loaded on first access.
 """
 
 __version__ = "0.1.0"
@@ -22,26 +25,59 @@ __author__ = "Wally Carvalho"
 __author_email__ = "qzn2cpm83@mozmail.com"
 __license__ = "MIT"
 
-# Register the import hook when this module is imported
-from .translator import register_translator
+# Public API: name -> submodule that defines it, imported on first access
+_LAZY_ATTRIBUTES = {
+    "translate_source": "translator",
+    "translate_stream": "translator",
+    "translate_file": "translator",
+    "untranslate_source": "translator",
+    "needs_translation": "translator",
+    "PT_BR_TO_PYTHON": "mappings",
+    "PT_BR_KEYWORDS": "mappings",
+    "PT_BR_BUILTINS": "mappings",
+    "PYTHON_TO_PT_BR": "mappings",
+    "debug_show_translation": "utils",
+    "enable_translation_cache": "cache",
+    "disable_translation_cache": "cache",
+    "clear_translation_cache": "cache",
+    "translation_cache_info": "cache",
+    "enable_translation_store": "store",
+    "disable_translation_store": "store",
+    "TranslationSession": "session",
+    "stats": "instrumentation",
+    "reset_stats": "instrumentation",
+}
 
-register_translator()
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    """Load public API names (and submodules) on first access."""
+    import importlib
+
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        try:
+            # e.g. pt_br.cache without 'import pt_br.cache'
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+            message = f"module {__name__!r} has no attribute {name!r}"
+            raise AttributeError(message) from None
+
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
 
-# Public API
-from .translator import translate_source
-from .mappings import (
-    PT_BR_TO_PYTHON,
-    PT_BR_KEYWORDS,
-    PT_BR_BUILTINS,
-    PYTHON_TO_PT_BR,
-)
-from .utils import debug_show_translation
-
-__all__ = [
-    "translate_source",
-    "PT_BR_TO_PYTHON",
-    "PT_BR_KEYWORDS",
-    "PT_BR_BUILTINS",
-    "PYTHON_TO_PT_BR",
-    "debug_show_translation",
-]
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+# Register the import hook when this module is imported. This comes last:
+# for a pt-BR main script it runs the rest of the script, which needs the
+# module fully set up.
+from .hook import register_translator  # noqa: E402
+
+register_translator()
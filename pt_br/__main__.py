@@ -3,50 +3,67 @@
 
 Usage:
     python -m pt_br your_script.py [args...]
+    python -m pt_br traduzir SRC DEST [-j N]   (translate a whole tree)
+    python -m pt_br traduzir --reverso SRC DEST (Python tree to pt-BR)
+    python -m pt_br - < entrada.py             (translate stdin to stdout)
+    python -m pt_br vigiar DIR [--dest DEST]   (keep a tree compiled)
 
 This script:
 1. Reads the target script
-2. Translates pt-BR → Python
+2. Translates pt-BR → Python (or reuses the pt-BR bytecode cache)
 3. Executes the translated code
 
 This allows direct execution of pt-BR scripts.
+
+Set PT_BR_STORE=1 to share translations with other processes through the
+persistent translation store (see pt_br.store).
+
+The script runs as sys.modules['__main__'], so multiprocessing children
+started with 'spawn' or 'forkserver' can load it again (see
+run_child_main()).
 """
 
 import sys
 import os
-from pathlib import Path
 
 # Add the pt_br module to the path
 import pt_br
-from pt_br.translator import translate_source
+from pt_br.translator import PTBRSourceLoader
 
+# Environment variable naming the script run by run_script(), for
+# multiprocessing children (see run_child_main())
+MAIN_SCRIPT_ENV = "PT_BR_MAIN_SCRIPT"
 
-def main():
-    """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python -m pt_br script.py [arguments...]")
-        print("\nRun a Python script that uses pt-BR keywords.")
-        sys.exit(1)
 
-    script_path = sys.argv[1]
-    script_args = sys.argv[2:]
+def run_script(script_path, script_args):
+    """Translate and execute a pt-BR script as __main__.
+
+    The compiled code goes through PTBRSourceLoader, so the script shares
+    the pt-BR bytecode cache with imported modules.
 
+    Args:
+        script_path: Path to the script
+        script_args: Arguments passed to the script (sys.argv[1:])
+    """
     # Check if the script exists
     if not os.path.exists(script_path):
         print(f"Error: File '{script_path}' not found")
         sys.exit(1)
 
-    # Read the script
+    loader = PTBRSourceLoader("__main__", script_path)
+
+    # Read, translate and compile (or load from the bytecode cache)
     try:
-        with open(script_path, "r", encoding="utf-8") as f:
-            source = f.read()
-    except Exception as e:
+        code = loader.get_code("__main__")
+    except SyntaxError as e:
+        # The user's error only, without the pt_br frames that compiled it
+        from pt_br.sourcemap import format_exception
+
+        sys.stderr.write("".join(format_exception(e.with_traceback(None))))
+        sys.exit(1)
+    except OSError as e:
         print(f"Error reading file: {e}")
         sys.exit(1)
-
-    # Translate pt-BR → Python
-    try:
-        translated = translate_source(source)
     except Exception as e:
         print(f"Error translating script: {e}")
         sys.exit(1)
@@ -56,25 +73,110 @@ def main():
 
     # Create a module to execute in
     import types
+    import importlib.machinery
 
     module = types.ModuleType("__main__")
     module.__file__ = script_path
-    module.__spec__ = None
+    module.__loader__ = loader
+    # multiprocessing children load the main module again by its spec name
+    # (when it has one): 'pt_br' runs this file there as '__mp_main__'
+    module.__spec__ = importlib.machinery.ModuleSpec(
+        "pt_br", loader, origin=script_path
+    )
+    os.environ[MAIN_SCRIPT_ENV] = os.path.abspath(script_path)
+    sys.modules["__main__"] = module
 
     # Execute the translated code
     try:
-        code = compile(translated, script_path, "exec")
         exec(code, module.__dict__)
     except SystemExit as e:
         # Allow the script to call sys.exit()
         sys.exit(e.code)
     except Exception as e:
         print(f"Error executing script: {e}")
-        import traceback
+        from pt_br.sourcemap import format_exception
+
+        sys.stderr.write("".join(format_exception(e)))
+        sys.exit(1)
 
-        traceback.print_exc()
+
+def run_child_main():
+    """Load the script in a multiprocessing child of run_script().
+
+    'spawn' and 'forkserver' children run this file as '__mp_main__'
+    before they unpickle their work, which may refer to functions and
+    classes of the script. The module's contents are replaced with the
+    script's (from the parent's bytecode cache); its
+    "if __name__ == '__main__'" block does not run.
+    """
+    path = os.environ.get(MAIN_SCRIPT_ENV)
+    if not path:
+        return
+    loader = PTBRSourceLoader("__mp_main__", path)
+    code = loader.get_code("__mp_main__")
+
+    namespace = globals()
+    builtins = namespace["__builtins__"]
+    namespace.clear()
+    namespace.update(
+        __name__="__mp_main__",
+        __file__=path,
+        __loader__=loader,
+        __builtins__=builtins,
+    )
+    exec(code, namespace)
+
+
+def translate_stdin():
+    """Translate stdin to stdout, one logical line at a time.
+
+    Output is flushed after every logical line, so the command can sit
+    in the middle of a shell pipeline.
+    """
+    from pt_br.translator import translate_stream
+
+    try:
+        for chunk in translate_stream(sys.stdin):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except BrokenPipeError:
+        # The reader went away (e.g. '| head'); exit quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
         sys.exit(1)
 
 
+def main():
+    """Main entry point."""
+    if len(sys.argv) < 2:
+        print("Usage: python -m pt_br script.py [arguments...]")
+        print("       python -m pt_br traduzir SRC DEST [-j N]")
+        print("       python -m pt_br traduzir --reverso SRC DEST")
+        print("       python -m pt_br -   (translate stdin to stdout)")
+        print("       python -m pt_br vigiar DIR [--dest DEST]")
+        print("\nRun a Python script that uses pt-BR keywords.")
+        sys.exit(1)
+
+    if sys.argv[1] == "traduzir":
+        from pt_br import bulk
+
+        sys.exit(bulk.main(sys.argv[2:]))
+
+    if sys.argv[1] == "vigiar":
+        from pt_br import watch
+
+        sys.exit(watch.main(sys.argv[2:]))
+
+    if sys.argv[1] == "-":
+        translate_stdin()
+        return
+
+    run_script(sys.argv[1], sys.argv[2:])
+
+
 if __name__ == "__main__":
     main()
+elif __name__ == "__mp_main__":
+    run_child_main()
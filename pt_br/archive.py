@@ -0,0 +1,234 @@
+"""Translating pt-BR modules imported from zip archives.
+
+A course can ship as a single zip on sys.path. TranslatorFinder looks
+modules up in the archive with find_in_archive() (zipimport would compile
+pt-BR source while finding it, and fail), and gives its .py entries to
+PTBRZipLoader, which reads the source out of the archive and translates
+it like PTBRSourceLoader does for files. Compiled .pyc entries and
+modules with nothing to translate are left to zipimport.
+
+Archives are read-only, so their translated code is cached outside them,
+in one directory per archive:
+    <base>/zipimport/<archive>-<path checksum>/<entry>.<cache tag>.pyc
+    <base>/zipimport/<archive>-<path checksum>/<entry>.<cache tag>.plain
+where <base> is sys.pycache_prefix if set, otherwise the pt_br user cache
+directory (see pt_br.store.user_cache_dir), and <entry> is the module's
+path inside the archive. When that cannot be written, the shared
+directory of pt_br.cache is used instead.
+
+Cache files have the standard .pyc header, but store the entry's CRC-32
+where a file's mtime would be, so they stay valid as long as the entry's
+contents do, even if the archive is rebuilt. The archive's directory is
+read once per archive mtime and size; after that, checking a module's
+cache costs one stat() of the archive.
+"""
+
+import os
+import sys
+import importlib.util
+from importlib.machinery import ModuleSpec
+from typing import Dict, Optional, Tuple
+
+from . import cache, codec, instrumentation
+from .translator import PTBRSourceLoader
+
+# Archive path -> (mtime, size, {entry name: (CRC-32, size)})
+_indexes: Dict[str, tuple] = {}
+
+
+def archive_index(archive: str) -> Dict[str, Tuple[int, int]]:
+    """Get the CRC-32 and size of every entry of a zip archive.
+
+    The result is reused until the archive's mtime or size changes.
+
+    Args:
+        archive: Path to the zip file
+
+    Returns:
+        Dict of entry name ('/'-separated) -> (CRC-32, uncompressed size)
+
+    Raises:
+        OSError: If the archive cannot be read
+    """
+    st = os.stat(archive)
+    cached = _indexes.get(archive)
+    if cached is not None and cached[:2] == (st.st_mtime, st.st_size):
+        return cached[2]
+
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(archive) as z:
+            entries = {
+                info.filename: (info.CRC, info.file_size) for info in z.infolist()
+            }
+    except zipfile.BadZipFile as e:
+        raise OSError(f"bad zip file: {archive}") from e
+    _indexes[archive] = (st.st_mtime, st.st_size, entries)
+    return entries
+
+
+def archive_cache_dir(archive: str) -> str:
+    """Get the directory holding the translated code of an archive.
+
+    Args:
+        archive: Path to the zip file
+
+    Returns:
+        The directory path (it may not exist yet)
+    """
+    base = sys.pycache_prefix
+    if not base:
+        from .store import user_cache_dir
+
+        base = user_cache_dir()
+
+    import zlib
+
+    key = os.path.abspath(archive).encode("utf-8", "surrogatepass")
+    stem = os.path.splitext(os.path.basename(archive))[0]
+    checksum = f"{zlib.crc32(key):08x}{zlib.adler32(key):08x}"
+    return os.path.join(base, "zipimport", f"{stem}-{checksum}")
+
+
+# Entry suffixes tried for a module name, in zipimport's order
+_SEARCH_ORDER = (
+    ("/__init__.pyc", True),
+    ("/__init__.py", True),
+    (".pyc", False),
+    (".py", False),
+)
+
+
+def find_in_archive(fullname: str, importer) -> Optional[ModuleSpec]:
+    """Find a module in a zip archive without compiling it.
+
+    zipimporter.find_spec() compiles a module's source to build its
+    spec, which fails on pt-BR code. This looks the module up in the
+    archive's directory instead, in the order zipimport uses.
+
+    Args:
+        fullname: The fully qualified module name
+        importer: The zipimport.zipimporter of the search path entry
+
+    Returns:
+        A spec whose loader is the zipimporter (origin ending in .py for
+        source, .pyc for compiled entries), or None if the module is not
+        in the archive
+    """
+    try:
+        entries = archive_index(importer.archive)
+    except OSError:
+        return None
+    prefix = importer.prefix.replace(os.sep, "/")
+    base = prefix + fullname.rpartition(".")[2]
+    for suffix, is_package in _SEARCH_ORDER:
+        entry = base + suffix
+        if entry not in entries:
+            continue
+        origin = os.path.join(importer.archive, *entry.split("/"))
+        spec = ModuleSpec(fullname, importer, origin=origin, is_package=is_package)
+        if is_package:
+            spec.submodule_search_locations = [os.path.dirname(origin)]
+        spec.has_location = True
+        return spec
+    return None
+
+
+class PTBRZipLoader(PTBRSourceLoader):
+    """PTBRSourceLoader for a module inside a zip archive.
+
+    The source is read through the zipimporter that found the module, and
+    the bytecode cache lives outside the archive (see the module
+    docstring).
+    """
+
+    def __init__(self, fullname: str, path: str, importer):
+        """Initialize the loader.
+
+        Args:
+            fullname: The module name
+            path: The module's origin, the archive path followed by the
+                path of the entry inside it
+            importer: The zipimport.zipimporter that found the module
+        """
+        super().__init__(fullname, path)
+        self.importer = importer
+        self.archive = importer.archive
+        self.entry = path[len(self.archive) + 1 :].replace(os.sep, "/")
+
+    def get_source(self, fullname: str) -> str:
+        """Get the source code from the archive.
+
+        Args:
+            fullname: The module name
+
+        Returns:
+            The source code as a string
+        """
+        start = instrumentation.clock()
+        data = self.importer.get_data(self.path)
+        instrumentation.READ["files"] += 1
+        instrumentation.READ["bytes"] += len(data)
+        instrumentation.READ["seconds"] += instrumentation.clock() - start
+        if codec.declares_codec(data):
+            # UTF-8 pt-BR source: translated by this loader, not the codec
+            text = data.decode("utf-8-sig")
+            return text.replace("\r\n", "\n").replace("\r", "\n")
+        return importlib.util.decode_source(data)
+
+    def path_stats(self, path: str) -> dict:
+        """Get the CRC-32 (as 'mtime') and size of the archive entry.
+
+        Args:
+            path: The module's origin
+
+        Returns:
+            Dict with 'mtime' and 'size' keys
+
+        Raises:
+            OSError: If the archive or the entry cannot be found
+        """
+        try:
+            crc, size = archive_index(self.archive)[self.entry]
+        except KeyError:
+            raise OSError(f"{self.entry} is not in {self.archive}") from None
+        return {"mtime": crc, "size": size}
+
+    def bytecode_path(self, source_path: str) -> Optional[str]:
+        """Get the cache path for the archive entry.
+
+        Args:
+            source_path: The module's origin
+
+        Returns:
+            The cache file path, or None when caching is not available
+        """
+        tag = cache.cache_tag()
+        if tag is None:
+            return None
+        stem = os.path.splitext(self.entry)[0]
+        name = f"{stem}.{tag}.pyc"
+        return os.path.join(archive_cache_dir(self.archive), *name.split("/"))
+
+    def plain_marker_path(self, source_path: str) -> Optional[str]:
+        """Get the plain-Python marker path for the archive entry."""
+        path = self.bytecode_path(source_path)
+        if path is None:
+            return None
+        return path[: -len(".pyc")] + ".plain"
+
+    def get_plain_code(self, fullname: str):
+        """Get the code of a plain-Python module from zipimport.
+
+        Args:
+            fullname: The module name
+
+        Returns:
+            The compiled code object
+        """
+        return self.importer.get_code(fullname)
+
+    def get_resource_reader(self, fullname: str):
+        """Get the zipimporter's reader for the package's data files."""
+        return self.importer.get_resource_reader(fullname)
@@ -0,0 +1,377 @@
+"""Ahead-of-time translation of a whole source tree.
+
+Usage:
+    python -m pt_br traduzir SRC DEST [-j N] [--force] [--reverso]
+
+Every .py file under SRC is translated to plain Python and written to the
+same relative path under DEST; other files are copied as they are. The
+result runs without the import hook: 'import pt_br' statements are
+replaced by 'pass' (keeping line numbers intact).
+
+With --reverso, the tree is plain Python and is translated to pt-BR
+instead (see translator.untranslate_source). Files that use pt-BR words
+as names cannot be translated back and are copied as they are.
+
+Files are translated in parallel with a process pool. A manifest in DEST
+records the hash of every source, so re-runs skip unchanged files and
+remove the outputs of sources that were deleted.
+"""
+
+import io
+import os
+import json
+import time
+import shutil
+import argparse
+import tokenize
+from typing import Dict, List, Optional, Tuple
+
+from . import cache, codec
+from .translator import translate_source, untranslate_source
+
+MANIFEST_FILENAME = ".pt_br_manifest.json"
+
+# Directories never descended into
+SKIPPED_DIRS = {"__pycache__", ".git", ".hg", ".svn", ".tox", ".venv", "venv"}
+
+def strip_hook_import(source: str) -> str:
+    """Replace 'import pt_br' statements with 'pass'.
+
+    'pass' keeps the line (so line numbers stay the same) and keeps the
+    code valid when the import is the only statement of a block. Only
+    statements that are alone on their line are replaced, as found by the
+    tokenizer: the same text inside a string is data and is left alone.
+    Source the tokenizer cannot read is returned unchanged.
+
+    Args:
+        source: Translated Python source
+
+    Returns:
+        The source without imports of pt_br
+    """
+    if "import pt_br" not in source:
+        return source
+    lines = io.StringIO(source, newline="").readlines()
+    try:
+        tokens = list(tokenize.generate_tokens(iter(lines).__next__))
+    except (tokenize.TokenError, SyntaxError):
+        return source
+
+    line_starts = (tokenize.NEWLINE, tokenize.NL, tokenize.INDENT, tokenize.DEDENT)
+    rows = []
+    for index, token in enumerate(tokens[:-2]):
+        if token.type != tokenize.NAME or token.string != "import":
+            continue
+        if index > 0 and tokens[index - 1].type not in line_starts:
+            continue
+        name, end = tokens[index + 1], tokens[index + 2]
+        if end.type == tokenize.COMMENT:
+            end = tokens[index + 3]
+        if (
+            name.type == tokenize.NAME
+            and name.string == "pt_br"
+            and end.type == tokenize.NEWLINE
+            and token.start[0] == name.start[0] == end.start[0]
+        ):
+            rows.append((token.start[0] - 1, token.start[1]))
+
+    for row, column in rows:
+        line = lines[row]
+        ending = line[len(line.rstrip("\r\n")) :]
+        lines[row] = line[:column] + "pass  # import pt_br" + ending
+    return "".join(lines)
+
+
+def source_digest(data: bytes, reverse: bool = False) -> str:
+    """Hash a source file's bytes (plus the mapping hash and direction)."""
+    import hashlib
+
+    digest = hashlib.blake2b(cache.mapping_hash().encode("ascii"), digest_size=16)
+    if reverse:
+        digest.update(b"reverse\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def translate_file_bytes(data: bytes, reverse: bool = False) -> bytes:
+    """Translate the bytes of a .py file, keeping its encoding.
+
+    A file that declares the pt_br codec is read as UTF-8, and its
+    translation declares UTF-8 instead.
+
+    Args:
+        data: Raw file contents
+        reverse: Translate Python to pt-BR instead
+
+    Returns:
+        Raw translated contents, in the same encoding
+    """
+    encoding, declared = codec.source_encoding(io.BytesIO(data).readline)
+    source = data.decode(encoding)
+    if reverse:
+        translated = untranslate_source(source)
+    else:
+        translated = strip_hook_import(translate_source(source))
+        if declared:
+            translated = codec.declare_utf8(translated)
+    return translated.encode(encoding)
+
+
+def translate_job(job: Tuple[str, str, str, bool]) -> tuple:
+    """Translate (or copy) one file, for translate_tree() and the watcher.
+
+    Files that cannot be decoded (or translated back, with reverse) are
+    copied untranslated and reported.
+
+    Args:
+        job: (relative path, source path, destination path, reverse)
+
+    Returns:
+        (relative path, digest, bytes in, bytes out, seconds, worker pid,
+        error message or None)
+    """
+    relative, source_path, dest_path, reverse = job
+    start = time.perf_counter()
+    error = None
+
+    with open(source_path, "rb") as f:
+        data = f.read()
+
+    output = data
+    if source_path.endswith(".py"):
+        try:
+            output = translate_file_bytes(data, reverse)
+        except (SyntaxError, UnicodeError, LookupError, ValueError) as e:
+            error = f"{relative}: {e}"
+
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with open(dest_path, "wb") as f:
+        f.write(output)
+    if not source_path.endswith(".py"):
+        shutil.copystat(source_path, dest_path)
+
+    elapsed = time.perf_counter() - start
+    digest = source_digest(data, reverse)
+    return relative, digest, len(data), len(output), elapsed, os.getpid(), error
+
+
+def iter_tree(src: str, dest: Optional[str] = None):
+    """Yield (relative path, absolute path) for every file under src.
+
+    Skips SKIPPED_DIRS, and dest itself when it lives inside src.
+    """
+    dest = os.path.abspath(dest) if dest else None
+    for root, dirs, files in os.walk(src):
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if d not in SKIPPED_DIRS and os.path.abspath(os.path.join(root, d)) != dest
+        )
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, src), path
+
+
+def _read_manifest(dest: str) -> dict:
+    """Read the manifest file in dest as it is (empty if missing or broken)."""
+    try:
+        with open(os.path.join(dest, MANIFEST_FILENAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def load_manifest(dest: str) -> Dict[str, str]:
+    """Read the manifest of a previous run (empty if missing or stale)."""
+    manifest = _read_manifest(dest)
+    if manifest.get("mapping_hash") != cache.mapping_hash():
+        return {}
+    return manifest.get("files", {})
+
+
+def remove_stale_outputs(dest: str, recorded: Dict[str, str], seen) -> List[str]:
+    """Delete the outputs of files that are no longer in the source tree.
+
+    Only paths recorded in the manifest are touched, so files added to dest
+    by hand are kept. Directories left empty are removed too.
+
+    Args:
+        dest: Output tree
+        recorded: Files of the previous manifest (relative path -> digest)
+        seen: Relative paths found in the source tree on this run
+
+    Returns:
+        Sorted relative paths of the removed outputs
+    """
+    root = os.path.abspath(dest)
+    removed = []
+    for relative in sorted(set(recorded) - set(seen)):
+        path = os.path.abspath(os.path.join(root, relative))
+        if not path.startswith(root + os.sep):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed.append(relative)
+        parent = os.path.dirname(path)
+        while parent != root:
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+    return removed
+
+
+def save_manifest(dest: str, files: Dict[str, str]) -> None:
+    """Write the manifest for this run."""
+    manifest = {"mapping_hash": cache.mapping_hash(), "files": files}
+    with open(os.path.join(dest, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def translate_tree(
+    src: str,
+    dest: str,
+    jobs: Optional[int] = None,
+    force: bool = False,
+    reverse: bool = False,
+) -> dict:
+    """Translate every .py file under src into dest.
+
+    Args:
+        src: Source tree with pt-BR code (plain Python with reverse)
+        dest: Output tree (created if needed)
+        jobs: Number of worker processes (default: CPU count; 1 = no pool)
+        force: Translate every file even if it has not changed
+        reverse: Translate Python to pt-BR instead
+
+    Returns:
+        Summary dict: files, written, skipped, bytes_in, bytes_out,
+        seconds, per-worker stats under 'workers', a list of 'errors' and
+        the outputs 'removed' because their source was deleted
+    """
+    start = time.perf_counter()
+    os.makedirs(dest, exist_ok=True)
+    # Every recorded output, even from a run with another mapping or --force
+    recorded = _read_manifest(dest).get("files", {})
+    previous = {} if force else load_manifest(dest)
+    manifest = {}
+    seen = set()
+    pending = []
+    summary = {
+        "files": 0,
+        "written": 0,
+        "skipped": 0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "seconds": 0.0,
+        "workers": {},
+        "errors": [],
+        "removed": [],
+    }
+
+    for relative, path in iter_tree(src, dest):
+        seen.add(relative)
+        summary["files"] += 1
+        dest_path = os.path.join(dest, relative)
+        known = previous.get(relative)
+        if known is not None and os.path.exists(dest_path):
+            with open(path, "rb") as f:
+                if source_digest(f.read(), reverse) == known:
+                    manifest[relative] = known
+                    summary["skipped"] += 1
+                    continue
+        pending.append((relative, path, dest_path, reverse))
+
+    summary["removed"] = remove_stale_outputs(dest, recorded, seen)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1 or len(pending) <= 1:
+        results = map(translate_job, pending)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunksize = max(1, len(pending) // (jobs * 4))
+        results = executor.map(translate_job, pending, chunksize=chunksize)
+
+    try:
+        for relative, digest, bytes_in, bytes_out, seconds, pid, error in results:
+            if error is None:
+                manifest[relative] = digest
+            else:
+                summary["errors"].append(error)
+            summary["written"] += 1
+            summary["bytes_in"] += bytes_in
+            summary["bytes_out"] += bytes_out
+            worker = summary["workers"].setdefault(
+                pid, {"files": 0, "bytes": 0, "seconds": 0.0}
+            )
+            worker["files"] += 1
+            worker["bytes"] += bytes_in
+            worker["seconds"] += seconds
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        save_manifest(dest, manifest)
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """Render a translate_tree() summary for the terminal."""
+    lines = [
+        f"Files: {summary['files']} "
+        f"({summary['written']} written, {summary['skipped']} unchanged)",
+        f"Bytes: {summary['bytes_in']} in, {summary['bytes_out']} out",
+        f"Time: {summary['seconds']:.2f}s",
+    ]
+    for error in summary["errors"]:
+        lines.append(f"Error (copied untranslated): {error}")
+    for relative in summary.get("removed", []):
+        lines.append(f"Removed (source deleted): {relative}")
+    if summary["workers"]:
+        lines.append("Per worker:")
+        for pid, worker in sorted(summary["workers"].items()):
+            lines.append(
+                f"  pid {pid:>7}: {worker['files']:>6} files "
+                f"{worker['bytes']:>10} bytes {worker['seconds']:>8.2f}s"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for 'python -m pt_br traduzir'."""
+    parser = argparse.ArgumentParser(
+        prog="python -m pt_br traduzir",
+        description="Translate a pt-BR source tree to plain Python.",
+    )
+    parser.add_argument("src", help="source tree with pt-BR code")
+    parser.add_argument("dest", help="output tree")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="translate unchanged files too"
+    )
+    parser.add_argument(
+        "--reverso", action="store_true", help="translate plain Python to pt-BR"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.src):
+        print(f"Error: Directory '{args.src}' not found")
+        return 1
+
+    summary = translate_tree(
+        args.src, args.dest, jobs=args.jobs, force=args.force, reverse=args.reverso
+    )
+    print(format_summary(summary))
+    return 1 if summary["errors"] else 0
@@ -0,0 +1,467 @@
+"""Caching for translated pt-BR code.
+
+This module provides:
+- The mapping hash: a digest of the translation tables and the engine
+  version, used to invalidate anything derived from them
+- Bytecode cache files for translated modules (pt-BR specific .pyc files
+  in __pycache__, next to the regular ones)
+- A bytecode directory shared with child processes, for when the
+  __pycache__ files cannot be written
+- An opt-in, in-process LRU cache for translate_source(), keyed by a
+  hash of the source and the mapping hash
+
+Bytecode cache layout:
+    __pycache__/<module>.<cache tag>.pt_br-<mapping hash>.pyc
+    __pycache__/<module>.<cache tag>.pt_br-<mapping hash>.plain
+
+A .plain marker records that a module has nothing to translate; such
+modules are compiled and cached by the stock SourceFileLoader instead.
+
+The .pyc file uses the standard timestamp-based .pyc header (magic
+number, flags, source mtime, source size) followed by the marshalled
+code; the marker is that header alone.
+Because the mapping hash is part of the file name, changing the
+mappings (or ENGINE_VERSION) makes every existing cache file unreachable.
+
+Shared bytecode: when a translated module's cache file cannot be written
+(sys.dont_write_bytecode, a read-only tree), its code goes to a temporary
+directory instead, named in the PT_BR_SHARED_CACHE environment variable.
+Child processes inherit the variable. multiprocessing workers started
+with 'spawn' or 'forkserver' then load the parent's code instead of
+translating every module again. The process that created the directory
+removes it when it exits. Setting PT_BR_SHARED_CACHE to an existing
+directory keeps the files there instead.
+"""
+
+import sys
+import os
+import marshal
+import threading
+import importlib.util
+from collections import OrderedDict
+from typing import Optional
+
+# Length of the mapping hash used in cache file names
+_TAG_HASH_LENGTH = 12
+
+# Version of the translation engine and of the cache file formats. Bump it
+# whenever the output of translate_source() or the layout of cached data
+# changes without a change to the mapping tables.
+ENGINE_VERSION = 1
+
+_mapping_hash = None
+
+
+def mapping_hash() -> str:
+    """Get a digest of the translation tables, engine and package version.
+
+    Uses zlib checksums rather than hashlib, which is much slower to import
+    and would add to the startup time of every pt-BR script.
+
+    Returns:
+        Hex digest that changes whenever the translation output may change
+    """
+    global _mapping_hash
+    if _mapping_hash is None:
+        import zlib
+
+        from . import __version__
+        from .mappings import PT_BR_KEYWORDS, PT_BR_BUILTINS
+
+        payload = repr(
+            (
+                __version__,
+                ENGINE_VERSION,
+                sorted(PT_BR_KEYWORDS.items()),
+                sorted(PT_BR_BUILTINS.items()),
+            )
+        )
+        data = payload.encode("utf-8")
+        _mapping_hash = f"{zlib.crc32(data):08x}{zlib.adler32(data):08x}"
+    return _mapping_hash
+
+
+def cache_tag() -> Optional[str]:
+    """Get the tag used in pt-BR bytecode cache file names.
+
+    Returns:
+        e.g. 'cpython-311.pt_br-0123456789ab', or None when the
+        interpreter does not support bytecode caching
+    """
+    if sys.implementation.cache_tag is None:
+        return None
+    return f"{sys.implementation.cache_tag}.pt_br-{mapping_hash()[:_TAG_HASH_LENGTH]}"
+
+
+def bytecode_path(source_path: str) -> Optional[str]:
+    """Get the pt-BR bytecode cache path for a source file.
+
+    Follows importlib.util.cache_from_source() (including
+    sys.pycache_prefix and optimization levels), with the pt-BR tag.
+
+    Args:
+        source_path: Path to the .py source file
+
+    Returns:
+        The cache file path, or None when caching is not available
+    """
+    tag = cache_tag()
+    if tag is None:
+        return None
+
+    try:
+        default_path = importlib.util.cache_from_source(source_path)
+    except NotImplementedError:
+        return None
+
+    head, tail = os.path.split(default_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    # tail is '<stem>.<cache tag>[.opt-N].pyc'
+    rest = tail[len(stem) :].replace(sys.implementation.cache_tag, tag, 1)
+    return os.path.join(head, stem + rest)
+
+
+def plain_marker_path(source_path: str) -> Optional[str]:
+    """Get the path of the marker recording that a source is plain Python.
+
+    Args:
+        source_path: Path to the .py source file
+
+    Returns:
+        The marker path, or None when caching is not available
+    """
+    path = bytecode_path(source_path)
+    if path is None:
+        return None
+    return path[: -len(".pyc")] + ".plain"
+
+
+def _pack_uint32(value: int) -> bytes:
+    return (int(value) & 0xFFFFFFFF).to_bytes(4, "little")
+
+
+def source_header(source_mtime: float, source_size: int) -> bytes:
+    """Build the 16-byte .pyc header that validates a cache file.
+
+    Args:
+        source_mtime: Modification time of the source
+        source_size: Size in bytes of the source
+
+    Returns:
+        Magic number, flags (0: timestamp-based), mtime and size
+    """
+    return (
+        importlib.util.MAGIC_NUMBER
+        + _pack_uint32(0)
+        + _pack_uint32(source_mtime)
+        + _pack_uint32(source_size)
+    )
+
+
+def dump_bytecode(code, source_mtime: float, source_size: int) -> bytes:
+    """Serialize a code object with a timestamp-based .pyc header.
+
+    Args:
+        code: The compiled code object
+        source_mtime: Modification time of the pt-BR source
+        source_size: Size in bytes of the pt-BR source
+
+    Returns:
+        The cache file contents
+    """
+    return source_header(source_mtime, source_size) + marshal.dumps(code)
+
+
+def load_bytecode(data: bytes, source_mtime: float, source_size: int):
+    """Deserialize cache file contents if they match the source.
+
+    Args:
+        data: The cache file contents
+        source_mtime: Current modification time of the pt-BR source
+        source_size: Current size in bytes of the pt-BR source
+
+    Returns:
+        The code object, or None if the cache is stale or unreadable
+    """
+    if data[:16] != source_header(source_mtime, source_size):
+        return None
+
+    try:
+        return marshal.loads(data[16:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def write_atomic(path: str, data: bytes) -> bool:
+    """Write a file atomically, creating parent directories as needed.
+
+    Errors are swallowed: a cache that cannot be written is not fatal.
+    The temporary file is named after the process and thread, so threads
+    writing the same path do not share it, and it is removed on failure.
+
+    Args:
+        path: Destination path
+        data: File contents
+
+    Returns:
+        True if the file was written
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return False
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    written = False
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        written = True
+    except OSError:
+        pass
+    finally:
+        if not written:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    return written
+
+
+# ============================================================================
+# BYTECODE SHARED WITH CHILD PROCESSES
+# ============================================================================
+
+# Environment variable naming the shared bytecode directory
+SHARED_CACHE_ENV = "PT_BR_SHARED_CACHE"
+
+_shared_cache_lock = threading.Lock()
+
+
+def shared_cache_dir(create: bool = False) -> Optional[str]:
+    """Get the bytecode directory shared with child processes.
+
+    Args:
+        create: Create a temporary directory (and advertise it in the
+            environment) if there is none yet
+
+    Returns:
+        The directory, or None if there is none
+    """
+    directory = os.environ.get(SHARED_CACHE_ENV)
+    if directory or not create:
+        return directory or None
+
+    import atexit
+    import tempfile
+
+    with _shared_cache_lock:
+        directory = os.environ.get(SHARED_CACHE_ENV)
+        if directory:
+            return directory
+        try:
+            directory = tempfile.mkdtemp(prefix="pt_br-shared-")
+        except OSError:
+            return None
+        os.environ[SHARED_CACHE_ENV] = directory
+        atexit.register(_remove_shared_cache_dir, directory, os.getpid())
+    return directory
+
+
+def _remove_shared_cache_dir(directory: str, pid: int) -> None:
+    """Remove a shared directory, from the process that created it."""
+    if os.getpid() != pid:
+        return
+    import shutil
+
+    shutil.rmtree(directory, ignore_errors=True)
+    if os.environ.get(SHARED_CACHE_ENV) == directory:
+        del os.environ[SHARED_CACHE_ENV]
+
+
+def shared_bytecode_path(source_path: str, create: bool = False) -> Optional[str]:
+    """Get the shared bytecode path for a source file.
+
+    Files are named after the module and a checksum of the absolute
+    source path, so modules with the same name do not collide.
+
+    Args:
+        source_path: Path to the .py source file
+        create: Create the shared directory if there is none yet
+
+    Returns:
+        The cache file path, or None when there is no shared directory
+        or caching is not available
+    """
+    tag = cache_tag()
+    if tag is None:
+        return None
+    directory = shared_cache_dir(create)
+    if directory is None:
+        return None
+
+    import zlib
+
+    key = os.path.abspath(source_path).encode("utf-8", "surrogatepass")
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    checksum = f"{zlib.crc32(key):08x}{zlib.adler32(key):08x}"
+    return os.path.join(directory, f"{stem}-{checksum}.{tag}.pyc")
+
+
+# ============================================================================
+# IN-PROCESS TRANSLATION CACHE
+# ============================================================================
+
+
+class TranslationCache:
+    """Thread-safe LRU cache of translations, keyed by source content.
+
+    Keys are a BLAKE2b digest of the mapping hash and the source, so
+    byte-identical sources share one entry and entries made with other
+    mappings are never returned. The cache is bounded both by number of
+    entries and by the total size of the stored translations.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Maximum number of cached translations
+            max_bytes: Maximum total size of the cached translations
+        """
+        import hashlib
+
+        self._blake2b = hashlib.blake2b
+        self._salt = mapping_hash().encode("ascii")
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, source: str) -> bytes:
+        """Compute the cache key for a source."""
+        digest = self._blake2b(self._salt, digest_size=16)
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get(self, source: str) -> Optional[str]:
+        """Look up the translation of a source.
+
+        Args:
+            source: The pt-BR source code
+
+        Returns:
+            The cached translation, or None on a miss
+        """
+        key = self.key(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, source: str, translated: str) -> None:
+        """Store the translation of a source, evicting old entries.
+
+        Translations larger than max_bytes are not stored.
+
+        Args:
+            source: The pt-BR source code
+            translated: Its translation
+        """
+        size = sys.getsizeof(translated)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        key = self.key(source)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (translated, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self) -> dict:
+        """Get the cache counters and current size.
+
+        Returns:
+            Dict with hits, misses, evictions, entries, bytes,
+            max_entries and max_bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# The active translation cache; None while caching is disabled
+_translation_cache = None
+
+
+def enable_translation_cache(
+    max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024
+) -> TranslationCache:
+    """Turn on the in-process translation cache for translate_source().
+
+    Calling it again replaces the cache (and its counters) with a new one.
+
+    Args:
+        max_entries: Maximum number of cached translations
+        max_bytes: Maximum total size of the cached translations
+
+    Returns:
+        The new TranslationCache
+    """
+    global _translation_cache
+    _translation_cache = TranslationCache(max_entries, max_bytes)
+    return _translation_cache
+
+
+def disable_translation_cache() -> None:
+    """Turn off the in-process translation cache and drop its entries."""
+    global _translation_cache
+    _translation_cache = None
+
+
+def clear_translation_cache() -> None:
+    """Remove every entry from the translation cache, if it is enabled."""
+    if _translation_cache is not None:
+        _translation_cache.clear()
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Get the active translation cache, or None if it is disabled."""
+    return _translation_cache
+
+
+def translation_cache_info() -> Optional[dict]:
+    """Get the translation cache counters, or None if it is disabled."""
+    if _translation_cache is None:
+        return None
+    return _translation_cache.info()
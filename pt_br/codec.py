@@ -0,0 +1,203 @@
+"""The 'pt_br' source codec.
+
+A file that declares the codec in its encoding cookie:
+
+    # -*- coding: pt_br -*-
+    para i em intervalo(3):
+        imprimir(i)
+
+is translated while Python decodes it, so it runs with 'python script.py'
+and imports like any other module, without 'import pt_br' or the import
+hook. The regular __pycache__/*.pyc files cache the compiled code.
+
+The files are UTF-8; decoding translates them with translate_source(), and
+encoding is plain UTF-8 (nothing is translated back).
+
+Registration: pt_br_codec.pth, installed at the top of site-packages
+with the package, registers a codec search function at startup. The
+search function only imports pt_br when a file asks for the codec, so
+interpreters that never decode a marked file pay nothing. Outside an
+installed package (e.g. in a checkout), copy the .pth into site-packages
+or call register().
+
+Note: .pyc files are invalidated by the source's mtime and size only, so
+after upgrading pt_br marked files keep their old translation until they
+are edited (or their __pycache__ is deleted).
+"""
+
+import codecs
+from typing import Callable, Optional, Tuple
+
+CODEC_NAME = "pt_br"
+
+# A PEP 263 encoding declaration, as tokenize matches it
+_COOKIE = r"[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)"
+
+# File installed in site-packages, and its single line
+PTH_FILE = "pt_br_codec.pth"
+PTH_LINE = (
+    "import codecs; codecs.register(lambda name: "
+    '__import__("pt_br.codec").codec.search_function(name) '
+    'if name.lower().replace("-", "_") == "pt_br" else None)'
+)
+
+_registered = False
+
+
+def decode(data, errors: str = "strict") -> Tuple[str, int]:
+    """Decode UTF-8 pt-BR source into translated Python source.
+
+    Args:
+        data: The encoded source (bytes-like)
+        errors: UTF-8 error handling scheme
+
+    Returns:
+        (translated source, number of bytes consumed)
+    """
+    from .translator import translate_source
+
+    text = bytes(data).decode("utf-8", errors)
+    return translate_source(text), len(data)
+
+
+def encode(text: str, errors: str = "strict") -> Tuple[bytes, int]:
+    """Encode source as UTF-8.
+
+    Args:
+        text: The source
+        errors: UTF-8 error handling scheme
+
+    Returns:
+        (encoded bytes, number of characters consumed)
+    """
+    return text.encode("utf-8", errors), len(text)
+
+
+class IncrementalDecoder(codecs.BufferedIncrementalDecoder):
+    """Incremental decoder that translates once all input has arrived.
+
+    Python reads script files through an incremental decoder; translation
+    needs the whole source, so everything is buffered until the final
+    call.
+    """
+
+    def _buffer_decode(self, data, errors, final):
+        if not final:
+            return "", 0
+        return decode(data, errors)
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    """Incremental UTF-8 encoder."""
+
+    def encode(self, text, final=False):
+        return text.encode("utf-8", self.errors)
+
+
+def search_function(name: str) -> Optional[codecs.CodecInfo]:
+    """Codec search function for 'pt_br' (or 'pt-br').
+
+    Args:
+        name: The requested encoding name
+
+    Returns:
+        The CodecInfo of the pt_br codec, or None for other names
+    """
+    if not _is_codec_name(name):
+        return None
+    return codecs.CodecInfo(
+        name=CODEC_NAME,
+        encode=encode,
+        decode=decode,
+        incrementalencoder=IncrementalEncoder,
+        incrementaldecoder=IncrementalDecoder,
+    )
+
+
+def _is_codec_name(name: str) -> bool:
+    return name.lower().replace("-", "_") == CODEC_NAME
+
+
+def declares_codec(data: bytes) -> bool:
+    """Check whether source code declares the pt_br codec in its cookie.
+
+    Args:
+        data: The start of the source file (at least its first two lines)
+
+    Returns:
+        True if the encoding declaration names the codec
+    """
+    import re
+
+    if data.startswith(codecs.BOM_UTF8):
+        data = data[len(codecs.BOM_UTF8) :]
+    for line in data.split(b"\n", 2)[:2]:
+        match = re.match(_COOKIE.encode("ascii"), line)
+        if match:
+            return _is_codec_name(match.group(1).decode("ascii"))
+        if not re.match(rb"[ \t\f]*(?:#|\r?$)", line):
+            break  # Only a comment or blank line may come before the cookie
+    return False
+
+
+def source_encoding(readline: Callable[[], bytes]) -> Tuple[str, bool]:
+    """Detect the encoding of Python source, like tokenize.detect_encoding().
+
+    Files that declare the pt_br codec are UTF-8, and are reported as such:
+    decoding them with the codec (when it is registered) would translate
+    them, and callers that translate the text would do it twice.
+
+    Args:
+        readline: Returns the next line of the file as bytes; called at
+            most twice
+
+    Returns:
+        (encoding, whether the file declares the pt_br codec)
+
+    Raises:
+        SyntaxError: If the file declares an unknown or invalid encoding
+    """
+    import io
+    import tokenize
+
+    head = readline()
+    if head.endswith(b"\n"):
+        head += readline()
+    if declares_codec(head):
+        return ("utf-8-sig" if head.startswith(codecs.BOM_UTF8) else "utf-8"), True
+    return tokenize.detect_encoding(io.BytesIO(head).readline)[0], False
+
+
+def declare_utf8(source: str) -> str:
+    """Replace a pt_br encoding declaration with 'utf-8'.
+
+    Translated source is plain Python; left with the pt_br cookie, it
+    would be translated again whenever the codec decodes it.
+
+    Args:
+        source: Source code, or its first lines
+
+    Returns:
+        The source, with its encoding declaration naming UTF-8 if it
+        named the codec
+    """
+    import re
+
+    head = source.split("\n", 2)
+    for index, line in enumerate(head[:2]):
+        match = re.match(_COOKIE, line.lstrip("\ufeff"), re.ASCII)
+        if match:
+            if _is_codec_name(match.group(1)):
+                offset = len(line) - len(line.lstrip("\ufeff"))
+                start, end = match.start(1) + offset, match.end(1) + offset
+                head[index] = line[:start] + "utf-8" + line[end:]
+            break
+    return "\n".join(head)
+
+
+def register() -> None:
+    """Register the pt_br codec in this interpreter (once)."""
+    global _registered
+    if not _registered:
+        codecs.register(search_function)
+        _registered = True
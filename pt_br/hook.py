@@ -0,0 +1,550 @@
+"""Lightweight import hook registration.
+
+'import pt_br' sits at the top of every pt-BR script, so everything it
+runs is paid by every script. This module only uses modules that are
+already loaded at interpreter startup (plus importlib.machinery, which is
+tiny). The translator, and with it importlib.abc, re, tokenize and typing,
+is imported the first time a pt-BR module is actually loaded.
+"""
+
+import os
+import sys
+import zipimport
+import importlib.machinery
+
+from . import instrumentation
+
+# Top-level names of standard library modules (Python 3.10+)
+_STDLIB_MODULES = getattr(sys, "stdlib_module_names", frozenset())
+
+
+# Path components of directories where installers put packages
+_PACKAGE_DIRECTORIES = ("site-packages", "dist-packages")
+
+
+def _is_within(directory: str, root: str) -> bool:
+    """Check whether a directory is root or inside it."""
+    return directory == root or directory.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _archive_importer(entry):
+    """Get the zipimporter of a search path entry inside a zip archive.
+
+    Importers are cached in sys.path_importer_cache, as PathFinder does.
+
+    Returns:
+        The zipimport.zipimporter, or None if the entry is not in a zip
+        archive
+    """
+    if entry in sys.path_importer_cache:
+        importer = sys.path_importer_cache[entry]
+    elif not entry or os.path.isdir(entry):
+        return None
+    else:
+        try:
+            importer = zipimport.zipimporter(entry)
+        except zipimport.ZipImportError:
+            return None
+        sys.path_importer_cache[entry] = importer
+    return importer if isinstance(importer, zipimport.zipimporter) else None
+
+
+def _split_roots(value):
+    """Split an os.pathsep-separated list of directories from an env var."""
+    return [os.path.abspath(item) for item in value.split(os.pathsep) if item]
+
+
+def _find_pyproject(start):
+    """Find the nearest pyproject.toml at or above a directory."""
+    directory = start
+    while True:
+        candidate = os.path.join(directory, "pyproject.toml")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _pyproject_roots(path):
+    """Read include/exclude roots from the [tool.pt_br] table of a pyproject.
+
+    Args:
+        path: The pyproject.toml path
+
+    Returns:
+        (include, exclude) lists of absolute directories; empty when the
+        file has no [tool.pt_br] table or no TOML parser is available (a
+        RuntimeWarning says so: tomli is needed before Python 3.11)
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return [], []
+    # Most projects have no [tool.pt_br]: don't import a TOML parser for them
+    if b"tool.pt_br" not in data:
+        return [], []
+
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            import warnings
+
+            warnings.warn(
+                f"pt_br: ignoring [tool.pt_br] in {path}: install tomli to read it",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return [], []
+    try:
+        config = tomllib.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError):
+        return [], []
+
+    section = config.get("tool", {}).get("pt_br", {})
+    base = os.path.dirname(path)
+    roots = []
+    for key in ("include", "exclude"):
+        entries = section.get(key, [])
+        if isinstance(entries, str):
+            entries = [entries]
+        roots.append([os.path.abspath(os.path.join(base, entry)) for entry in entries])
+    return roots[0], roots[1]
+
+
+def load_roots(start=None):
+    """Load the include and exclude roots of the import hook.
+
+    Exclude roots always contain the Python installation (sys.prefix and
+    friends) and the site-packages directories. More come from
+    $PT_BR_INCLUDE / $PT_BR_EXCLUDE (os.pathsep-separated directories) and
+    from the 'include' / 'exclude' lists of the [tool.pt_br] table in the
+    nearest pyproject.toml (relative to that file).
+
+    Args:
+        start: Directory where the pyproject.toml search starts; defaults to
+            the main script's directory (sys.path[0]) or the working
+            directory
+
+    Returns:
+        (include, exclude) lists of absolute directories
+    """
+    exclude = {
+        os.path.abspath(prefix)
+        for prefix in (
+            sys.prefix,
+            sys.exec_prefix,
+            getattr(sys, "base_prefix", sys.prefix),
+            getattr(sys, "base_exec_prefix", sys.exec_prefix),
+        )
+    }
+    site = sys.modules.get("site")  # Not loaded with 'python -S'
+    if site is not None:
+        try:
+            exclude.update(site.getsitepackages())
+            exclude.add(site.getusersitepackages())
+        except AttributeError:  # Old virtualenv site.py
+            pass
+
+    include = _split_roots(os.environ.get("PT_BR_INCLUDE", ""))
+    exclude.update(_split_roots(os.environ.get("PT_BR_EXCLUDE", "")))
+
+    if start is None:
+        start = os.path.abspath(sys.path[0] if sys.path else "")
+    pyproject = _find_pyproject(start)
+    if pyproject is not None:
+        pyproject_include, pyproject_exclude = _pyproject_roots(pyproject)
+        include += pyproject_include
+        exclude.update(pyproject_exclude)
+
+    return include, sorted(exclude)
+
+
+class TranslatorFinder:
+    """Meta path finder that gives user modules the pt-BR loader.
+
+    Every import that reaches this finder is classified by the directories
+    it is searched in (see load_roots()): a directory is translated when
+    its longest matching root is an include root, or when no root matches,
+    no include roots are configured and it is not a site-packages directory.
+    The finder only searches translatable directories, and only returns a
+    spec when the module is found there (with PTBRSourceLoader for .py
+    files, and PTBRZipLoader for .py entries of zip archives on the path);
+    everything else goes straight to the default finders.
+
+    Classifications are cached per directory, and so are misses per module
+    name (for the current sys.path), until importlib.invalidate_caches().
+    """
+
+    def __init__(self):
+        """Initialize the finder with empty caches."""
+        self._roots = None
+        self._directories = {}
+        self._sys_path = None
+        self._sys_path_entries = None
+        self._misses = set()
+
+    def translatable(self, directory) -> bool:
+        """Check whether modules in a directory are translated.
+
+        Args:
+            directory: A sys.path entry or package directory
+
+        Returns:
+            True if .py files found there get the pt-BR loader
+        """
+        cached = self._directories.get(directory)
+        if cached is not None:
+            return cached
+        if not isinstance(directory, str):
+            return False
+
+        if self._roots is None:
+            self._roots = load_roots()
+        include, exclude = self._roots
+
+        path = os.path.abspath(directory)
+        best, result = "", None
+        for roots, value in ((exclude, False), (include, True)):
+            for root in roots:
+                if _is_within(path, root) and len(root) >= len(best):
+                    best, result = root, value
+        if result is None:
+            parts = path.split(os.sep)
+            result = not include and not any(
+                name in parts for name in _PACKAGE_DIRECTORIES
+            )
+
+        self._directories[directory] = result
+        return result
+
+    def _find(self, fullname, entries, target):
+        """Search translatable entries in order, like PathFinder.
+
+        Entries inside zip archives are searched with find_in_archive(),
+        since zipimport compiles a module's source while finding it. The
+        others go to PathFinder, a run of consecutive entries at a time.
+
+        Args:
+            fullname: The fully qualified module name
+            entries: The translatable search path entries
+            target: Unused
+
+        Returns:
+            The first spec found, or None
+        """
+        start = 0
+        for index, entry in enumerate(entries):
+            importer = _archive_importer(entry)
+            if importer is None:
+                continue
+            if start < index:
+                spec = importlib.machinery.PathFinder.find_spec(
+                    fullname, entries[start:index], target
+                )
+                if spec is not None and spec.origin is not None:
+                    return spec
+            from .archive import find_in_archive
+
+            spec = find_in_archive(fullname, importer)
+            if spec is not None:
+                return spec
+            start = index + 1
+        return importlib.machinery.PathFinder.find_spec(
+            fullname, entries[start:], target
+        )
+
+    def _search_path(self, path):
+        """Get the translatable entries of a search path.
+
+        Args:
+            path: The parent package's __path__, or None for sys.path
+
+        Returns:
+            (all entries, translatable entries)
+        """
+        if path is not None:
+            entries = list(path)
+            return entries, [entry for entry in entries if self.translatable(entry)]
+
+        if self._sys_path != sys.path:
+            self._sys_path = list(sys.path)
+            self._sys_path_entries = [
+                entry for entry in self._sys_path if self.translatable(entry)
+            ]
+            self._misses.clear()
+        return self._sys_path, self._sys_path_entries
+
+    def find_spec(self, fullname, path, target=None):
+        """Find a module and return a spec with the pt-BR loader.
+
+        Args:
+            fullname: The fully qualified module name
+            path: The search path
+            target: Unused
+
+        Returns:
+            A ModuleSpec, or None to let other finders handle the import
+        """
+        top_level = fullname.partition(".")[0]
+        # Don't translate the pt_br package itself, or the standard library
+        # (including submodules such as 'xml.dom', wherever they are)
+        if top_level == "pt_br" or top_level in _STDLIB_MODULES:
+            instrumentation.FINDER["skipped"] += 1
+            return None
+
+        entries, translatable = self._search_path(path)
+        if not translatable or fullname in self._misses:
+            instrumentation.FINDER["skipped"] += 1
+            return None
+
+        spec = self._find(fullname, translatable, target)
+        if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+            # Missing, a namespace package or an extension module
+            if spec is None and path is None:
+                self._misses.add(fullname)
+            instrumentation.FINDER["delegated"] += 1
+            return None
+
+        # A directory excluded from translation that comes earlier in the
+        # search path may shadow the module
+        earlier = []
+        for entry in entries:
+            if self.translatable(entry) and _is_within(
+                spec.origin, os.path.abspath(entry)
+            ):
+                break
+            if not self.translatable(entry):
+                earlier.append(entry)
+        if earlier:
+            shadow = importlib.machinery.PathFinder.find_spec(fullname, earlier)
+            if shadow is not None and shadow.origin is not None:
+                instrumentation.FINDER["delegated"] += 1
+                return None
+
+        instrumentation.FINDER["translated"] += 1
+        if isinstance(spec.loader, zipimport.zipimporter):
+            from .archive import PTBRZipLoader
+
+            spec.loader = PTBRZipLoader(fullname, spec.origin, spec.loader)
+        else:
+            from .translator import PTBRSourceLoader
+
+            spec.loader = PTBRSourceLoader(fullname, spec.origin)
+        return spec
+
+    def invalidate_caches(self):
+        """Forget the roots and cached classifications and misses."""
+        self._roots = None
+        self._directories.clear()
+        self._sys_path = None
+        self._sys_path_entries = None
+        self._misses.clear()
+
+
+def register_translator():
+    """Register the pt-BR translator in sys.meta_path.
+
+    Installs TranslatorFinder in front of the other finders (once), then
+    translates the main script if it is written in pt-BR. With
+    PT_BR_IMPORTTIME set, the finder is pt_br.importtime.TracingFinder.
+
+    Called when the pt_br module is imported.
+    """
+    if not any(isinstance(f, TranslatorFinder) for f in sys.meta_path):
+        if os.environ.get("PT_BR_IMPORTTIME"):
+            from .importtime import TracingFinder as finder_class
+        else:
+            finder_class = TranslatorFinder
+        sys.meta_path.insert(0, finder_class())
+
+    # Also handle the __main__ module (direct script execution)
+    _hook_main_module()
+
+
+# ASCII bytes that cannot be part of a name, for _mentions_vocabulary()
+_SEPARATORS = bytes(c for c in range(128) if not chr(c).isalnum() and c != ord("_"))
+_SEPARATOR_TABLE = bytes.maketrans(_SEPARATORS, b" " * len(_SEPARATORS))
+_vocabulary = None
+
+
+def _mentions_vocabulary(data: bytes) -> bool:
+    """Check whether source code contains a pt-BR word anywhere.
+
+    A much cheaper first pass than needs_translation(), with no regex or
+    tokenizer: the source is split into words and looked up in the
+    vocabulary. Words in strings and comments count, and so do built-in
+    names that are not called.
+
+    Args:
+        data: The source file contents
+
+    Returns:
+        False if the source certainly has nothing to translate
+    """
+    global _vocabulary
+    if _vocabulary is None:
+        from .mappings import ALL_TRANSLATIONS
+
+        _vocabulary = frozenset(word.encode("ascii") for word in ALL_TRANSLATIONS)
+    return not _vocabulary.isdisjoint(data.translate(_SEPARATOR_TABLE).split())
+
+
+def _is_marked_plain(path: str) -> bool:
+    """Check for an up-to-date .plain marker, without the translator.
+
+    Same check as PTBRSourceLoader.is_marked_plain(), for main scripts.
+
+    Args:
+        path: The source file path
+
+    Returns:
+        True if the source was found to need no translation
+    """
+    from . import cache
+
+    marker_path = cache.plain_marker_path(path)
+    if marker_path is None:
+        return False
+    try:
+        st = os.stat(path)
+        with open(marker_path, "rb") as f:
+            marker = f.read()
+    except OSError:
+        return False
+    if marker != cache.source_header(st.st_mtime, st.st_size):
+        return False
+    instrumentation.CACHE["plain"] += 1
+    return True
+
+
+def _importing_frame():
+    """Get the frame of the code running the current 'import pt_br'.
+
+    Returns:
+        The first frame outside the import machinery and this package
+    """
+    package_dir = __file__.rpartition(os.sep)[0]
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith("<frozen importlib") and not filename.startswith(
+            package_dir + os.sep
+        ):
+            return frame
+        frame = frame.f_back
+    return None
+
+
+def _hook_main_module():
+    """Run the rest of a pt-BR main script, translated.
+
+    This is for when a user runs 'python script.py' where script.py
+    contains pt-BR code with 'import pt_br' at the top. Python compiles
+    and starts running the script before pt_br is imported, so only code
+    that is still valid Python (e.g. calls to 'imprimir') can get this far;
+    scripts with pt-BR keywords must be run with 'python -m pt_br' or
+    declare the pt_br codec ('# coding: pt_br', see pt_br.codec), in which
+    case there is nothing left to do here.
+
+    Everything before the import has already run, so only the top-level
+    statements after it are translated, compiled (through the bytecode
+    cache, see MainScriptLoader) and executed in __main__, once the import
+    has finished (see _run_after_import()). The script then exits, so its
+    untranslated remainder never runs.
+
+    Nothing happens unless the import is a top-level statement of the
+    main script: not for 'python -m pt_br', the 'pt-br' launcher, test
+    runners or modules imported by the script. Scripts with no pt-BR
+    outside strings and comments are left alone, and get the same .plain
+    marker as plain modules; scripts with no vocabulary word at all are
+    recognized without importing the translator.
+    """
+    main = sys.modules.get("__main__")
+    main_file = getattr(main, "__file__", None)
+    if not main_file or getattr(main, "__name__", None) != "__main__":
+        return
+
+    frame = _importing_frame()
+    if (
+        frame is None
+        or frame.f_globals is not main.__dict__
+        or frame.f_code.co_name != "<module>"
+    ):
+        return
+
+    start = instrumentation.clock()
+    try:
+        with open(main_file, "rb") as f:
+            data = f.read()
+    except OSError:
+        return
+    instrumentation.READ["files"] += 1
+    instrumentation.READ["bytes"] += len(data)
+    instrumentation.READ["seconds"] += instrumentation.clock() - start
+    head = data.split(b"\n", 2)[:2]
+    # pt_br.codec imports typing: only load it for files with a cookie
+    if any(b"coding" in line for line in head):
+        from . import codec
+
+        if codec.declares_codec(data):
+            # Python already translated it through the pt_br codec
+            return
+    if not _mentions_vocabulary(data) or _is_marked_plain(main_file):
+        # Plain Python: let the script go on by itself
+        return
+
+    from .translator import MainScriptLoader, needs_translation, translate_source
+
+    loader = MainScriptLoader(main_file, frame.f_lineno)
+    code, stats = loader.get_cached_code(main_file)
+    if code is None:
+        import importlib.util
+
+        try:
+            source = importlib.util.decode_source(data)
+        except (SyntaxError, UnicodeError):
+            return
+
+        if not needs_translation(source):
+            loader.mark_plain(main_file, stats)
+            return
+        code = loader.compile_rest(translate_source(source), main_file)
+        loader.cache_code(main_file, code, stats)
+
+    _run_after_import(frame, code, main.__dict__)
+
+
+def _run_after_import(frame, code, namespace) -> None:
+    """Run the rest of the main script once 'import pt_br' has finished.
+
+    The import is still running here, and other threads started by the
+    script would wait for it to finish before they could 'import pt_br'.
+    So the code runs from a trace function (sys.settrace) on the main
+    script's frame instead, at its first instruction after the import,
+    and the script exits from there. Under a debugger or coverage tool,
+    which owns the trace function, the code runs right away instead.
+
+    Args:
+        frame: The main script's frame, running the import
+        code: The code of the rest of the script
+        namespace: The __main__ module's namespace
+    """
+    if sys.gettrace() is not None:
+        exec(code, namespace)
+        raise SystemExit
+
+    def run_rest(frame, event, arg):
+        sys.settrace(None)
+        frame.f_trace = None
+        exec(code, namespace)
+        raise SystemExit
+
+    frame.f_trace = run_rest
+    frame.f_trace_opcodes = True
+    sys.settrace(lambda frame, event, arg: None)
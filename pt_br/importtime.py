@@ -0,0 +1,169 @@
+"""Import-time tree of pt-BR modules, like 'python -X importtime'.
+
+With PT_BR_IMPORTTIME=1 in the environment, register_translator()
+installs TracingFinder instead of TranslatorFinder. Every module it gives
+the pt-BR loader is timed in five phases:
+- find: TranslatorFinder.find_spec() for the module
+- read: getting the code, except translating and compiling: reading the
+  source or the bytecode cache, checking whether it needs translation,
+  and the stock loader for plain modules
+- translate: translate_source()
+- compile: compiling the translated code
+- exec: running the module body, minus the pt-BR modules it imports
+
+When a top-level import finishes, its tree is printed to stderr, one
+row per module, parents before children and indented by nesting (a
+header row comes first). Each row has two groups of the five phase
+times, in microseconds: the module's own ('self') times, then its times
+including the pt-BR modules it imported ('cumulative'), then the module
+name. Every line starts with 'pt_br importtime:', so the output can be
+filtered out of the rest of stderr and diffed.
+
+Modules loaded by other finders (the standard library, site-packages)
+count towards the 'exec' time of the module that imports them.
+"""
+
+import sys
+import threading
+
+from . import instrumentation
+from .archive import PTBRZipLoader
+from .hook import TranslatorFinder
+from .translator import PTBRSourceLoader
+
+PHASES = ("find", "read", "translate", "compile", "exec")
+
+_local = threading.local()
+_header_printed = False
+
+
+class _Node:
+    """Times of one module load and the pt-BR modules it imported."""
+
+    __slots__ = ("name", "times", "children")
+
+    def __init__(self, name: str, find: float):
+        self.name = name
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.times["find"] = find
+        self.children = []
+
+    def cumulative(self) -> dict:
+        """Get the times including the children, per phase."""
+        totals = dict(self.times)
+        for child in self.children:
+            for phase, seconds in child.cumulative().items():
+                totals[phase] += seconds
+        return totals
+
+
+def _stack() -> list:
+    """Get the stack of modules being loaded by this thread."""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def format_tree(node: _Node, depth: int = 0) -> list:
+    """Format a module and its children as rows (see the module docstring).
+
+    Args:
+        node: The top-level module
+        depth: Nesting level of the module
+
+    Returns:
+        The lines, without line endings
+    """
+    cumulative = node.cumulative()
+    own = " ".join(f"{round(node.times[phase] * 1e6):>9}" for phase in PHASES)
+    total = " ".join(f"{round(cumulative[phase] * 1e6):>9}" for phase in PHASES)
+    lines = [f"pt_br importtime: {own} | {total} | {'  ' * depth}{node.name}"]
+    for child in node.children:
+        lines.extend(format_tree(child, depth + 1))
+    return lines
+
+
+def header() -> str:
+    """Get the header row, naming the columns of format_tree()."""
+    phases = " ".join(f"{phase:>9}" for phase in PHASES)
+    return f"pt_br importtime: {phases} | {phases} | module"
+
+
+class _Traced:
+    """Mixin for pt-BR loaders that times the phases of loading a module."""
+
+    # Seconds spent finding the module, set by TracingFinder
+    find = 0.0
+
+    def exec_module(self, module) -> None:
+        """Load and run the module, recording its times in the tree."""
+        clock = instrumentation.clock
+        node = _Node(module.__name__, self.find)
+        stack = _stack()
+        stack.append(node)
+        start = loaded = clock()
+        try:
+            translate = instrumentation.TRANSLATE["seconds"]
+            compile_ = instrumentation.COMPILE["seconds"]
+            code = self.get_code(module.__name__)
+            loaded = clock()
+            node.times["translate"] = instrumentation.TRANSLATE["seconds"] - translate
+            node.times["compile"] = instrumentation.COMPILE["seconds"] - compile_
+            node.times["read"] = max(
+                0.0, loaded - start - node.times["translate"] - node.times["compile"]
+            )
+
+            exec(code, module.__dict__)
+        finally:
+            children = sum(sum(child.cumulative().values()) for child in node.children)
+            node.times["exec"] = max(0.0, clock() - loaded - children)
+            stack.pop()
+            if stack:
+                stack[-1].children.append(node)
+            else:
+                _print_tree(node)
+
+
+class TracingLoader(_Traced, PTBRSourceLoader):
+    """PTBRSourceLoader that times the phases of loading its module."""
+
+
+class TracingZipLoader(_Traced, PTBRZipLoader):
+    """PTBRZipLoader that times the phases of loading its module."""
+
+
+def _print_tree(node: _Node) -> None:
+    """Write a finished top-level import to stderr."""
+    global _header_printed
+    lines = [] if _header_printed else [header()]
+    _header_printed = True
+    lines.extend(format_tree(node))
+    sys.stderr.write("".join(f"{line}\n" for line in lines))
+
+
+class TracingFinder(TranslatorFinder):
+    """TranslatorFinder whose pt-BR modules are timed by the loaders above."""
+
+    def find_spec(self, fullname, path, target=None):
+        """Find a module, timing the search for pt-BR modules.
+
+        Args:
+            fullname: The fully qualified module name
+            path: The search path
+            target: Unused
+
+        Returns:
+            A ModuleSpec, or None to let other finders handle the import
+        """
+        start = instrumentation.clock()
+        spec = super().find_spec(fullname, path, target)
+        if spec is not None:
+            find = instrumentation.clock() - start
+            if isinstance(spec.loader, PTBRZipLoader):
+                loader = TracingZipLoader(fullname, spec.origin, spec.loader.importer)
+            else:
+                loader = TracingLoader(fullname, spec.origin)
+            loader.find = find
+            spec.loader = loader
+        return spec
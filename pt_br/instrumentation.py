@@ -0,0 +1,98 @@
+"""Process-wide counters and timers for everything pt_br does.
+
+Use these to tell whether a slow process is spending its time in pt_br
+or in the code it runs. Counters are updated as pt_br works:
+- read: pt-BR source files read by the loaders (files, bytes, seconds)
+- translate: translations by translate_source(), translate_stream() and
+  TranslationSession (calls, bytes in and out, seconds), and how many
+  times each pt-BR word was replaced; cache and store hits do not count
+- compile: compiling translated code (calls, seconds)
+- cache: pt-BR bytecode cache hits, misses and writes, and plain-Python
+  markers found (modules handed to the stock loader untranslated)
+- finder: TranslatorFinder decisions. 'translated' means the module got the
+  pt-BR loader. 'skipped' means it was not searched: pt_br itself, the
+  standard library, excluded directories or a known miss. 'delegated' means
+  it was searched but left to the default finders.
+
+stats() returns a snapshot and reset_stats() zeroes everything. With
+PT_BR_STATS=path in the environment, the snapshot is written to that
+file as JSON when the interpreter exits. '{pid}' in the path is replaced
+by the process id.
+
+pt_br.hook imports this module, so it must stay cheap to import. Updates
+are plain dict operations, not locked: counts from concurrent imports in
+several threads are approximate.
+"""
+
+import os
+import sys
+import time
+
+# Sections of the snapshot; updated in place, so callers may keep them
+READ = {"files": 0, "bytes": 0, "seconds": 0.0}
+TRANSLATE = {"calls": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+COMPILE = {"calls": 0, "seconds": 0.0}
+CACHE = {"hits": 0, "misses": 0, "writes": 0, "plain": 0}
+FINDER = {"translated": 0, "skipped": 0, "delegated": 0}
+# pt-BR word -> number of times it was replaced
+REPLACEMENTS = {}
+
+_SECTIONS = {
+    "read": READ,
+    "translate": TRANSLATE,
+    "compile": COMPILE,
+    "cache": CACHE,
+    "finder": FINDER,
+}
+
+clock = time.perf_counter
+
+
+def utf8_length(text: str) -> int:
+    """Get the size of a string in UTF-8 bytes."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8", "surrogatepass"))
+
+
+def stats() -> dict:
+    """Get a snapshot of the counters.
+
+    Returns:
+        Dict of section ('read', 'translate', 'compile', 'cache',
+        'finder') -> counters; 'translate' also has 'replacements', a
+        dict of pt-BR word -> count
+    """
+    snapshot = {name: dict(section) for name, section in _SECTIONS.items()}
+    snapshot["translate"]["replacements"] = dict(REPLACEMENTS)
+    return snapshot
+
+
+def reset_stats() -> None:
+    """Set every counter back to zero."""
+    for section in _SECTIONS.values():
+        for key, value in section.items():
+            section[key] = type(value)()
+    REPLACEMENTS.clear()
+
+
+def dump_stats(path: str) -> None:
+    """Write the snapshot to a file as JSON (errors go to stderr).
+
+    Args:
+        path: The file path; '{pid}' is replaced by the process id
+    """
+    import json
+
+    try:
+        with open(path.replace("{pid}", str(os.getpid())), "w") as f:
+            json.dump(stats(), f, indent=2, sort_keys=True)
+            f.write("\n")
+    except OSError as e:
+        print(f"Warning: could not write pt_br stats: {e}", file=sys.stderr)
+
+
+if os.environ.get("PT_BR_STATS"):
+    import atexit
+
+    atexit.register(dump_stats, os.environ["PT_BR_STATS"])
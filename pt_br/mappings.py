@@ -7,6 +7,7 @@ for the translator.
 Structure:
     - PT_BR_TO_PYTHON: Main mapping dictionary
     - Organized by category for clarity
+    - get_matcher(): One compiled regex over the whole vocabulary
 """
 
 # ============================================================================
@@ -83,11 +84,15 @@ PT_BR_BUILTINS = {
 PT_BR_TO_PYTHON = {**PT_BR_KEYWORDS, **PT_BR_BUILTINS}
 
 # ============================================================================
-# REVERSE MAPPING (For debugging/introspection)
+# REVERSE MAPPING (Python to pt-BR, see translator.untranslate_source)
 # ============================================================================
 
 PYTHON_TO_PT_BR = {v: k for k, v in PT_BR_TO_PYTHON.items()}
 
+PYTHON_KEYWORDS = {v: k for k, v in PT_BR_KEYWORDS.items()}
+
+PYTHON_BUILTINS = {v: k for k, v in PT_BR_BUILTINS.items()}
+
 # ============================================================================
 # CATEGORIES FOR REFERENCE
 # ============================================================================
@@ -112,6 +117,142 @@ WORD_PATTERN = r"\b{}\b"
 # Pattern for function call detection
 FUNCTION_CALL_PATTERN = r"\b{}(?=\()"
 
+# ============================================================================
+# COMPILED MATCHER
+# ============================================================================
+
+
+class VocabularyMatcher:
+    """Compiled regexes covering the whole PT_BR_TO_PYTHON vocabulary.
+
+    Matches are split into two classes, mirroring the translator:
+    - keyword: a keyword as a whole word (WORD_PATTERN)
+    - call: a built-in function at a call site (FUNCTION_CALL_PATTERN)
+
+    Attributes:
+        keyword_pattern: Regex matching keywords only
+        call_pattern: Regex matching built-in call sites only
+        pattern: Regex matching both, with 'keyword' and 'call' groups
+    """
+
+    def __init__(self, keywords, builtins):
+        """Compile the patterns.
+
+        Args:
+            keywords: pt-BR keywords, matched as whole words
+            builtins: pt-BR built-in function names, matched at call sites
+        """
+        import re
+
+        keyword_words = _trie_regex(keywords)
+        call_words = _trie_regex(builtins)
+
+        self.keyword_pattern = re.compile(WORD_PATTERN.format(keyword_words))
+        self.call_pattern = re.compile(FUNCTION_CALL_PATTERN.format(call_words))
+        self.pattern = re.compile(
+            "(?P<keyword>{})|(?P<call>{})".format(
+                WORD_PATTERN.format(keyword_words),
+                FUNCTION_CALL_PATTERN.format(call_words),
+            )
+        )
+
+    def search(self, source: str, pos: int = 0):
+        """Find the first keyword or built-in call in the source.
+
+        This is a plain text scan: strings and comments are not skipped.
+
+        Args:
+            source: The source code string
+            pos: Where to start searching
+
+        Returns:
+            A match object (see the 'keyword' and 'call' groups), or None
+        """
+        return self.pattern.search(source, pos)
+
+    def finditer(self, source: str):
+        """Iterate over every keyword and built-in call in the source."""
+        return self.pattern.finditer(source)
+
+
+def _trie_regex(words) -> str:
+    """Build a regex alternation from words, sharing common prefixes.
+
+    For example ['se', 'senao', 'senao_se'] becomes 'se(?:nao(?:_se)?)?',
+    so the regex engine never retries a prefix it has already matched.
+
+    Args:
+        words: The words to match
+
+    Returns:
+        A non-capturing regex group matching exactly the given words
+    """
+    import re
+
+    if not words:
+        # An empty alternation would match the empty string everywhere
+        return "(?!)"
+
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        optional = "" in node
+        branches = [
+            re.escape(char) + render(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return "(?:" + render(trie) + ")"
+
+
+_matcher = None
+_reverse_matcher = None
+
+
+def get_matcher() -> VocabularyMatcher:
+    """Get the compiled matcher for the whole vocabulary.
+
+    Built from PT_BR_KEYWORDS and PT_BR_BUILTINS on first use, then cached.
+
+    Returns:
+        The shared VocabularyMatcher instance
+    """
+    global _matcher
+    if _matcher is None:
+        _matcher = VocabularyMatcher(PT_BR_KEYWORDS, PT_BR_BUILTINS)
+    return _matcher
+
+
+def get_reverse_matcher() -> VocabularyMatcher:
+    """Get the compiled matcher for reverse translation.
+
+    Matches the Python words of PYTHON_KEYWORDS and PYTHON_BUILTINS, and
+    also the pt-BR words, which must not appear in code being translated
+    to pt-BR. Built on first use, then cached.
+
+    Returns:
+        The shared VocabularyMatcher instance
+    """
+    global _reverse_matcher
+    if _reverse_matcher is None:
+        _reverse_matcher = VocabularyMatcher(
+            [*PYTHON_KEYWORDS, *PT_BR_KEYWORDS], [*PYTHON_BUILTINS, *PT_BR_BUILTINS]
+        )
+    return _reverse_matcher
+
+
 # Debug: Print mapping statistics
 if __name__ == "__main__":
     print("=" * 70)
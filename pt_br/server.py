@@ -0,0 +1,329 @@
+"""Pre-fork server that runs pt-BR scripts from a warm interpreter.
+
+Usage:
+    pt-br --servidor [--socket PATH]
+
+Every 'pt-br script.py' normally pays for interpreter startup, importing
+pt_br, building the vocabulary matcher and translating the script. The
+server does that work once: it imports and warms up pt_br, listens on a
+Unix socket and forks a child for every request. The child takes over
+the client's stdin/stdout/stderr (passed over the socket), working
+directory, environment and argv, and runs the script with run_script().
+
+While the server is running, the 'pt-br' launcher sends it its requests
+instead of running the script itself; it falls back to running locally
+when no server answers. Set PT_BR_SERVER=0 to always run locally.
+
+Socket location: $PT_BR_SERVER_SOCKET, or 'pt_br-<uid>/servidor.sock'
+in $XDG_RUNTIME_DIR (or $TMPDIR, or /tmp). The server refuses a per-user
+directory that is not a real directory owned by the user with mode 0700,
+and the launcher only talks to a server running as the same user: the
+request carries the client's environment and stdio.
+
+Protocol (all integers are 4-byte big-endian):
+    client -> server: payload length, with the three stdio file
+                      descriptors attached (SCM_RIGHTS), then the payload:
+                      NUL-separated cwd, argc, argv..., 'KEY=VALUE'...
+    server -> client: pid of the child running the script, then its exit
+                      status once it finishes (negative: killed by signal)
+"""
+
+import os
+import sys
+import stat
+import array
+import socket
+import struct
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+_INT = struct.Struct("!i")
+
+
+def socket_path() -> str:
+    """Get the path of the server socket.
+
+    The 'pt-br' launcher computes the same path without importing pt_br.
+
+    Returns:
+        $PT_BR_SERVER_SOCKET, or a per-user path in the runtime directory
+    """
+    override = os.environ.get("PT_BR_SERVER_SOCKET")
+    if override:
+        return override
+
+    return os.path.join(socket_dir(), "servidor.sock")
+
+
+def socket_dir() -> str:
+    """Get the per-user directory of the default server socket."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(base, f"pt_br-{os.getuid()}")
+
+
+def make_private_dir(path: str) -> None:
+    """Create a directory only the current user can use, or check it.
+
+    The default socket directory may live in a shared directory like
+    /tmp, where another user could create it first.
+
+    Args:
+        path: The directory path
+
+    Raises:
+        OSError: If the path is not a real directory owned by the current
+            user with mode 0700
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise OSError(f"{path} is not a directory")
+    if st.st_uid != os.getuid():
+        raise OSError(f"{path} is owned by another user")
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        raise OSError(f"{path} must have mode 0700, not {stat.S_IMODE(st.st_mode):o}")
+
+
+def encode_request(cwd: str, argv: List[str], environ: Dict[str, str]) -> bytes:
+    """Encode a request payload (see the module docstring)."""
+    fields = [cwd, str(len(argv))] + list(argv)
+    fields += [f"{key}={value}" for key, value in environ.items()]
+    return b"\0".join(os.fsencode(field) for field in fields)
+
+
+def decode_request(payload: bytes) -> Tuple[str, List[str], Dict[str, str]]:
+    """Decode a request payload into (cwd, argv, environ)."""
+    fields = [os.fsdecode(field) for field in payload.split(b"\0")]
+    argc = int(fields[1])
+    argv = fields[2 : 2 + argc]
+    environ = dict(field.split("=", 1) for field in fields[2 + argc :] if "=" in field)
+    return fields[0], argv, environ
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
+
+
+def _exit_code(status: int) -> int:
+    """Convert a wait() status to an exit code (negative for signals)."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def warm_up() -> None:
+    """Do the work every request would otherwise repeat."""
+    import types  # noqa: F401  (used by run_script)
+    import traceback  # noqa: F401
+
+    import pt_br  # noqa: F401
+    from . import cache, __main__  # noqa: F401
+    from .mappings import get_matcher
+    from .translator import translate_source
+
+    get_matcher()
+    cache.cache_tag()
+    compile(translate_source("se Verdadeiro:\n    imprimir(1)\n"), "<warm-up>", "exec")
+
+
+def _reopen_stdio() -> None:
+    """Point sys.stdin/stdout/stderr at the (new) file descriptors 0-2."""
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+
+
+def _run_child(conn: socket.socket, listener: socket.socket, wakeup: int) -> int:
+    """Run one request in a forked child.
+
+    Returns:
+        The script's exit code
+    """
+    code = 1
+    try:
+        import signal
+
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        listener.close()
+        os.close(wakeup)
+
+        fds = array.array("i")
+        header, ancillary, _, _ = conn.recvmsg(
+            _INT.size, socket.CMSG_SPACE(3 * fds.itemsize)
+        )
+        for level, kind, data in ancillary:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.frombytes(data[: len(data) - (len(data) % fds.itemsize)])
+        (length,) = _INT.unpack(header)
+        cwd, argv, environ = decode_request(_recv_exactly(conn, length))
+        conn.close()
+
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+        for fd in fds:
+            if fd > 2:
+                os.close(fd)
+        _reopen_stdio()
+
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(environ)
+        # Like 'python script.py': the script's directory comes first
+        sys.path.insert(0, os.path.dirname(os.path.abspath(argv[0])))
+
+        from .__main__ import run_script
+
+        try:
+            run_script(argv[0], argv[1:])
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except KeyboardInterrupt:
+            code = 130
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+    return code & 0xFF
+
+
+def serve(path: Optional[str] = None) -> None:
+    """Warm up and serve requests until SIGTERM or Ctrl+C.
+
+    Every request runs in a forked child, in which this function raises
+    SystemExit with the script's exit code once the script finishes: the
+    child then shuts down like 'python script.py' would, running atexit
+    handlers and waiting for non-daemon threads.
+
+    Args:
+        path: Socket path; defaults to socket_path()
+
+    Raises:
+        OSError: If another server is already listening on the socket, or
+            the default socket directory is not private to the user
+    """
+    import select
+    import signal
+
+    path = path or socket_path()
+    if os.path.dirname(path) == socket_dir():
+        make_private_dir(socket_dir())
+    else:
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # Left behind by a server that died
+        else:
+            raise OSError(f"a server is already listening on {path}")
+        finally:
+            probe.close()
+
+    warm_up()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(128)
+
+    # SIGCHLD wakes up select() through this pipe
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    server_pid = os.getpid()
+    children = {}
+    try:
+        # Inside the try: a SIGTERM right after this must still clean up
+        print(f"Listening on {path}", flush=True)
+        while True:
+            ready, _, _ = select.select([listener, wakeup_read], [], [])
+
+            if listener in ready:
+                conn, _ = listener.accept()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(wakeup_read)
+                    sys.exit(_run_child(conn, listener, wakeup_write))
+                try:
+                    conn.sendall(_INT.pack(pid))
+                except OSError:
+                    pass
+                children[pid] = conn
+
+            if wakeup_read in ready:
+                try:
+                    while os.read(wakeup_read, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+                while children:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                    if pid == 0:
+                        break
+                    conn = children.pop(pid, None)
+                    if conn is not None:
+                        try:
+                            conn.sendall(_INT.pack(_exit_code(status)))
+                        except OSError:
+                            pass
+                        conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.getpid() == server_pid:
+            signal.set_wakeup_fd(-1)
+            listener.close()
+            for conn in children.values():
+                conn.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for 'pt-br --servidor'."""
+    parser = argparse.ArgumentParser(
+        prog="pt-br --servidor",
+        description="Run pt-BR scripts from a warm, pre-forking server.",
+    )
+    parser.add_argument("--socket", help=f"socket path (default: {socket_path()})")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        print("Error: The server needs Unix sockets and fork()")
+        return 1
+
+    try:
+        serve(args.socket)
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
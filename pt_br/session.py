@@ -0,0 +1,297 @@
+"""Incremental retranslation of a source that is being edited.
+
+Editors that show the Python view of a pt-BR buffer would otherwise call
+translate_source() on the whole buffer after every keystroke. A
+TranslationSession keeps the source split into logical lines (see
+pt_br.translator.logical_lines), each with its translation. An edit only
+retokenizes the logical lines it touches, plus any following lines whose
+grouping it changes (e.g. after opening a bracket or a triple-quoted
+string), and reports the matching edit to the translation.
+
+Example:
+    session = TranslationSession("se x:\\n    imprimir(x)\\n")
+    session.edit(0, 2, "enquanto")
+    session.translation  # 'while x:\\n    print(x)\\n'
+"""
+
+import io
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Tuple
+
+from .translator import _translate, logical_lines
+
+
+# Target number of chunks per group (see TranslationSession)
+_GROUP_SIZE = 64
+
+
+class TranslationSession:
+    """A source and its translation, kept in sync through edits.
+
+    Both are stored as parallel lists of chunks, one per logical line.
+    Consecutive chunks are grouped, and every group keeps its number of
+    chunks and its length in the source and in the translation. Finding
+    the chunk at an offset sums group lengths and then walks one group,
+    and an edit only recounts the groups it touched, so neither costs
+    time proportional to the whole source. Joined strings are computed
+    on demand and cached until the next edit.
+    """
+
+    def __init__(self, source: str = ""):
+        """Translate a source and start tracking it.
+
+        Args:
+            source: The initial pt-BR source code
+        """
+        self.reset(source)
+
+    def reset(self, source: str) -> None:
+        """Replace the whole source (translating it from scratch).
+
+        Args:
+            source: The new pt-BR source code
+        """
+        self._source_chunks = list(logical_lines(_split_lines(source)))
+        self._translated_chunks = [_translate(chunk) for chunk in self._source_chunks]
+        (
+            self._group_sizes,
+            self._group_source_lengths,
+            self._group_translated_lengths,
+        ) = self._groups(0, len(self._source_chunks))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._source = None
+        self._translation = None
+
+    @property
+    def source(self) -> str:
+        """The current pt-BR source code."""
+        if self._source is None:
+            self._source = "".join(self._source_chunks)
+        return self._source
+
+    @property
+    def translation(self) -> str:
+        """The translation of the current source."""
+        if self._translation is None:
+            self._translation = "".join(self._translated_chunks)
+        return self._translation
+
+    def _groups(self, start: int, end: int) -> Tuple[List[int], List[int], List[int]]:
+        """Group a range of chunks.
+
+        Args:
+            start: Index of the first chunk
+            end: Index after the last chunk
+
+        Returns:
+            (chunks per group, source lengths, translated lengths)
+        """
+        sizes, source_lengths, translated_lengths = [], [], []
+        for group_start in range(start, end, _GROUP_SIZE):
+            group_end = min(group_start + _GROUP_SIZE, end)
+            sizes.append(group_end - group_start)
+            source_lengths.append(
+                sum(map(len, self._source_chunks[group_start:group_end]))
+            )
+            translated_lengths.append(
+                sum(map(len, self._translated_chunks[group_start:group_end]))
+            )
+        return sizes, source_lengths, translated_lengths
+
+    def _locate(self, offset: int) -> Tuple[int, int, int]:
+        """Find the chunk containing a source offset.
+
+        An offset at the end of the source is in the last chunk.
+
+        Args:
+            offset: Offset in the source
+
+        Returns:
+            (chunk index, its start in the source, its start in the
+            translation); (0, 0, 0) when there are no chunks
+        """
+        if not self._source_chunks:
+            return 0, 0, 0
+        ends = list(accumulate(self._group_source_lengths))
+        group = min(bisect_right(ends, offset), len(ends) - 1)
+        index = sum(self._group_sizes[:group])
+        start = ends[group] - self._group_source_lengths[group]
+        translated_start = sum(self._group_translated_lengths[:group])
+        last = index + self._group_sizes[group] - 1
+        while index < last:
+            length = len(self._source_chunks[index])
+            if offset < start + length:
+                break
+            start += length
+            translated_start += len(self._translated_chunks[index])
+            index += 1
+        return index, start, translated_start
+
+    def _replace_chunks(
+        self,
+        first: int,
+        last: int,
+        source_chunks: List[str],
+        translated_chunks: List[str],
+    ) -> None:
+        """Replace chunks first..last and regroup the groups they were in.
+
+        Args:
+            first: Index of the first replaced chunk
+            last: Index of the last replaced chunk
+            source_chunks: The new source chunks
+            translated_chunks: Their translations
+        """
+        group_ends = list(accumulate(self._group_sizes))
+        first_group = bisect_right(group_ends, first)
+        last_group = min(bisect_right(group_ends, last), len(group_ends) - 1)
+        if len(group_ends) > last_group + 1 and (
+            self._group_sizes[last_group] < _GROUP_SIZE // 2
+            or self._group_sizes[last_group + 1] < _GROUP_SIZE // 2
+        ):
+            # Merge small groups into their neighbour, so deletions do not
+            # leave many tiny groups behind
+            last_group += 1
+        start = group_ends[first_group - 1] if first_group else 0
+        end = group_ends[last_group] if group_ends else 0
+
+        end += len(source_chunks) - len(self._source_chunks[first : last + 1])
+        self._source_chunks[first : last + 1] = source_chunks
+        self._translated_chunks[first : last + 1] = translated_chunks
+
+        groups = self._groups(start, end)
+        self._group_sizes[first_group : last_group + 1] = groups[0]
+        self._group_source_lengths[first_group : last_group + 1] = groups[1]
+        self._group_translated_lengths[first_group : last_group + 1] = groups[2]
+
+    def edit(
+        self, offset: int, removed: int, inserted: str = ""
+    ) -> Tuple[int, int, str]:
+        """Apply a text edit to the source and retranslate what it affects.
+
+        Args:
+            offset: Offset in the source where the edit starts
+            removed: Number of characters removed at offset
+            inserted: Text inserted at offset
+
+        Returns:
+            The same edit expressed on the translation, as
+            (offset, removed, inserted)
+
+        Raises:
+            ValueError: If the edit is outside the source
+        """
+        length = sum(self._group_source_lengths)
+        if offset < 0 or removed < 0 or offset + removed > length:
+            raise ValueError(
+                f"Edit ({offset}, {removed}) is outside the source (length {length})"
+            )
+        if not removed and not inserted:
+            return 0, 0, ""
+
+        # First and last chunks touched by the edit; an edit at the very end
+        # extends the last chunk, which may not end with a newline
+        first, region_start, translated_offset = self._locate(offset)
+        last, last_start, _ = self._locate(offset + removed)
+        if removed and last_start == offset + removed and last > first:
+            last -= 1
+
+        old_region = "".join(self._source_chunks[first : last + 1])
+        local = offset - region_start
+        new_region = old_region[:local] + inserted + old_region[local + removed :]
+
+        new_chunks, last = self._resegment(new_region, last)
+
+        old_translated = "".join(self._translated_chunks[first : last + 1])
+        new_translated_chunks = [_translate(chunk) for chunk in new_chunks]
+        new_translated = "".join(new_translated_chunks)
+
+        self._replace_chunks(first, last, new_chunks, new_translated_chunks)
+        self._invalidate()
+
+        return _diff(translated_offset, old_translated, new_translated)
+
+    def _resegment(self, region: str, last: int) -> Tuple[List[str], int]:
+        """Split an edited region into logical lines.
+
+        Following chunks are pulled in until a new chunk boundary falls on
+        an old one, from where the old grouping is still valid.
+
+        Args:
+            region: The edited text of the touched chunks
+            last: Index of the last touched chunk
+
+        Returns:
+            (new chunks, index of the last old chunk they replace)
+        """
+        boundaries = {len(region): last}
+        following = last
+
+        def texts() -> Iterator[str]:
+            nonlocal following
+            yield region
+            end = len(region)
+            while following + 1 < len(self._source_chunks):
+                following += 1
+                chunk = self._source_chunks[following]
+                end += len(chunk)
+                boundaries[end] = following
+                yield chunk
+
+        chunks = []
+        size = 0
+        for chunk in logical_lines(_join_lines(texts())):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= len(region) and size in boundaries:
+                return chunks, boundaries[size]
+        return chunks, len(self._source_chunks) - 1
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into lines, keeping every line ending as it is."""
+    return io.StringIO(text, newline="").readlines()
+
+
+def _join_lines(texts: Iterable[str]) -> Iterator[str]:
+    """Yield the lines of consecutive pieces of text.
+
+    A piece that does not end with a line break (e.g. after an edit joined
+    two lines) continues on the first line of the next piece.
+    """
+    partial = ""
+    for text in texts:
+        lines = _split_lines(partial + text)
+        partial = ""
+        if lines and not lines[-1].endswith("\n"):
+            partial = lines.pop()
+        yield from lines
+    if partial:
+        yield partial
+
+
+def _diff(offset: int, old: str, new: str) -> Tuple[int, int, str]:
+    """Express the change from old to new as a minimal single edit.
+
+    Args:
+        offset: Offset of old in the full text
+        old: Previous text
+        new: Replacement text
+
+    Returns:
+        (offset, removed, inserted)
+    """
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < limit - prefix
+        and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]
+    ):
+        suffix += 1
+    return offset + prefix, len(old) - prefix - suffix, new[prefix : len(new) - suffix]
@@ -0,0 +1,258 @@
+"""Source maps from translated Python positions back to pt-BR positions.
+
+Translation never adds or removes lines, but replacing 'nao' with 'not'
+or 'funcao' with 'def' changes the columns of everything after it on the
+line. Tracebacks (the ^^^^ markers of Python 3.11+) and SyntaxErrors
+report columns in the translated code, while showing the pt-BR line.
+
+Translated files are registered by the loaders (register()). Nothing else
+is kept per module: a file's SourceMap is only built, from its source in
+linecache, when an error in it is rendered. Rendering goes through
+format_exception(), which the installed sys.excepthook uses.
+
+SourceMap layout: only changed lines are stored. Each replacement on a
+line is three ints, delta-encoded from the previous one on that line:
+(gap from the end of the previous replacement, translated length,
+original length), in UTF-8 bytes like code object positions. All lines
+share three flat array('i') buffers.
+"""
+
+import io
+import sys
+import linecache
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Translated file name -> its SourceMap, or None until one is needed
+_registry: Dict[str, Optional["SourceMap"]] = {}
+
+
+class SourceMap:
+    """Column map of one translated source.
+
+    Attributes:
+        rows: Line numbers (1-based) with replacements, in order
+        starts: Index in data of the first triple of each row, plus the end
+        data: (gap, translated length, original length) triples
+    """
+
+    __slots__ = ("rows", "starts", "data")
+
+    def __init__(self):
+        """Create an empty map (no column changes)."""
+        self.rows = array("i")
+        self.starts = array("i", [0])
+        self.data = array("i")
+
+    @classmethod
+    def from_replacements(
+        cls, source: str, replacements: Iterable[Tuple[int, int, str]]
+    ) -> "SourceMap":
+        """Build the map of a translation.
+
+        Args:
+            source: The pt-BR source
+            replacements: Sorted (start, end, replacement) offsets into the
+                source, none of them spanning lines
+
+        Returns:
+            The SourceMap
+        """
+        # Line breaks as the compiler sees them (not str.splitlines())
+        lines = io.StringIO(source, newline="").readlines()
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line))
+
+        source_map = cls()
+        row = 0
+        translated_end = shift = 0
+        for start, end, replacement in replacements:
+            current = bisect_right(line_starts, start)
+            if current != row:
+                if row:
+                    source_map.starts.append(len(source_map.data))
+                source_map.rows.append(current)
+                row = current
+                translated_end = shift = 0
+
+            line = lines[row - 1]
+            column = start - line_starts[row - 1]
+            if not line.isascii():
+                column = len(line[:column].encode("utf-8"))
+            original_length = len(source[start:end].encode("utf-8"))
+            translated_length = len(replacement.encode("utf-8"))
+
+            translated_start = column + shift
+            source_map.data.extend(
+                (translated_start - translated_end, translated_length, original_length)
+            )
+            translated_end = translated_start + translated_length
+            shift += translated_length - original_length
+
+        if row:
+            source_map.starts.append(len(source_map.data))
+        return source_map
+
+    def original_column(self, line: int, column: int) -> int:
+        """Map a column of the translated source to the pt-BR source.
+
+        Columns inside a replaced word map into the original word (clamped
+        to its end).
+
+        Args:
+            line: Line number (1-based)
+            column: UTF-8 byte offset in the translated line
+
+        Returns:
+            UTF-8 byte offset in the pt-BR line
+        """
+        index = bisect_left(self.rows, line)
+        if index == len(self.rows) or self.rows[index] != line:
+            return column
+
+        data = self.data
+        translated_end = shift = 0
+        for position in range(self.starts[index], self.starts[index + 1], 3):
+            translated_start = translated_end + data[position]
+            translated_length = data[position + 1]
+            original_length = data[position + 2]
+            if column < translated_start:
+                break
+            if column < translated_start + translated_length:
+                original_start = translated_start - shift
+                return original_start + min(column - translated_start, original_length)
+            shift += translated_length - original_length
+            translated_end = translated_start + translated_length
+        return column - shift
+
+    def nbytes(self) -> int:
+        """Get the memory used by the map, in bytes."""
+        buffers = (self.rows, self.starts, self.data)
+        return sum(sys.getsizeof(buffer) for buffer in buffers)
+
+
+def register(filename: str) -> None:
+    """Register a file whose code is compiled from its translation.
+
+    Also installs the source-map aware sys.excepthook, unless another
+    hook has replaced the default one.
+
+    Args:
+        filename: The file name used in the code objects
+    """
+    if filename not in _registry:
+        _registry[filename] = None
+    if sys.excepthook is sys.__excepthook__:
+        sys.excepthook = excepthook
+
+
+def get_source_map(filename: str) -> Optional[SourceMap]:
+    """Get the map of a registered file, building it on first use.
+
+    Args:
+        filename: The file name used in the code objects
+
+    Returns:
+        The SourceMap, or None if the file is not registered or its source
+        is not available
+    """
+    if filename not in _registry:
+        return None
+    source_map = _registry[filename]
+    if source_map is None:
+        lines = linecache.getlines(filename)
+        if not lines:
+            return None
+        from .translator import _iter_replacements
+
+        source = "".join(lines)
+        source_map = SourceMap.from_replacements(source, _iter_replacements(source))
+        _registry[filename] = source_map
+    return source_map
+
+
+def _to_bytes(line: str, offset: int) -> int:
+    return len(line[:offset].encode("utf-8"))
+
+
+def _to_characters(line: str, offset: int) -> int:
+    return len(line.encode("utf-8")[:offset].decode("utf-8", "replace"))
+
+
+def _remap_syntax_error(exception) -> None:
+    """Point a SyntaxError's text and offsets at the pt-BR line."""
+    source_map = get_source_map(exception.filename)
+    if source_map is None or exception.lineno is None or exception.text is None:
+        return
+    lineno = int(exception.lineno)
+    original = linecache.getline(exception.filename, lineno)
+    if not original:
+        return
+
+    translated = exception.text
+    for name in ("offset", "end_offset"):
+        offset = getattr(exception, name, None)
+        if offset is None:
+            continue
+        if name == "end_offset" and int(exception.end_lineno or 0) != lineno:
+            continue
+        # Offsets are 1-based character offsets
+        column = source_map.original_column(lineno, _to_bytes(translated, offset - 1))
+        setattr(exception, name, _to_characters(original, column) + 1)
+    exception.text = original
+
+
+def _remap(exception, seen) -> None:
+    """Remap the positions of a TracebackException and its chain."""
+    if exception is None or id(exception) in seen:
+        return
+    seen.add(id(exception))
+
+    for frame in exception.stack:
+        if getattr(frame, "colno", None) is None:
+            continue
+        source_map = get_source_map(frame.filename)
+        if source_map is None:
+            continue
+        frame.colno = source_map.original_column(frame.lineno, frame.colno)
+        if frame.end_colno is not None and frame.end_lineno is not None:
+            frame.end_colno = source_map.original_column(
+                frame.end_lineno, frame.end_colno
+            )
+
+    if exception.exc_type is not None and issubclass(exception.exc_type, SyntaxError):
+        _remap_syntax_error(exception)
+
+    _remap(exception.__cause__, seen)
+    _remap(exception.__context__, seen)
+    for group_member in getattr(exception, "exceptions", None) or ():
+        _remap(group_member, seen)
+
+
+def format_exception(exception: BaseException) -> List[str]:
+    """Format an exception like traceback.format_exception, with pt-BR columns.
+
+    Args:
+        exception: The exception, with its __traceback__
+
+    Returns:
+        The lines of the traceback
+    """
+    import traceback
+
+    formatted = traceback.TracebackException(
+        type(exception), exception, exception.__traceback__
+    )
+    if _registry:
+        _remap(formatted, set())
+    return list(formatted.format())
+
+
+def excepthook(exc_type, exc_value, exc_traceback) -> None:
+    """sys.excepthook that prints tracebacks with pt-BR columns."""
+    if exc_value is None or exc_value.__traceback__ is not exc_traceback:
+        sys.__excepthook__(exc_type, exc_value, exc_traceback)
+        return
+    sys.stderr.write("".join(format_exception(exc_value)))
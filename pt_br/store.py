@@ -0,0 +1,332 @@
+"""Persistent, cross-process store of translated sources.
+
+Editors, linters, CI jobs and the import hook often ask for the
+translation of the same files again and again, in different processes.
+This module keeps translated text in a single SQLite file so any process
+can reuse it.
+
+Rows are keyed by a digest of the source and by the mapping hash (see
+pt_br.cache.mapping_hash), so installed versions with different tables
+can share one store without seeing (or deleting) each other's rows.
+
+Rows record when they were last used. Opening a store prunes it at most
+once every PRUNE_INTERVAL: rows unused for MAX_AGE are deleted, and then
+the least recently used ones beyond MAX_ENTRIES, whatever their mapping
+hash. Opening a store otherwise only reads it.
+
+The store is opt-in. Enable it with:
+    - enable_translation_store(path=None) from Python, or
+    - PT_BR_STORE=1 (default location) or PT_BR_STORE=/path/to/file
+
+Default location:
+    $PT_BR_CACHE_DIR, or the user cache directory
+    (~/.cache/pt_br, ~/Library/Caches/pt_br, %LOCALAPPDATA%\\pt_br\\Cache),
+    file 'translations.sqlite3'.
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Optional
+
+from . import cache
+
+STORE_FILENAME = "translations.sqlite3"
+
+# Seconds a writer waits for another process to release the database
+BUSY_TIMEOUT = 10.0
+
+# Layout of the database, in PRAGMA user_version; older files are emptied
+SCHEMA_VERSION = 2
+
+# Rows unused for this many seconds are deleted by prune()
+MAX_AGE = 30 * 24 * 3600.0
+
+# prune() keeps at most this many rows, the most recently used
+MAX_ENTRIES = 50000
+
+# Opening a store prunes it if it was last pruned this many seconds ago
+PRUNE_INTERVAL = 24 * 3600.0
+
+# get() refreshes a row's last-use time at most this often (in seconds),
+# so that reads rarely take the write lock
+TOUCH_INTERVAL = 3600.0
+
+
+def user_cache_dir() -> str:
+    """Get the pt_br directory inside the user cache directory.
+
+    Returns:
+        $PT_BR_CACHE_DIR if set, otherwise the platform cache location
+    """
+    override = os.environ.get("PT_BR_CACHE_DIR")
+    if override:
+        return override
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "pt_br", "Cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "pt_br")
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pt_br")
+
+
+def default_store_path() -> str:
+    """Get the default path of the store file."""
+    return os.path.join(user_cache_dir(), STORE_FILENAME)
+
+
+class TranslationStore:
+    """SQLite-backed translation store shared between processes.
+
+    Each thread (and each process, after a fork) uses its own
+    connection. The database runs in WAL mode so readers never block
+    writers, and every write is its own short transaction.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES,
+        max_age: float = MAX_AGE,
+    ):
+        """Open (and if needed create) the store.
+
+        The store is pruned if that is due (see the module docstring).
+
+        Args:
+            path: Database file; defaults to default_store_path()
+            max_entries: Number of rows prune() keeps
+            max_age: Seconds after which prune() deletes unused rows
+        """
+        import hashlib
+        import sqlite3
+
+        self._sqlite3 = sqlite3
+        self._blake2b = hashlib.blake2b
+        self.path = path or default_store_path()
+        self.mapping_hash = cache.mapping_hash()
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._create_tables(connection)
+
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'pruned'"
+        ).fetchone()
+        if row is None or time.time() - row[0] >= PRUNE_INTERVAL:
+            self.prune()
+
+    def _create_tables(self, connection) -> None:
+        """Create the tables, dropping those of an older layout."""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have done it while we waited for the lock
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS translations")
+                connection.execute(
+                    "CREATE TABLE translations ("
+                    " source_hash BLOB NOT NULL,"
+                    " mapping_hash TEXT NOT NULL,"
+                    " translated TEXT NOT NULL,"
+                    " used REAL NOT NULL,"
+                    " PRIMARY KEY (source_hash, mapping_hash))"
+                )
+                connection.execute(
+                    "CREATE INDEX translations_used ON translations (used)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS meta"
+                    " (key TEXT PRIMARY KEY, value REAL NOT NULL)"
+                )
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _connection(self):
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        connection = self._sqlite3.connect(
+            self.path, timeout=BUSY_TIMEOUT, isolation_level=None
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+        except self._sqlite3.DatabaseError:
+            # Some filesystems (e.g. network shares) do not support WAL
+            pass
+        connection.execute("PRAGMA synchronous=NORMAL")
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def key(self, source: str) -> bytes:
+        """Compute the source digest used as key."""
+        return self._blake2b(
+            source.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+    def get(self, source: str) -> Optional[str]:
+        """Look up the translation of a source.
+
+        Args:
+            source: The pt-BR source code
+
+        Returns:
+            The stored translation, or None if it is not stored
+        """
+        key = (self.key(source), self.mapping_hash)
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT translated, used FROM translations"
+                " WHERE source_hash = ? AND mapping_hash = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] >= TOUCH_INTERVAL:
+                connection.execute(
+                    "UPDATE translations SET used = ?"
+                    " WHERE source_hash = ? AND mapping_hash = ?",
+                    (now,) + key,
+                )
+        except self._sqlite3.Error:
+            return None
+        return row[0]
+
+    def put(self, source: str, translated: str) -> None:
+        """Store the translation of a source.
+
+        Errors (e.g. a read-only cache directory) are ignored.
+
+        Args:
+            source: The pt-BR source code
+            translated: Its translation
+        """
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO translations"
+                " (source_hash, mapping_hash, translated, used)"
+                " VALUES (?, ?, ?, ?)",
+                (self.key(source), self.mapping_hash, translated, time.time()),
+            )
+        except self._sqlite3.Error:
+            pass
+
+    def prune(self) -> int:
+        """Delete old and least recently used rows, of every mapping hash.
+
+        Rows unused for max_age seconds go first, then the least recently
+        used ones beyond max_entries. Errors are ignored.
+
+        Returns:
+            The number of rows deleted
+        """
+        now = time.time()
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except self._sqlite3.Error:
+            return 0
+        try:
+            deleted = connection.execute(
+                "DELETE FROM translations WHERE used < ?", (now - self.max_age,)
+            ).rowcount
+            deleted += connection.execute(
+                "DELETE FROM translations WHERE rowid IN"
+                " (SELECT rowid FROM translations ORDER BY used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('pruned', ?)",
+                (now,),
+            )
+            connection.execute("COMMIT")
+        except self._sqlite3.Error:
+            connection.execute("ROLLBACK")
+            return 0
+        return deleted
+
+    def clear(self) -> None:
+        """Delete every stored translation, of every mapping hash."""
+        self._connection().execute("DELETE FROM translations")
+
+    def __len__(self) -> int:
+        """Count the rows made with the current mapping tables."""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM translations WHERE mapping_hash = ?",
+            (self.mapping_hash,),
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+# The active store; False until PT_BR_STORE has been looked at
+_translation_store = False
+
+
+def enable_translation_store(path: Optional[str] = None) -> TranslationStore:
+    """Turn on the persistent store for translate_source() and the loader.
+
+    Args:
+        path: Database file; defaults to default_store_path()
+
+    Returns:
+        The opened TranslationStore
+    """
+    global _translation_store
+    _translation_store = TranslationStore(path)
+    return _translation_store
+
+
+def disable_translation_store() -> None:
+    """Turn off the persistent store (the file is kept)."""
+    global _translation_store
+    if isinstance(_translation_store, TranslationStore):
+        _translation_store.close()
+    _translation_store = None
+
+
+def get_translation_store() -> Optional[TranslationStore]:
+    """Get the active store, opening it from PT_BR_STORE on first use.
+
+    Returns:
+        The TranslationStore, or None if the store is disabled or
+        cannot be opened
+    """
+    global _translation_store
+    if _translation_store is False:
+        _translation_store = None
+        setting = os.environ.get("PT_BR_STORE", "")
+        if setting and setting != "0":
+            path = None if setting == "1" else setting
+            try:
+                _translation_store = TranslationStore(path)
+            except Exception:
+                # A broken store must never break translation
+                _translation_store = None
+    return _translation_store
@@ -2,31 +2,111 @@
 
 This module handles:
 1. Source code translation (pt-BR keywords/functions → Python)
-2. Import hook registration for transparent translation
+2. The loader that translates modules on import (PTBRSourceLoader)
 3. Support for direct script execution
 
-The import hook works by intercepting Python's module loading system
-and translating pt-BR code to Python before execution.
+The import hook itself is registered by pt_br.hook, which only imports
+this module once a pt-BR module is actually loaded.
 """
 
 import sys
 import os
+import io
+import functools
+import itertools
+import tokenize
 import importlib.abc
 import importlib.machinery
 import importlib.util
-from typing import Optional
-
-from .mappings import PT_BR_KEYWORDS, PT_BR_BUILTINS
-from .utils import safe_replace_word, safe_replace_function
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from . import cache, instrumentation, sourcemap, store
+from .hook import TranslatorFinder, register_translator  # noqa: F401
+from .mappings import (
+    PT_BR_BUILTINS,
+    PT_BR_KEYWORDS,
+    PYTHON_BUILTINS,
+    PYTHON_KEYWORDS,
+    get_matcher,
+    get_reverse_matcher,
+)
+from .utils import build_span_index, fstring_field_spans
+
+# What the scan (_iter_replacements) looks for: (keywords, built-ins, a
+# function returning a VocabularyMatcher over both); each dict maps a word
+# to its replacement
+_PT_BR_VOCABULARY = (PT_BR_KEYWORDS, PT_BR_BUILTINS, get_matcher)
+
+# Reverse translation. pt-BR words already in the Python code map to None:
+# they would be translated when the result is run (see untranslate_source)
+_PYTHON_VOCABULARY = (
+    {**dict.fromkeys(PT_BR_KEYWORDS), **PYTHON_KEYWORDS},
+    {**dict.fromkeys(PT_BR_BUILTINS), **PYTHON_BUILTINS},
+    get_reverse_matcher,
+)
 
 
 def translate_source(source_code: str) -> str:
     """Translate pt-BR source code to Python.
 
-    Applies all keyword and function name translations from the mappings.
-    Translation order:
-    1. Keywords (with word boundary checks)
-    2. Built-in functions (function call pattern)
+    Walks the source once with the stdlib tokenizer and rewrites NAME
+    tokens from the mapping tables:
+    1. Keywords are replaced wherever they appear as a name
+    2. Built-in functions are replaced at call sites (name + '(')
+
+    Strings and comments are never touched, except for the expressions
+    inside f-string replacement fields, which are Python code.
+
+    If the translation cache (pt_br.cache.enable_translation_cache) or
+    the persistent store (pt_br.store.enable_translation_store) is
+    enabled, they are looked up first, in that order. Translations (not
+    cache or store hits) are counted in pt_br.instrumentation.
+
+    Args:
+        source_code: The original pt-BR source code
+
+    Returns:
+        The translated Python source code
+    """
+    return _cached_translate(source_code)
+
+
+def _cached_translate(source_code: str) -> str:
+    """Translate through the translation cache and store, if enabled.
+
+    Args:
+        source_code: The original pt-BR source code
+
+    Returns:
+        The translated Python source code
+    """
+    translation_cache = cache.get_translation_cache()
+    if translation_cache is not None:
+        translated = translation_cache.get(source_code)
+        if translated is not None:
+            return translated
+
+    translation_store = store.get_translation_store()
+    translated = None
+    if translation_store is not None:
+        translated = translation_store.get(source_code)
+
+    if translated is None:
+        translated = _translate(source_code)
+        if translation_store is not None:
+            translation_store.put(source_code, translated)
+
+    if translation_cache is not None:
+        translation_cache.put(source_code, translated)
+    return translated
+
+
+def _translate(source_code: str) -> str:
+    """Translate pt-BR source code to Python, bypassing the caches.
+
+    Every translation goes through here (translate_source() on a cache
+    miss, translate_stream() chunks, TranslationSession), and is counted
+    in pt_br.instrumentation: calls, sizes, time and replaced words.
 
     Args:
         source_code: The original pt-BR source code
@@ -34,23 +114,337 @@ def translate_source(source_code: str) -> str:
     Returns:
         The translated Python source code
     """
-    result = source_code
+    clock_start = instrumentation.clock()
+    translated = source_code
+    # One scan over the whole vocabulary: nothing to translate, no tokenizing
+    if source_code and get_matcher().search(source_code) is not None:
+        counts = instrumentation.REPLACEMENTS
+        pieces = []
+        last = 0
+        for start, end, replacement in _find_replacements(source_code):
+            word = source_code[start:end]
+            counts[word] = counts.get(word, 0) + 1
+            pieces.append(source_code[last:start])
+            pieces.append(replacement)
+            last = end
+        pieces.append(source_code[last:])
+        translated = "".join(pieces)
+
+    counters = instrumentation.TRANSLATE
+    counters["calls"] += 1
+    counters["bytes_in"] += instrumentation.utf8_length(source_code)
+    counters["bytes_out"] += instrumentation.utf8_length(translated)
+    counters["seconds"] += instrumentation.clock() - clock_start
+    return translated
+
+
+def needs_translation(source_code: str) -> bool:
+    """Check whether translate_source() would change the source.
+
+    Much cheaper than translating plain Python: one regex scan over the
+    whole vocabulary rules out most sources, and otherwise tokenizing
+    stops at the first word that would be translated (a vocabulary word
+    in a string or comment does not count).
+
+    Args:
+        source_code: The source code
+
+    Returns:
+        True if the source has pt-BR code to translate
+    """
+    if not source_code or get_matcher().search(source_code) is None:
+        return False
+    return next(_iter_replacements(source_code), None) is not None
+
+
+def untranslate_source(source_code: str) -> str:
+    """Translate Python source code to pt-BR (the reverse of translate_source).
+
+    Uses the same scan as translate_source(), with the mapping tables
+    reversed: Python keywords are replaced wherever they appear, built-in
+    functions at call sites, and strings and comments are left alone
+    (except inside f-string replacement fields). Running the result
+    through translate_source() gives back the original source.
+
+    That round trip is impossible when the code already uses pt-BR words
+    as names, e.g. 'except Exception as e' ('e' would become 'and'), so
+    such sources are rejected.
+
+    Args:
+        source_code: The Python source code
+
+    Returns:
+        The pt-BR source code
+
+    Raises:
+        ValueError: If the code uses pt-BR keywords as names, or calls
+            functions named like pt-BR built-ins
+    """
+    pieces = []
+    conflicts = []
+    last = 0
+    for start, end, replacement in _iter_replacements(source_code, _PYTHON_VOCABULARY):
+        if replacement is None:
+            line = source_code.count("\n", 0, start) + 1
+            conflicts.append(f"'{source_code[start:end]}' (line {line})")
+            continue
+        pieces.append(source_code[last:start])
+        pieces.append(replacement)
+        last = end
+    if conflicts:
+        raise ValueError(f"names that are pt-BR words: {', '.join(conflicts)}")
+    pieces.append(source_code[last:])
+    return "".join(pieces)
+
+
+def _find_replacements(source: str) -> List[Tuple[int, int, str]]:
+    """Tokenize the source once and collect the replacements to make.
+
+    Args:
+        source: The pt-BR source code
+
+    Returns:
+        Sorted list of (start, end, replacement) offsets into the source
+    """
+    return list(_iter_replacements(source))
+
+
+def _iter_replacements(
+    source: str, vocabulary: tuple = _PT_BR_VOCABULARY
+) -> Iterator[Tuple[int, int, str]]:
+    """Tokenize the source and yield the replacements to make, in order.
+
+    Translation never depends on indentation, so leading whitespace is
+    stripped from every physical line before it reaches the tokenizer.
+    This keeps badly indented code from aborting the scan.
+
+    Args:
+        source: The pt-BR source code
+        vocabulary: The words to replace (_PT_BR_VOCABULARY, or
+            _PYTHON_VOCABULARY for reverse translation)
+
+    Yields:
+        (start, end, replacement) offsets into the source
+    """
+    keywords, builtins, _ = vocabulary
+    lines = io.StringIO(source, newline="").readlines()
+    line_starts = []
+    offset = 0
+    stripped_lines = []
+    for line in lines:
+        indent = len(line) - len(line.lstrip(" \t\f"))
+        line_starts.append(offset + indent)
+        stripped_lines.append(line[indent:])
+        offset += len(line)
+
+    def to_offset(position):
+        row, col = position
+        if row > len(line_starts):
+            return len(source)
+        return line_starts[row - 1] + col
+
+    pending = None
+    last_end = (1, 0)
+    resume_at = None
+    readline = functools.partial(next, iter(stripped_lines), "")
+
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if pending is not None:
+                # Built-ins are only translated at call sites: name + '('
+                if (
+                    token.type == tokenize.OP
+                    and token.string == "("
+                    and token.start == pending.end
+                ):
+                    yield (
+                        to_offset(pending.start),
+                        to_offset(pending.end),
+                        builtins[pending.string],
+                    )
+                pending = None
+
+            if token.type == tokenize.NAME:
+                if token.string in keywords:
+                    yield (
+                        to_offset(token.start),
+                        to_offset(token.end),
+                        keywords[token.string],
+                    )
+                elif token.string in builtins:
+                    pending = token
+            elif token.type == tokenize.STRING and _is_fstring(token.string):
+                start = to_offset(token.start)
+                literal = source[start : to_offset(token.end)]
+                for field_start, field_end in fstring_field_spans(literal):
+                    offset = start + field_start
+                    expression = literal[field_start:field_end]
+                    for sub_start, sub_end, replacement in _iter_replacements(
+                        expression, vocabulary
+                    ):
+                        yield (offset + sub_start, offset + sub_end, replacement)
+            elif token.type == tokenize.ERRORTOKEN and token.string in ("'", '"'):
+                # Unterminated string: hand the rest to the fallback path
+                resume_at = to_offset(token.start)
+                break
+
+            last_end = token.end
+    except (tokenize.TokenError, SyntaxError):
+        # Malformed source: keep what was tokenized, fall back for the rest
+        resume_at = to_offset(pending.start if pending is not None else last_end)
+
+    if resume_at is not None and resume_at < len(source):
+        tail = source[resume_at:]
+        for start, end, replacement in _span_index_replacements(tail, vocabulary):
+            yield (resume_at + start, resume_at + end, replacement)
+
+
+def _is_fstring(literal: str) -> bool:
+    """Check whether a STRING token is an f-string literal."""
+    prefix = literal[:3].lower()
+    return "f" in prefix[: len(prefix) - len(prefix.lstrip("rbuf"))]
+
+
+def _span_index_replacements(
+    source_code: str, vocabulary: tuple = _PT_BR_VOCABULARY
+) -> Iterator[Tuple[int, int, str]]:
+    """Find replacements in one regex pass, using the span index for context.
+
+    Only used for the part of a source the tokenizer cannot handle,
+    such as an unterminated string literal.
+
+    Args:
+        source_code: The pt-BR source code
+        vocabulary: The words to replace (see _iter_replacements)
+
+    Yields:
+        (start, end, replacement) offsets into the source
+    """
+    keywords, builtins, matcher = vocabulary
+    index = build_span_index(source_code)
+
+    for match in matcher().finditer(source_code):
+        if index.kind_at(match.start()) is not None:
+            continue
+        word = match.group()
+        if match.lastgroup == "keyword":
+            yield match.start(), match.end(), keywords[word]
+        else:
+            yield match.start(), match.end(), builtins[word]
+
+
+def translate_stream(lines: Iterable[str]) -> Iterator[str]:
+    """Translate pt-BR source code incrementally, one logical line at a time.
+
+    Only the physical lines of the current logical line (an open bracket,
+    a backslash continuation or a triple-quoted string) are kept in memory,
+    so memory use does not grow with the size of the input.
+
+    The caches are not used: every chunk is translated directly.
+
+    Args:
+        lines: Source lines with their line endings, e.g. an open file
+
+    Yields:
+        Translated chunks, each made of one or more complete lines
+    """
+    for chunk in logical_lines(lines):
+        yield _translate(chunk)
+
+
+def logical_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Group physical source lines into logical lines.
+
+    A logical line ends at a NEWLINE token, or at a blank or comment-only
+    line outside brackets. Lines the tokenizer cannot handle are emitted
+    with whatever was read so far, and splitting starts over after them.
+    Every chunk begins with the tokenizer in its initial state, so chunks
+    can be translated independently.
+
+    Args:
+        lines: Source lines with their line endings
+
+    Yields:
+        Source chunks; joined, they give back the input unchanged
+    """
+    iterator = iter(lines)
+    buffer = []
+    exhausted = False
+
+    def readline():
+        nonlocal exhausted
+        line = next(iterator, "")
+        if not line:
+            exhausted = True
+            return ""
+        buffer.append(line)
+        # Indentation does not matter for splitting, and would stop the
+        # tokenizer on the first inconsistent dedent
+        return line.lstrip(" \t\f")
+
+    while not exhausted:
+        first_row = 1
+        depth = 0
+        recovering = False
+        try:
+            for token in tokenize.generate_tokens(readline):
+                if token.type == tokenize.OP:
+                    if token.string in "([{":
+                        depth += 1
+                    elif token.string in ")]}":
+                        depth -= 1
+                        recovering = recovering or depth < 0
+                elif token.type == tokenize.ERRORTOKEN:
+                    recovering = True
+                elif token.type == tokenize.NEWLINE or (
+                    token.type == tokenize.NL and depth <= 0
+                ):
+                    count = token.end[0] - first_row + 1
+                    if count > 0 and buffer:
+                        chunk = "".join(buffer[:count])
+                        del buffer[:count]
+                        first_row = token.end[0] + 1
+                        yield chunk
+                    if recovering:
+                        # After a stray closing bracket or an error token the
+                        # tokenizer state depends on what came before: start
+                        # over from scratch so every chunk is independent
+                        break
+        except (tokenize.TokenError, SyntaxError):
+            # Malformed line: emit what was read, then start over with a
+            # fresh tokenizer on the following lines
+            pass
+
+        if buffer:
+            chunk = "".join(buffer)
+            buffer.clear()
+            yield chunk
+
 
-    # Translate keywords first (with word boundaries)
-    for pt_br_keyword, python_keyword in PT_BR_KEYWORDS.items():
-        result = safe_replace_word(
-            result,
-            pt_br_keyword,
-            python_keyword,
-            avoid_strings=True,
-            avoid_comments=True,
-        )
+def translate_file(path: str, out: IO[str]) -> None:
+    """Translate a pt-BR source file into a text stream, incrementally.
 
-    # Translate built-in functions (look for pattern: word + '(')
-    for pt_br_func, python_func in PT_BR_BUILTINS.items():
-        result = safe_replace_function(result, pt_br_func, python_func)
+    The file's encoding (PEP 263 cookie or BOM) is detected as Python
+    would, and line endings are kept as they are. A file that declares
+    the pt_br codec is read as UTF-8, and its translation declares UTF-8
+    instead.
 
-    return result
+    Args:
+        path: Path to the pt-BR source file
+        out: Writable text stream for the translated code
+    """
+    from . import codec
+
+    with open(path, "rb") as f:
+        encoding, declared = codec.source_encoding(f.readline)
+        f.seek(0)
+        text = io.TextIOWrapper(f, encoding=encoding, newline="")
+        lines: Iterable[str] = text
+        if declared:
+            head = [codec.declare_utf8(line) for line in itertools.islice(text, 2)]
+            lines = itertools.chain(head, text)
+        for chunk in translate_stream(lines):
+            out.write(chunk)
 
 
 class PTBRSourceLoader(importlib.abc.SourceLoader):
@@ -90,8 +484,14 @@ class PTBRSourceLoader(importlib.abc.SourceLoader):
         Returns:
             The source code as a string
         """
+        start = instrumentation.clock()
         with open(self.path, "r", encoding="utf-8") as f:
-            return f.read()
+            size = os.fstat(f.fileno()).st_size
+            source = f.read()
+        instrumentation.READ["files"] += 1
+        instrumentation.READ["bytes"] += size
+        instrumentation.READ["seconds"] += instrumentation.clock() - start
+        return source
 
     def get_data(self, path: str) -> bytes:
         """Get the raw data from a file (required by abstract class).
@@ -105,10 +505,163 @@ class PTBRSourceLoader(importlib.abc.SourceLoader):
         with open(path, "rb") as f:
             return f.read()
 
+    def path_stats(self, path: str) -> dict:
+        """Get the modification time and size of the source file.
+
+        Args:
+            path: The file path
+
+        Returns:
+            Dict with 'mtime' and 'size' keys
+        """
+        st = os.stat(path)
+        return {"mtime": st.st_mtime, "size": st.st_size}
+
+    def set_data(self, path: str, data: bytes) -> bool:
+        """Write bytecode cache data (errors are ignored).
+
+        Args:
+            path: The cache file path
+            data: The cache file contents
+
+        Returns:
+            True if the file was written
+        """
+        return cache.write_atomic(path, data)
+
+    def source_to_code(self, data, path: str):
+        """Translate pt-BR source and compile it.
+
+        Args:
+            data: The source, as text or bytes
+            path: The file path, used in tracebacks
+
+        Returns:
+            The compiled code object
+        """
+        if isinstance(data, bytes):
+            data = importlib.util.decode_source(data)
+
+        # Translate pt-BR → Python
+        translated = translate_source(data)
+        sourcemap.register(path)
+
+        # Compile the translated code
+        return _timed_compile(translated, path)
+
+    def bytecode_path(self, source_path: str) -> Optional[str]:
+        """Get the pt-BR bytecode cache path for the source file.
+
+        Args:
+            source_path: The file path
+
+        Returns:
+            The cache file path, or None when caching is not available
+        """
+        return cache.bytecode_path(source_path)
+
+    def shared_bytecode_path(
+        self, source_path: str, create: bool = False
+    ) -> Optional[str]:
+        """Get the bytecode path in the directory shared with child processes.
+
+        Args:
+            source_path: The file path
+            create: Create the shared directory if there is none yet
+
+        Returns:
+            The cache file path, or None when there is no shared directory
+        """
+        return cache.shared_bytecode_path(source_path, create)
+
+    def plain_marker_path(self, source_path: str) -> Optional[str]:
+        """Get the path of the marker saying the source is plain Python.
+
+        Args:
+            source_path: The file path
+
+        Returns:
+            The marker path, or None when caching is not available
+        """
+        return cache.plain_marker_path(source_path)
+
+    def get_cached_code(self, source_path: str):
+        """Load the compiled code from the bytecode cache, if it is fresh.
+
+        The shared directory of a parent process (see pt_br.cache) is
+        tried after the regular cache file.
+
+        Args:
+            source_path: The file path
+
+        Returns:
+            (code object or None, source stats or None); the stats are
+            passed on to cache_code()
+        """
+        paths = [
+            path
+            for path in (
+                self.bytecode_path(source_path),
+                self.shared_bytecode_path(source_path),
+            )
+            if path is not None
+        ]
+        if not paths:
+            return None, None
+
+        try:
+            stats = self.path_stats(source_path)
+        except OSError:
+            return None, None
+        for bytecode_path in paths:
+            try:
+                data = self.get_data(bytecode_path)
+            except OSError:
+                continue
+            code = cache.load_bytecode(data, stats["mtime"], stats["size"])
+            if code is not None:
+                instrumentation.CACHE["hits"] += 1
+                sourcemap.register(source_path)
+                return code, stats
+        instrumentation.CACHE["misses"] += 1
+        return None, stats
+
+    def cache_code(
+        self, source_path: str, code, stats: Optional[dict], force: bool = False
+    ) -> None:
+        """Write compiled code to the bytecode cache.
+
+        When the regular cache file cannot be written (or
+        sys.dont_write_bytecode is set), the code goes to the directory
+        shared with child processes instead. Nothing is written without
+        stats.
+
+        Args:
+            source_path: The file path
+            code: The compiled code object
+            stats: Source stats from get_cached_code()
+            force: Write the regular cache file even when
+                sys.dont_write_bytecode is set
+        """
+        if stats is None:
+            return
+        data = cache.dump_bytecode(code, stats["mtime"], stats["size"])
+        bytecode_path = self.bytecode_path(source_path)
+        if bytecode_path is not None and (force or not sys.dont_write_bytecode):
+            if self.set_data(bytecode_path, data):
+                instrumentation.CACHE["writes"] += 1
+                return
+        shared_path = self.shared_bytecode_path(source_path, create=True)
+        if shared_path is not None and self.set_data(shared_path, data):
+            instrumentation.CACHE["writes"] += 1
+
     def get_code(self, fullname: str):
         """Get compiled code, translating pt-BR first.
 
-        This is the key method that translates before compilation.
+        Uses the pt-BR bytecode cache in __pycache__ when it is up to date
+        with the source, and refreshes it otherwise. Modules with nothing to
+        translate (see needs_translation) are marked as plain and compiled
+        by the stock SourceFileLoader, with their regular .pyc file.
 
         Args:
             fullname: The module name
@@ -116,22 +669,202 @@ class PTBRSourceLoader(importlib.abc.SourceLoader):
         Returns:
             The compiled code object
         """
-        # Read the source
-        source = self.get_source(fullname)
+        source_path = self.get_filename(fullname)
+        code, stats = self.get_cached_code(source_path)
+        if code is not None:
+            return code
 
-        # Translate pt-BR → Python
-        translated = translate_source(source)
+        if self.is_marked_plain(source_path, stats):
+            return self.get_plain_code(fullname)
 
-        # Compile the translated code
-        code = compile(
-            translated,
-            self.path,
-            "exec",
-            dont_inherit=True,
-        )
+        source = self.get_source(fullname)
+        if not needs_translation(source):
+            self.mark_plain(source_path, stats)
+            return self.get_plain_code(fullname)
 
+        code = self.source_to_code(source, source_path)
+        self.cache_code(source_path, code, stats)
         return code
 
+    def refresh_cache(self, force: bool = False) -> bool:
+        """Bring the cache of the module up to date without running it.
+
+        Makes the same decision as get_code(): a module with nothing to
+        translate gets its plain-Python marker (the stock loader writes
+        its regular .pyc file when it is imported), any other module its
+        pt-BR bytecode cache file.
+
+        Args:
+            force: Write even when sys.dont_write_bytecode is set
+
+        Returns:
+            True if the cache was refreshed, False if it was up to date
+
+        Raises:
+            SyntaxError: If the translated source does not compile
+        """
+        source_path = self.get_filename(self.fullname)
+        code, stats = self.get_cached_code(source_path)
+        if code is not None or self.is_marked_plain(source_path, stats):
+            return False
+
+        source = self.get_source(self.fullname)
+        if not needs_translation(source):
+            self.mark_plain(source_path, stats, force)
+        else:
+            code = self.source_to_code(source, source_path)
+            self.cache_code(source_path, code, stats, force)
+        return True
+
+    def is_marked_plain(self, source_path: str, stats: Optional[dict]) -> bool:
+        """Check for an up-to-date marker saying the source is plain Python.
+
+        Args:
+            source_path: The file path
+            stats: Source stats from get_cached_code()
+
+        Returns:
+            True if the source was found to need no translation
+        """
+        marker_path = self.plain_marker_path(source_path)
+        if marker_path is None or stats is None:
+            return False
+        try:
+            data = self.get_data(marker_path)
+        except OSError:
+            return False
+        if data != cache.source_header(stats["mtime"], stats["size"]):
+            return False
+        instrumentation.CACHE["plain"] += 1
+        return True
+
+    def mark_plain(
+        self, source_path: str, stats: Optional[dict], force: bool = False
+    ) -> None:
+        """Record that the source needs no translation (see is_marked_plain).
+
+        Args:
+            source_path: The file path
+            stats: Source stats from get_cached_code()
+            force: Write the marker even when sys.dont_write_bytecode is set
+        """
+        marker_path = self.plain_marker_path(source_path)
+        if marker_path is None or stats is None:
+            return
+        if sys.dont_write_bytecode and not force:
+            return
+        self.set_data(marker_path, cache.source_header(stats["mtime"], stats["size"]))
+
+    def get_plain_code(self, fullname: str):
+        """Get the code of a plain-Python module from the stock loader.
+
+        SourceFileLoader compiles it and reads and writes its regular .pyc
+        file, as if pt_br were not involved.
+
+        Args:
+            fullname: The module name
+
+        Returns:
+            The compiled code object
+        """
+        loader = importlib.machinery.SourceFileLoader(fullname, self.path)
+        return loader.get_code(fullname)
+
+
+class MainScriptLoader(PTBRSourceLoader):
+    """Loader for the part of a main script that follows 'import pt_br'.
+
+    When 'python script.py' runs a pt-BR script, everything up to its
+    'import pt_br' has already been executed by Python. This loader
+    compiles only the top-level statements after that import, so nothing
+    runs twice. The code is cached next to the module's own cache file,
+    under a name that includes the line of the import.
+    """
+
+    def __init__(self, path: str, import_line: int):
+        """Initialize the loader.
+
+        Args:
+            path: The path to the main script
+            import_line: Line of the top-level statement importing pt_br
+        """
+        super().__init__("__main__", path)
+        self.import_line = import_line
+
+    def bytecode_path(self, source_path: str) -> Optional[str]:
+        """Get the cache path for the rest of the script."""
+        return self._main_path(cache.bytecode_path(source_path))
+
+    def shared_bytecode_path(
+        self, source_path: str, create: bool = False
+    ) -> Optional[str]:
+        """Get the shared cache path for the rest of the script."""
+        return self._main_path(cache.shared_bytecode_path(source_path, create))
+
+    def _main_path(self, path: Optional[str]) -> Optional[str]:
+        if path is None:
+            return None
+        return f"{path[: -len('.pyc')]}.main{self.import_line}.pyc"
+
+    def source_to_code(self, data, path: str):
+        """Translate the script and compile what follows the import.
+
+        Args:
+            data: The source, as text or bytes
+            path: The file path, used in tracebacks
+
+        Returns:
+            The compiled code object
+        """
+        if isinstance(data, bytes):
+            data = importlib.util.decode_source(data)
+        return self.compile_rest(translate_source(data), path)
+
+    def compile_rest(self, translated: str, path: str):
+        """Compile the statements after the import from translated source.
+
+        Args:
+            translated: The translated script
+            path: The file path, used in tracebacks
+
+        Returns:
+            The compiled code object
+        """
+        import ast
+
+        sourcemap.register(path)
+        body = ast.parse(translated, path).body
+        # The statement on the import line; with 'a; import pt_br; b' on
+        # one line, the import itself
+        current = None
+        for index, statement in enumerate(body):
+            if statement.lineno <= self.import_line <= statement.end_lineno:
+                if current is None or _imports_pt_br(statement):
+                    current = index
+        if current is not None:
+            body = body[current + 1 :]
+        return _timed_compile(ast.Module(body=body, type_ignores=[]), path)
+
+
+def _timed_compile(source, path: str):
+    """Compile translated code, counting the time in pt_br.instrumentation."""
+    start = instrumentation.clock()
+    code = compile(source, path, "exec", dont_inherit=True)
+    instrumentation.COMPILE["calls"] += 1
+    instrumentation.COMPILE["seconds"] += instrumentation.clock() - start
+    return code
+
+
+def _imports_pt_br(statement) -> bool:
+    """Check whether an AST statement is an import of pt_br."""
+    import ast
+
+    if isinstance(statement, ast.Import):
+        return any(alias.name.split(".")[0] == "pt_br" for alias in statement.names)
+    if isinstance(statement, ast.ImportFrom):
+        return (statement.module or "").split(".")[0] == "pt_br"
+    return False
+
 
 class PTBRFinder(importlib.abc.MetaPathFinder):
     """Meta path finder that loads Python modules with pt-BR translation.
@@ -172,102 +905,3 @@ class PTBRFinder(importlib.abc.MetaPathFinder):
         # by our loader when they're imported after pt_br.
 
         return None
-
-
-def register_translator():
-    """Register the pt-BR translator in sys.meta_path.
-
-    This installs a custom import hook that:
-    1. Intercepts all imports
-    2. For .py files, translates pt-BR → Python
-    3. Then executes the translated code
-
-    Called when the pt_br module is imported.
-    """
-
-    # Create a custom finder that provides our loader
-    class TranslatorFinder(importlib.abc.MetaPathFinder):
-        """Finder that wraps the standard finder with our loader."""
-
-        def find_spec(self, fullname, path, target=None):
-            # Don't translate the pt_br package itself
-            if fullname.startswith("pt_br"):
-                return None
-
-            # Don't translate standard library modules
-            if fullname in sys.stdlib_module_names:
-                return None
-
-            # Let the default finder search for the module
-            spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
-
-            if spec is not None and spec.origin is not None:
-                # If it's a .py file in the current project, use our loader
-                if spec.origin.endswith(".py"):
-                    # Only translate files in the current directory or user code
-                    # Not the standard library
-                    if (
-                        "site-packages" not in spec.origin
-                        and "/usr" not in spec.origin
-                        and "/opt" not in spec.origin
-                    ):
-                        # Replace the loader with ours
-                        spec.loader = PTBRSourceLoader(fullname, spec.origin)
-
-            return spec
-
-    # Register this finder in sys.meta_path
-    # Insert at position 0 to run before other finders
-    if not any(isinstance(f, TranslatorFinder) for f in sys.meta_path):
-        sys.meta_path.insert(0, TranslatorFinder())
-
-    # Also handle the __main__ module (direct script execution)
-    # by translating it when the module is already being loaded
-    _hook_main_module()
-
-
-def _hook_main_module():
-    """Hook the __main__ module to translate pt-BR code.
-
-    This is for when a user runs 'python script.py' where script.py
-    contains pt-BR code with 'import pt_br' at the top.
-
-    The challenge: Python parses the entire script upfront, so we need
-    to translate it before that happens.
-
-    Solution: We'll hook into the import system so that when pt_br is
-    imported, we also translate the main module retroactively.
-    """
-    # Get the main module
-    import __main__
-
-    # Only hook if we have a __file__ and it's not a pytest/test runner
-    if hasattr(__main__, "__file__") and __main__.__file__:
-        # Skip hooking if this is a test environment
-        if "pytest" in __main__.__file__ or "test" in __main__.__file__:
-            return
-
-        try:
-            with open(__main__.__file__, "r", encoding="utf-8") as f:
-                source = f.read()
-
-            # Check if this file has pt-BR keywords
-            has_pt_br = any(kw in source for kw in PT_BR_KEYWORDS.keys())
-
-            if has_pt_br:
-                # Translate the source
-                translated = translate_source(source)
-
-                # Execute the translated code in __main__'s namespace
-                # We need to skip the 'import pt_br' line to avoid re-importing
-                # So we just execute the rest
-                lines = translated.split("\n")
-                # Remove the 'import pt_br' line
-                filtered_lines = [l for l in lines if "import pt_br" not in l]
-                translated_filtered = "\n".join(filtered_lines)
-
-                # Execute in __main__
-                exec(translated_filtered, __main__.__dict__)
-        except Exception:
-            # If anything goes wrong, just let the normal import work
-            pass
@@ -3,57 +3,185 @@
 This module provides helper functions for the translator:
 - Context detection (strings, comments, etc.)
 - Safe word replacement
+- Counting the pt-BR words in a source
 - Debug utilities
 """
 
 import re
-from typing import Tuple
+import threading
+from bisect import bisect_right
+from typing import List, Optional, Tuple
 
+# Optional string prefix (r, b, u, f and their combinations)
+_STRING_PREFIX = re.compile(r"[rRbBuUfF]*")
 
-def is_inside_string(source: str, position: int) -> bool:
-    """Check if a position is inside a string literal.
+# Start of a comment or of a string literal (with an optional prefix)
+_CONTEXT_START = re.compile(
+    r"(#)|(?:(?<![\w])([rRbBuUfF]{1,2}))?('''|\"\"\"|'|\")"
+)
 
-    Detects if the given position falls within a string delimited by
-    single quotes (') or double quotes (").
+# Remainder of a comment
+_COMMENT_BODY = re.compile(r"[^\r\n]*")
+
+# Body of a string literal, keyed by its opening quote. Single-quoted
+# strings stop at an unescaped line break, triple-quoted ones run on.
+_STRING_BODY = {
+    "'": re.compile(r"[^'\\\r\n]*(?:\\(?:\r\n|.)[^'\\\r\n]*)*'?", re.DOTALL),
+    '"': re.compile(r'[^"\\\r\n]*(?:\\(?:\r\n|.)[^"\\\r\n]*)*"?', re.DOTALL),
+    "'''": re.compile(r"[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*(?:''')?", re.DOTALL),
+    '"""': re.compile(r'[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*(?:""")?', re.DOTALL),
+}
+
+
+# Line break, as the compiler sees it
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+class SpanIndex:
+    """Sorted index of the string literal and comment spans of a source.
+
+    The source is scanned once; lookups are a binary search over the
+    span starts. String spans begin right after the opening quote and
+    include the closing quote. Comment spans begin right after the '#'
+    and include the line break. The replacement fields of f-strings are
+    code, so they are carved out of the surrounding string span.
+    """
+
+    STRING = "string"
+    COMMENT = "comment"
+
+    def __init__(self, source: str):
+        """Build the index.
+
+        Args:
+            source: The source code string
+        """
+        self.starts = []
+        self.ends = []
+        self.kinds = []
+        self._scan(source, 0, len(source))
+
+    def kind_at(self, position: int) -> Optional[str]:
+        """Get the kind of span covering a position.
+
+        Args:
+            position: The character position to check
+
+        Returns:
+            SpanIndex.STRING, SpanIndex.COMMENT, or None for code
+        """
+        i = bisect_right(self.starts, position) - 1
+        if i >= 0 and position < self.ends[i]:
+            return self.kinds[i]
+        return None
+
+    def in_string(self, position: int) -> bool:
+        """Check if a position is inside a string literal."""
+        return self.kind_at(position) == self.STRING
+
+    def in_comment(self, position: int) -> bool:
+        """Check if a position is inside a comment."""
+        return self.kind_at(position) == self.COMMENT
+
+    def _add(self, start: int, end: int, kind: str) -> None:
+        if start < end:
+            self.starts.append(start)
+            self.ends.append(end)
+            self.kinds.append(kind)
+
+    def _scan(self, source: str, pos: int, end: int) -> None:
+        """Record the spans found in source[pos:end]."""
+        while True:
+            match = _CONTEXT_START.search(source, pos, end)
+            if match is None:
+                return
+
+            if match.group(1):
+                body_end = _COMMENT_BODY.match(source, match.end(), end).end()
+                # The line break itself still belongs to the comment
+                self._add(match.end(), min(body_end + 1, end), self.COMMENT)
+                pos = body_end
+                continue
+
+            prefix = match.group(2) or ""
+            quote = match.group(3)
+            body_end = _STRING_BODY[quote].match(source, match.end(), end).end()
+            quote_pos = match.start(3)
+
+            if "f" in prefix.lower():
+                literal_start = match.start()
+                fields = fstring_field_spans(source[literal_start:body_end])
+                piece_start = quote_pos + 1
+                for field_start, field_end in fields:
+                    self._add(piece_start, literal_start + field_start, self.STRING)
+                    self._scan(
+                        source, literal_start + field_start, literal_start + field_end
+                    )
+                    piece_start = literal_start + field_end
+                self._add(piece_start, body_end, self.STRING)
+            else:
+                self._add(quote_pos + 1, body_end, self.STRING)
+            pos = body_end
+
+
+# Most recently indexed sources, newest first, as (key, index) pairs. The
+# key is (id, length, hash) of the source: it identifies the string
+# without keeping it alive, and a str caches its own hash, so checking it
+# does not rescan the source.
+_SPAN_INDEX_CACHE = []
+_SPAN_INDEX_CACHE_SIZE = 4
+_span_index_lock = threading.Lock()
+
+
+def build_span_index(source: str) -> SpanIndex:
+    """Build (or reuse) the span index for a source.
+
+    The most recently used sources are cached, so repeated lookups on
+    the same source cost one binary search each. The cache is
+    thread-safe and does not keep the sources alive.
 
     Args:
         source: The source code string
-        position: The character position to check
 
     Returns:
-        True if position is inside a string literal, False otherwise
+        The SpanIndex for the source
     """
-    # Track whether we're inside a string and what quote char started it
-    in_string = False
-    string_char = None
-    i = 0
+    key = (id(source), len(source), hash(source))
+    with _span_index_lock:
+        for cached_key, index in _SPAN_INDEX_CACHE:
+            if cached_key == key:
+                return index
 
-    while i < position and i < len(source):
-        char = source[i]
+    index = SpanIndex(source)
+    with _span_index_lock:
+        _SPAN_INDEX_CACHE.insert(0, (key, index))
+        del _SPAN_INDEX_CACHE[_SPAN_INDEX_CACHE_SIZE:]
+    return index
 
-        # Handle escape sequences (skip next character)
-        if in_string and char == "\\" and i + 1 < len(source):
-            i += 2
-            continue
 
-        # Toggle string state if we encounter a quote
-        if char in ("'", '"'):
-            if not in_string:
-                in_string = True
-                string_char = char
-            elif char == string_char:
-                in_string = False
-                string_char = None
+def is_inside_string(source: str, position: int) -> bool:
+    """Check if a position is inside a string literal.
 
-        i += 1
+    Detects if the given position falls within a string delimited by
+    single quotes (') or double quotes ("), including triple-quoted
+    strings. Expressions inside f-string replacement fields are code,
+    not string content.
 
-    return in_string
+    Args:
+        source: The source code string
+        position: The character position to check
+
+    Returns:
+        True if position is inside a string literal, False otherwise
+    """
+    return build_span_index(source).in_string(position)
 
 
 def is_inside_comment(source: str, position: int) -> bool:
     """Check if a position is inside a comment.
 
-    Detects if the given position falls within a comment (anything after '#').
+    Detects if the given position falls within a comment (anything after
+    a '#' that is not itself part of a string).
 
     Args:
         source: The source code string
@@ -62,21 +190,7 @@ def is_inside_comment(source: str, position: int) -> bool:
     Returns:
         True if position is inside a comment, False otherwise
     """
-    # Find the last newline before position
-    last_newline = source.rfind("\n", 0, position)
-    line_start = last_newline + 1 if last_newline != -1 else 0
-
-    # Find the first '#' on this line
-    hash_pos = source.find("#", line_start, position)
-
-    # If we found a '#' before our position, we're in a comment
-    # (but make sure the '#' is not inside a string)
-    if hash_pos != -1 and hash_pos < position:
-        # Make sure the '#' itself is not in a string
-        if not is_inside_string(source, hash_pos):
-            return True
-
-    return False
+    return build_span_index(source).in_comment(position)
 
 
 def is_word_boundary(source: str, position: int) -> bool:
@@ -130,14 +244,15 @@ def safe_replace_word(
     """
     # Use regex with word boundaries
     pattern = r"\b" + re.escape(old) + r"\b"
+    index = build_span_index(source)
 
     def replacer(match):
-        pos = match.start()
+        kind = index.kind_at(match.start())
 
         # Check if we should skip this match
-        if avoid_strings and is_inside_string(source, pos):
+        if avoid_strings and kind == SpanIndex.STRING:
             return match.group()
-        if avoid_comments and is_inside_comment(source, pos):
+        if avoid_comments and kind == SpanIndex.COMMENT:
             return match.group()
 
         return new
@@ -164,36 +279,134 @@ def safe_replace_function(source: str, old: str, new: str) -> str:
     """
     # Pattern: word boundary, function name, opening paren
     pattern = r"\b" + re.escape(old) + r"(?=\()"
+    index = build_span_index(source)
 
     def replacer(match):
-        pos = match.start()
-
-        # Don't replace if inside a comment
-        if is_inside_comment(source, pos):
+        # f-string fields are not part of any span, so they get replaced
+        if index.kind_at(match.start()) is not None:
             return match.group()
-
-        # Special handling for f-strings: we DO want to replace inside f-strings
-        # because the expressions inside {} are Python code, not string content
-        if is_inside_string(source, pos):
-            # Check if this is an f-string by looking backwards for 'f"' or "f'"
-            # Find the start of this string by scanning backwards
-            quote_pos = pos - 1
-            while quote_pos >= 0 and source[quote_pos] not in ('"', "'"):
-                quote_pos -= 1
-
-            # Check if there's an 'f' before the quote
-            if quote_pos > 0 and source[quote_pos - 1] in ("f", "F"):
-                # It's an f-string, so we DO translate (expressions in {} are code)
-                return new
-            else:
-                # Regular string, don't translate
-                return match.group()
-
         return new
 
     return re.sub(pattern, replacer, source)
 
 
+def fstring_field_spans(literal: str) -> List[Tuple[int, int]]:
+    """Find the expression parts of the replacement fields in an f-string.
+
+    Only the expressions are reported: '!r' conversions and format specs
+    are left out, but fields nested inside a format spec are included.
+    Unterminated literals are scanned up to their end.
+
+    Args:
+        literal: The complete f-string literal, prefix and quotes included
+
+    Returns:
+        List of (start, end) offsets into ``literal``
+    """
+    prefix = _STRING_PREFIX.match(literal).end()
+    quote = literal[prefix : prefix + 3]
+    if quote not in ('"""', "'''"):
+        quote = literal[prefix : prefix + 1]
+
+    start = prefix + len(quote)
+    end = len(literal)
+    if end - len(quote) >= start and literal.endswith(quote):
+        end -= len(quote)
+
+    raw = "r" in literal[:prefix].lower()
+    spans = []
+    _scan_literal_part(literal, start, end, raw, spans, in_format_spec=False)
+    return spans
+
+
+def _scan_literal_part(
+    text: str,
+    pos: int,
+    end: int,
+    raw: bool,
+    spans: List[Tuple[int, int]],
+    in_format_spec: bool,
+) -> int:
+    """Scan the literal text of an f-string, recording replacement fields.
+
+    Returns the position after the closing brace of a format spec, or
+    ``end`` when the top-level literal has been consumed.
+    """
+    while pos < end:
+        char = text[pos]
+        if char == "{":
+            if not in_format_spec and text.startswith("{{", pos):
+                pos += 2
+                continue
+            pos = _scan_field(text, pos + 1, end, raw, spans)
+        elif char == "}" and in_format_spec:
+            return pos + 1
+        elif char == "\\" and not raw:
+            if text.startswith("\\N{", pos):
+                # Named unicode escape: its braces are not a field
+                closing = text.find("}", pos, end)
+                pos = closing + 1 if closing != -1 else end
+            else:
+                pos += 2
+        else:
+            pos += 1
+    return end
+
+
+def _scan_field(
+    text: str, pos: int, end: int, raw: bool, spans: List[Tuple[int, int]]
+) -> int:
+    """Scan one replacement field, starting right after its '{'."""
+    start = pos
+    depth = 0
+
+    while pos < end:
+        char = text[pos]
+        if char in "'\"":
+            pos = _skip_string(text, pos, end)
+            continue
+        if char in "([{":
+            depth += 1
+        elif char in ")]" or (char == "}" and depth > 0):
+            depth -= 1
+        elif depth == 0 and char == "}":
+            spans.append((start, pos))
+            return pos + 1
+        elif depth == 0 and char == "!" and not text.startswith("!=", pos):
+            spans.append((start, pos))
+            # Skip the conversion character, then an optional format spec
+            pos += 1
+            while pos < end and text[pos] not in ":}":
+                pos += 1
+            if pos < end and text[pos] == ":":
+                return _scan_literal_part(text, pos + 1, end, raw, spans, True)
+            return pos + 1
+        elif depth == 0 and char == ":":
+            spans.append((start, pos))
+            return _scan_literal_part(text, pos + 1, end, raw, spans, True)
+        pos += 1
+
+    spans.append((start, end))
+    return end
+
+
+def _skip_string(text: str, pos: int, end: int) -> int:
+    """Return the position just past the string literal starting at ``pos``."""
+    quote = text[pos : pos + 3]
+    if quote not in ('"""', "'''"):
+        quote = text[pos]
+    pos += len(quote)
+
+    while pos < end:
+        if text[pos] == "\\":
+            pos += 2
+        elif text.startswith(quote, pos):
+            return pos + len(quote)
+        else:
+            pos += 1
+    return end
+
+
 def debug_show_translation(pt_br_code: str, python_code: str) -> None:
     """Display side-by-side comparison of pt-BR and Python code.
 
@@ -229,26 +442,138 @@ def debug_show_translation(pt_br_code: str, python_code: str) -> None:
     print("=" * 100)
 
 
-def count_translations(source: str) -> Tuple[int, int]:
-    """Count how many keywords and functions are in source code.
+class TranslationCounts:
+    """The pt-BR words translate_source() would replace in a source.
+
+    Attributes:
+        keywords: Number of keywords replaced
+        builtins: Number of built-in function calls replaced
+        terms: pt-BR word -> number of replacements, in order of first use
+        positions: pt-BR word -> (line, column) of each replacement, with
+            1-based lines and 0-based columns (like the tokenize module)
+    """
+
+    __slots__ = ("keywords", "builtins", "terms", "positions")
+
+    def __init__(self):
+        """Create empty counts."""
+        self.keywords = 0
+        self.builtins = 0
+        self.terms = {}
+        self.positions = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"TranslationCounts(keywords={self.keywords}, "
+            f"builtins={self.builtins}, terms={self.terms!r})"
+        )
+
+
+# Comment and string starts (as in _CONTEXT_START) and the vocabulary
+# (see pt_br.mappings.VocabularyMatcher), in one regex; built on first use
+_code_pattern = None
+
 
-    This is a rough estimate - actual translation depends on context.
+def _iter_code_matches(source: str, pos: int, end: int):
+    """Find vocabulary matches outside strings and comments, in one pass.
+
+    Literals are skipped as they are met, and the replacement fields of
+    f-strings are scanned as code, the way SpanIndex splits them.
+
+    Args:
+        source: The source code string
+        pos: Where to start scanning
+        end: Where to stop scanning
+
+    Yields:
+        Match objects with a 'keyword' or 'call' group
+    """
+    global _code_pattern
+    if _code_pattern is None:
+        from .mappings import get_matcher
+
+        # The lookahead lets most positions fail on one character test
+        _code_pattern = re.compile(
+            "(?=[#'\"rRbBuUfF])(?:{})|{}".format(
+                _CONTEXT_START.pattern, get_matcher().pattern.pattern
+            )
+        )
+    search = _code_pattern.search
+
+    while True:
+        match = search(source, pos, end)
+        if match is None:
+            return
+        if match.lastgroup is not None and match.group(match.lastgroup):
+            yield match
+            pos = match.end()
+        elif match.group(1):
+            pos = _COMMENT_BODY.match(source, match.end(), end).end()
+        else:
+            quote = match.group(3)
+            body_end = _STRING_BODY[quote].match(source, match.end(), end).end()
+            if "f" in (match.group(2) or "").lower():
+                literal_start = match.start()
+                literal = source[literal_start:body_end]
+                for field_start, field_end in fstring_field_spans(literal):
+                    yield from _iter_code_matches(
+                        source, literal_start + field_start, literal_start + field_end
+                    )
+            pos = body_end
+
+
+def analyze_translations(source: str) -> TranslationCounts:
+    """Find every pt-BR word that translation would replace, in one pass.
+
+    Words in strings and comments are ignored (except inside f-string
+    replacement fields), and built-ins only count at call sites. This is a
+    single regex scan rather than the translator's tokenizer, so it is
+    fast enough for large batches of sources; on valid code it finds the
+    same words as translate_source().
 
     Args:
         source: The source code string
 
     Returns:
-        Tuple of (keywords_found, functions_found)
+        The counts and positions, per term and by kind
     """
-    from .mappings import PT_BR_KEYWORDS, PT_BR_BUILTINS
+    counts = TranslationCounts()
+    line_starts = None
+    terms = counts.terms
+    positions = counts.positions
+    for match in _iter_code_matches(source, 0, len(source)):
+        if line_starts is None:
+            line_starts = [0]
+            line_starts.extend(m.end() for m in _LINE_BREAK.finditer(source))
+        if match.lastgroup == "keyword":
+            counts.keywords += 1
+        else:
+            counts.builtins += 1
+        word = match.group()
+        start = match.start()
+        line = bisect_right(line_starts, start)
+        terms[word] = terms.get(word, 0) + 1
+        positions.setdefault(word, []).append((line, start - line_starts[line - 1]))
+    return counts
 
-    keywords_found = 0
-    functions_found = 0
 
-    for keyword in PT_BR_KEYWORDS:
-        keywords_found += len(re.findall(r"\b" + keyword + r"\b", source))
+def count_translations(source: str) -> Tuple[int, int]:
+    """Count how many keywords and functions translation would replace.
 
-    for func in PT_BR_BUILTINS:
-        functions_found += len(re.findall(r"\b" + func + r"(?=\()", source))
+    Words in strings and comments are not counted. See
+    analyze_translations() for per-term counts and positions.
 
+    Args:
+        source: The source code string
+
+    Returns:
+        Tuple of (keywords_found, functions_found)
+    """
+    keywords_found = 0
+    functions_found = 0
+    for match in _iter_code_matches(source, 0, len(source)):
+        if match.lastgroup == "keyword":
+            keywords_found += 1
+        else:
+            functions_found += 1
     return keywords_found, functions_found
@@ -0,0 +1,449 @@
+"""Watch a source tree and keep its translations compiled.
+
+Usage:
+    python -m pt_br vigiar DIR [--dest DEST] [--poll] [--debounce S]
+
+Every time a .py file under DIR is saved, it is translated and compiled
+into the pt-BR bytecode cache (see pt_br.cache), so the next
+'python -m pt_br' or 'import' finds it ready. Plain-Python files get the
+same plain-Python marker an import would write. With --dest, the plain
+Python translation is also written to DEST, as 'traduzir' would.
+
+Changes are detected with inotify on Linux (through ctypes, no extra
+dependency) and by polling file stats elsewhere. Bursts of events, such
+as an editor writing a file in several steps, are collected until the
+tree has been quiet for the debounce delay and handled once.
+"""
+
+import os
+import sys
+import time
+import argparse
+import functools
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import bulk, cache
+from .translator import PTBRSourceLoader
+
+# Seconds without new events before a burst of changes is handled
+DEFAULT_DEBOUNCE = 0.1
+
+# Seconds between two scans of the tree when polling
+DEFAULT_INTERVAL = 0.5
+
+
+def compile_file(path: str) -> bool:
+    """Bring the pt-BR bytecode cache of a file up to date.
+
+    Makes the same decision as an import (see
+    PTBRSourceLoader.refresh_cache): plain-Python files get their
+    plain-Python marker, pt-BR files are translated and compiled. The
+    cache is written even when sys.dont_write_bytecode is set, since
+    writing it is the whole point of watching.
+
+    Args:
+        path: Path to the .py source file
+
+    Returns:
+        True if the cache was written, False if it was already up to date
+        or bytecode caching is not available
+    """
+    if cache.bytecode_path(path) is None:
+        return False
+    loader = PTBRSourceLoader("__main__", path)
+    return loader.refresh_cache(force=True)
+
+
+def _is_watched(relative: str) -> bool:
+    """Check that no directory in a relative path is skipped."""
+    parts = relative.split(os.sep)
+    return not any(part in bulk.SKIPPED_DIRS for part in parts[:-1])
+
+
+class PollingWatcher:
+    """Detect changes by comparing file stats between scans."""
+
+    def __init__(
+        self,
+        root: str,
+        exclude: Optional[str] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        """Take the first snapshot of the tree.
+
+        Args:
+            root: Directory to watch
+            exclude: Directory inside root to ignore (e.g. the output)
+            interval: Seconds between scans
+        """
+        self.root = root
+        self.exclude = exclude
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for _, path in bulk.iter_tree(self.root, self.exclude):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """Wait for changes.
+
+        Args:
+            timeout: Maximum seconds to wait (None: until something changes)
+
+        Returns:
+            Paths created, modified or deleted since the last call
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do when polling)."""
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify, through ctypes."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, root: str, exclude: Optional[str] = None):
+        """Start watching every directory of the tree.
+
+        Args:
+            root: Directory to watch
+            exclude: Directory inside root to ignore (e.g. the output)
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._libc = libc
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self.root = root
+        self.exclude = os.path.abspath(exclude) if exclude else None
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._directories = {}
+        self._add_tree(root)
+
+    def _skip_directory(self, path: str) -> bool:
+        return (
+            os.path.basename(path) in bulk.SKIPPED_DIRS
+            or os.path.abspath(path) == self.exclude
+        )
+
+    def _add_tree(self, directory: str) -> List[str]:
+        """Watch a directory and its subdirectories.
+
+        Returns:
+            Files already present (they may have been created before the
+            watch was in place)
+        """
+        found = []
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [
+                d for d in dirs if not self._skip_directory(os.path.join(root, d))
+            ]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), self.MASK)
+            if wd >= 0:
+                self._directories[wd] = root
+            found.extend(os.path.join(root, name) for name in files)
+        return found
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """Wait for changes.
+
+        Args:
+            timeout: Maximum seconds to wait (None: until something changes)
+
+        Returns:
+            Paths created, modified or deleted since the last call
+        """
+        import select
+        import struct
+
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                offset += 16
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    # Events were lost: treat every file as changed
+                    changed.update(
+                        path for _, path in bulk.iter_tree(self.root, self.exclude)
+                    )
+                    continue
+                if mask & self.IN_IGNORED:
+                    self._directories.pop(wd, None)
+                    continue
+
+                directory = self._directories.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+
+                if mask & self.IN_ISDIR:
+                    created = mask & (self.IN_CREATE | self.IN_MOVED_TO)
+                    if created and not self._skip_directory(path):
+                        changed.update(self._add_tree(path))
+                    continue
+                changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(root: str, exclude: Optional[str] = None, poll: bool = False):
+    """Create the best available watcher for a tree.
+
+    Args:
+        root: Directory to watch
+        exclude: Directory inside root to ignore
+        poll: Always use stat polling
+
+    Returns:
+        An InotifyWatcher, or a PollingWatcher if inotify cannot be used
+    """
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, exclude)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, exclude)
+
+
+class TreeWatcher:
+    """Keep the bytecode cache (and optionally a translated copy) of a tree
+    up to date while its files change.
+    """
+
+    def __init__(
+        self,
+        src: str,
+        dest: Optional[str] = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll: bool = False,
+        log=None,
+    ):
+        """Set up watching.
+
+        Args:
+            src: Source tree with pt-BR code
+            dest: Output tree for translated sources, or None for bytecode only
+            debounce: Seconds without events before changes are handled
+            poll: Use stat polling even if inotify is available
+            log: Function called with one line per update (default: print)
+        """
+        self.src = src
+        self.dest = dest
+        self.debounce = debounce
+        self.log = log or functools.partial(print, flush=True)
+        self.updates = 0
+        self._stopped = False
+        self._watcher = make_watcher(src, dest, poll)
+
+    @property
+    def method(self) -> str:
+        """'inotify' or 'polling'."""
+        return "inotify" if isinstance(self._watcher, InotifyWatcher) else "polling"
+
+    def refresh(self, paths: Iterable[str]) -> int:
+        """Retranslate and recompile a set of changed files.
+
+        Args:
+            paths: Files that changed (deleted files are removed from dest)
+
+        Returns:
+            Number of files updated
+        """
+        manifest = bulk.load_manifest(self.dest) if self.dest else None
+        updated = 0
+
+        for path in sorted(paths):
+            relative = os.path.relpath(path, self.src)
+            if relative.startswith(os.pardir) or not _is_watched(relative):
+                continue
+            start = time.perf_counter()
+
+            if not os.path.isfile(path):
+                self._remove(path, relative, manifest)
+                continue
+
+            try:
+                if path.endswith(".py"):
+                    compile_file(path)
+                if self.dest:
+                    dest_path = os.path.join(self.dest, relative)
+                    result = bulk.translate_job((relative, path, dest_path, False))
+                    manifest[relative] = result[1]
+            except (SyntaxError, UnicodeError, LookupError, ValueError) as e:
+                self.log(f"Error: {relative}: {e}")
+                continue
+            except OSError:
+                # Deleted or replaced while we were reading it
+                continue
+
+            updated += 1
+            elapsed = (time.perf_counter() - start) * 1000
+            self.log(f"Updated: {relative} ({elapsed:.1f} ms)")
+
+        if manifest is not None:
+            os.makedirs(self.dest, exist_ok=True)
+            bulk.save_manifest(self.dest, manifest)
+        self.updates += updated
+        return updated
+
+    def _remove(self, path: str, relative: str, manifest: Optional[dict]) -> None:
+        """Drop the outputs of a deleted file."""
+        outputs = []
+        if path.endswith(".py"):
+            outputs += [cache.bytecode_path(path), cache.plain_marker_path(path)]
+        if self.dest:
+            outputs.append(os.path.join(self.dest, relative))
+            manifest.pop(relative, None)
+        for output in outputs:
+            if output and os.path.exists(output):
+                try:
+                    os.unlink(output)
+                except OSError:
+                    continue
+        self.log(f"Removed: {relative}")
+
+    def initial_pass(self) -> int:
+        """Bring every output up to date before watching.
+
+        Returns:
+            Number of files compiled or translated
+        """
+        count = 0
+        if self.dest:
+            summary = bulk.translate_tree(self.src, self.dest)
+            count += summary["written"]
+            for error in summary["errors"]:
+                self.log(f"Error: {error}")
+
+        for relative, path in bulk.iter_tree(self.src, self.dest):
+            if not path.endswith(".py"):
+                continue
+            try:
+                count += compile_file(path)
+            except (SyntaxError, UnicodeError, LookupError, ValueError) as e:
+                self.log(f"Error: {relative}: {e}")
+        return count
+
+    def run(self) -> None:
+        """Handle changes until stop() is called."""
+        pending = set()
+        while not self._stopped:
+            # Wake up regularly so stop() is noticed
+            changed = self._watcher.wait(self.debounce if pending else 0.5)
+            if changed:
+                pending |= changed
+            elif pending:
+                self.refresh(pending)
+                pending = set()
+
+    def stop(self) -> None:
+        """Ask run() to return."""
+        self._stopped = True
+
+    def close(self) -> None:
+        """Release the watcher (after run() has returned)."""
+        self.stop()
+        self._watcher.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for 'python -m pt_br vigiar'."""
+    parser = argparse.ArgumentParser(
+        prog="python -m pt_br vigiar",
+        description="Keep translated output and bytecode of a pt-BR tree up to date.",
+    )
+    parser.add_argument("src", help="source tree with pt-BR code")
+    parser.add_argument("--dest", help="also write translated sources here")
+    parser.add_argument(
+        "--poll", action="store_true", help="poll file stats instead of using inotify"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"seconds of quiet before rebuilding (default: {DEFAULT_DEBOUNCE})",
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.src):
+        print(f"Error: Directory '{args.src}' not found")
+        return 1
+
+    watcher = TreeWatcher(args.src, args.dest, args.debounce, args.poll)
+    count = watcher.initial_pass()
+    print(f"Watching {args.src} ({watcher.method}); {count} files compiled", flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
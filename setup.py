@@ -2,9 +2,26 @@
 """Setup configuration for python-pt-br package.
 
 Note: This file is maintained for backward compatibility.
-Primary configuration is in pyproject.toml
+Primary configuration is in pyproject.toml. It also installs
+pt_br_codec.pth (see pt_br.codec) at the top of site-packages, which
+pyproject.toml cannot express.
 """
 
+import os
+
 from setuptools import setup
+from setuptools.command.build_py import build_py
+
+PTH_FILE = "pt_br_codec.pth"
+
+
+class BuildPyWithPth(build_py):
+    """build_py that also copies the codec .pth file next to the package."""
+
+    def run(self):
+        super().run()
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), PTH_FILE)
+        self.copy_file(source, os.path.join(self.build_lib, PTH_FILE), preserve_mode=0)
+
 
-setup()
+setup(cmdclass={"build_py": BuildPyWithPth})
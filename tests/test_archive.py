@@ -0,0 +1,212 @@
+"""Unit tests for pt-BR modules in zip archives.
+
+Tests coverage for:
+- Finding modules in an archive without compiling them
+- Translating, caching and invalidating archive entries
+- Plain-Python entries and compiled entries, left to zipimport
+- Importing from a zip on sys.path in a fresh interpreter
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import zipfile
+import zipimport
+
+import pytest
+
+from pt_br import archive, instrumentation
+from pt_br.archive import PTBRZipLoader, archive_cache_dir, find_in_archive
+from pt_br.hook import TranslatorFinder, load_roots
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COURSE = {
+    "aula.py": "funcao dobro(x):\n    retorna x * 2\n",
+    "pacote/__init__.py": "",
+    "pacote/modulo.py": "funcao f():\n    retorna verdadeiro\n",
+    "pacote/simples.py": "x = 1\n",
+}
+
+
+def make_zip(path, files):
+    """Write a zip archive with the given entry name -> source."""
+    with zipfile.ZipFile(path, "w") as z:
+        for name, source in files.items():
+            z.writestr(name, source)
+    return str(path)
+
+
+@pytest.fixture
+def course(tmp_path, monkeypatch):
+    """A course archive, with its cache in a temporary directory."""
+    monkeypatch.setenv("PT_BR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(sys, "pycache_prefix", None)
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    instrumentation.reset_stats()
+    yield make_zip(tmp_path / "curso.zip", COURSE)
+    instrumentation.reset_stats()
+    archive._indexes.clear()
+
+
+def load(fullname, path):
+    """Import a module from an archive entry with a fresh zipimporter."""
+    importer = zipimport.zipimporter(path)
+    importer.invalidate_caches()
+    spec = find_in_archive(fullname, importer)
+    spec.loader = PTBRZipLoader(fullname, spec.origin, importer)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestFindInArchive:
+    """Test looking modules up in an archive."""
+
+    def test_module(self, course):
+        """Test a top-level module."""
+        spec = find_in_archive("aula", zipimport.zipimporter(course))
+        assert spec.origin == os.path.join(course, "aula.py")
+        assert spec.submodule_search_locations is None
+
+    def test_package(self, course):
+        """Test a package and a module inside it."""
+        spec = find_in_archive("pacote", zipimport.zipimporter(course))
+        assert spec.origin == os.path.join(course, "pacote", "__init__.py")
+        assert spec.submodule_search_locations == [os.path.join(course, "pacote")]
+
+        inner = zipimport.zipimporter(spec.submodule_search_locations[0])
+        spec = find_in_archive("pacote.modulo", inner)
+        assert spec.origin == os.path.join(course, "pacote", "modulo.py")
+
+    def test_missing(self, course):
+        """Test that a module not in the archive is not found."""
+        assert find_in_archive("outro", zipimport.zipimporter(course)) is None
+
+    def test_compiled_entry_first(self, tmp_path):
+        """Test that a .pyc entry wins over the source, as in zipimport."""
+        path = make_zip(tmp_path / "c.zip", {"m.pyc": "", "m.py": "x = 1\n"})
+        spec = find_in_archive("m", zipimport.zipimporter(path))
+        assert spec.origin.endswith("m.pyc")
+
+
+class TestZipLoader:
+    """Test translating and caching archive entries."""
+
+    def test_translates(self, course):
+        """Test that a pt-BR entry is translated and runs."""
+        assert load("aula", course).dobro(4) == 8
+        assert instrumentation.stats()["read"]["files"] == 1
+
+    def test_cache_outside_archive(self, course, tmp_path):
+        """Test that the code is cached in the archive's cache directory."""
+        load("pacote.modulo", os.path.join(course, "pacote"))
+        directory = archive_cache_dir(course)
+        assert directory.startswith(str(tmp_path / "cache" / "zipimport"))
+        (cached,) = os.listdir(os.path.join(directory, "pacote"))
+        assert cached.startswith("modulo.") and cached.endswith(".pyc")
+
+    def test_cache_hit(self, course):
+        """Test that a second load uses the cache instead of the source."""
+        load("aula", course)
+        instrumentation.reset_stats()
+        assert load("aula", course).dobro(1) == 2
+        assert instrumentation.stats()["cache"]["hits"] == 1
+        assert instrumentation.stats()["read"]["files"] == 0
+
+    def test_rebuilt_archive_same_contents(self, course, tmp_path):
+        """Test that the cache survives rebuilding the archive unchanged."""
+        load("aula", course)
+        os.unlink(course)
+        make_zip(tmp_path / "curso.zip", COURSE)
+        os.utime(course, (1, 1))
+        instrumentation.reset_stats()
+        load("aula", course)
+        assert instrumentation.stats()["cache"]["hits"] == 1
+
+    def test_changed_entry(self, course, tmp_path):
+        """Test that a changed entry invalidates its cached code."""
+        assert load("aula", course).dobro(2) == 4
+        make_zip(
+            tmp_path / "curso.zip",
+            dict(COURSE, **{"aula.py": "funcao dobro(x):\n    retorna x + x + 1\n"}),
+        )
+        instrumentation.reset_stats()
+        assert load("aula", course).dobro(2) == 5
+        assert instrumentation.stats()["cache"]["misses"] == 1
+
+    def test_plain_entry(self, course):
+        """Test that plain Python is compiled by zipimport and marked."""
+        assert load("pacote.simples", os.path.join(course, "pacote")).x == 1
+        load("pacote.simples", os.path.join(course, "pacote"))
+        assert instrumentation.stats()["cache"]["plain"] == 1
+        assert instrumentation.stats()["translate"]["calls"] == 0
+
+    def test_get_source(self, course):
+        """Test that the pt-BR source is available for tracebacks."""
+        importer = zipimport.zipimporter(course)
+        loader = PTBRZipLoader("aula", os.path.join(course, "aula.py"), importer)
+        assert loader.get_source("aula") == COURSE["aula.py"]
+
+
+class TestFinder:
+    """Test TranslatorFinder with archives on the search path."""
+
+    @pytest.fixture
+    def finder(self, tmp_path, monkeypatch):
+        """A finder with default roots and a temporary sys.path."""
+        monkeypatch.delenv("PT_BR_INCLUDE", raising=False)
+        monkeypatch.delenv("PT_BR_EXCLUDE", raising=False)
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        finder = TranslatorFinder()
+        finder._roots = load_roots(str(tmp_path))
+        yield finder
+        sys.path_importer_cache.clear()
+
+    def test_zip_module(self, finder, course):
+        """Test that an archive entry gets the zip loader."""
+        sys.path.insert(0, course)
+        spec = finder.find_spec("aula", None)
+        assert isinstance(spec.loader, PTBRZipLoader)
+        assert spec.loader.entry == "aula.py"
+
+    def test_directory_before_zip(self, finder, course, tmp_path):
+        """Test that search path order is kept across zips and directories."""
+        directory = tmp_path / "src"
+        directory.mkdir()
+        (directory / "aula.py").write_text("x = 1\n")
+        sys.path[:0] = [str(directory), course]
+        spec = finder.find_spec("aula", None)
+        assert spec.origin == str(directory / "aula.py")
+
+        sys.path[:2] = [course, str(directory)]
+        assert isinstance(finder.find_spec("aula", None).loader, PTBRZipLoader)
+
+    def test_compiled_entry_delegated(self, finder, tmp_path):
+        """Test that a compiled entry is left to zipimport."""
+        sys.path.insert(0, make_zip(tmp_path / "c.zip", {"m.pyc": ""}))
+        assert finder.find_spec("m", None) is None
+
+
+class TestImport:
+    """Test importing from an archive in a fresh interpreter."""
+
+    def test_zip_on_sys_path(self, course, tmp_path):
+        """Test a pt-BR package imported from a zip, then from the cache."""
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([ROOT, course]),
+            PT_BR_CACHE_DIR=str(tmp_path / "cache"),
+        )
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        code = (
+            "import pt_br, aula, pacote.modulo; "
+            "print(aula.dobro(3), pacote.modulo.f(), pt_br.stats()['cache']['hits'])"
+        )
+        for hits in (0, 2):
+            result = subprocess.run(
+                [sys.executable, "-c", code], env=env, capture_output=True, text=True
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout == f"6 True {hits}\n"
@@ -0,0 +1,269 @@
+"""Unit tests for ahead-of-time tree translation (pt_br.bulk).
+
+Tests coverage for:
+- Translating and mirroring a tree
+- Skipping unchanged files on re-runs
+- Removing the outputs of deleted sources
+- Parallel workers and the summary
+- Translating a plain Python tree to pt-BR (reverse)
+- The 'traduzir' CLI subcommand
+"""
+
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from pt_br import bulk
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A small pt-BR source tree."""
+    src = tmp_path / "src"
+    (src / "pacote").mkdir(parents=True)
+    (src / "principal.py").write_text(
+        "import pt_br\nfrom pacote import util\nimprimir(util.dobro(2))\n",
+        encoding="utf-8",
+    )
+    (src / "pacote" / "__init__.py").write_text("")
+    (src / "pacote" / "util.py").write_text(
+        "funcao dobro(x):\n    retorna x * 2\n", encoding="utf-8"
+    )
+    (src / "pacote" / "dados.txt").write_text("para sempre")
+    (src / "__pycache__").mkdir()
+    (src / "__pycache__" / "lixo.pyc").write_bytes(b"\0")
+    return src
+
+
+class TestStripHookImport:
+    """Test strip_hook_import()."""
+
+    def test_import_replaced_by_pass(self):
+        """Test that 'import pt_br' becomes 'pass'."""
+        assert bulk.strip_hook_import("import pt_br\nx = 1\n") == (
+            "pass  # import pt_br\nx = 1\n"
+        )
+
+    def test_indentation_kept(self):
+        """Test that an indented import stays a valid block body."""
+        source = "se x:\n    import pt_br\n"
+        assert bulk.strip_hook_import(source) == "se x:\n    pass  # import pt_br\n"
+
+    def test_comment_and_line_endings(self):
+        """Test an import with a comment, CRLF endings and no final newline."""
+        source = "import pt_br  # gancho\r\nx = 1\r\nimport pt_br"
+        assert bulk.strip_hook_import(source) == (
+            "pass  # import pt_br\r\nx = 1\r\npass  # import pt_br"
+        )
+
+    def test_strings_untouched(self):
+        """Test that 'import pt_br' lines inside strings are data."""
+        source = 'X = """\nimport pt_br\n"""\n'
+        assert bulk.strip_hook_import(source) == source
+
+    def test_other_imports_untouched(self):
+        """Test that similar imports are left alone."""
+        source = (
+            "import pt_br_extra\nfrom pt_br import mappings\n"
+            "import pt_br as hook\nx = 1; import pt_br\n"
+        )
+        assert bulk.strip_hook_import(source) == source
+
+
+class TestTranslateFileBytes:
+    """Test translate_file_bytes()."""
+
+    def test_codec_cookie(self):
+        """Test that a file declaring the pt_br codec is translated once."""
+        data = "# coding: pt_br\nx = soma([1])  # olá\n".encode("utf-8")
+        assert bulk.translate_file_bytes(data) == (
+            "# coding: utf-8\nx = sum([1])  # olá\n".encode("utf-8")
+        )
+
+
+class TestTranslateTree:
+    """Test translate_tree()."""
+
+    def test_tree_mirrored_and_translated(self, tree, tmp_path):
+        """Test that every file lands in DEST, translated or copied."""
+        dest = tmp_path / "dest"
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        assert summary["files"] == 4
+        assert (dest / "pacote" / "util.py").read_text() == (
+            "def dobro(x):\n    return x * 2\n"
+        )
+        assert (dest / "pacote" / "dados.txt").read_text() == "para sempre"
+        assert not (dest / "__pycache__").exists()
+
+    def test_output_runs_without_pt_br(self, tree, tmp_path):
+        """Test that the translated tree runs as plain Python."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        result = subprocess.run(
+            [sys.executable, "-E", "principal.py"],
+            cwd=str(dest),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "4\n"
+
+    def test_rerun_skips_unchanged_files(self, tree, tmp_path):
+        """Test that a second run only rewrites changed files."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        (tree / "pacote" / "util.py").write_text("funcao dobro(x):\n    retorna x + x\n")
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        assert summary["written"] == 1
+        assert summary["skipped"] == 3
+        assert "return x + x" in (dest / "pacote" / "util.py").read_text()
+
+    def test_deleted_source_removed(self, tree, tmp_path):
+        """Test that re-runs remove the outputs of deleted sources."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+        (dest / "manual.txt").write_text("kept")
+        (tree / "pacote" / "util.py").unlink()
+        (tree / "pacote" / "dados.txt").unlink()
+        (tree / "pacote" / "__init__.py").unlink()
+        (tree / "pacote").rmdir()
+
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        removed = sorted(
+            str(pathlib.Path("pacote", name))
+            for name in ("__init__.py", "dados.txt", "util.py")
+        )
+        assert summary["removed"] == removed
+        assert not (dest / "pacote").exists()
+        assert (dest / "manual.txt").read_text() == "kept"
+        assert "Removed (source deleted): " in bulk.format_summary(summary)
+        assert bulk.load_manifest(str(dest)).keys() == {"principal.py"}
+
+    def test_force_removes_deleted_source(self, tree, tmp_path):
+        """Test that force=True also removes the outputs of deleted sources."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+        (tree / "principal.py").unlink()
+
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1, force=True)
+
+        assert summary["removed"] == ["principal.py"]
+        assert not (dest / "principal.py").exists()
+
+    def test_force_rewrites_everything(self, tree, tmp_path):
+        """Test that force=True ignores the manifest."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1, force=True)
+        assert summary["written"] == 4
+
+    def test_parallel_workers(self, tree, tmp_path):
+        """Test translating with a process pool."""
+        for i in range(20):
+            (tree / f"gerado{i}.py").write_text(f"x = nao {i}\n")
+        dest = tmp_path / "dest"
+
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=2)
+
+        assert summary["written"] == 24
+        assert sum(w["files"] for w in summary["workers"].values()) == 24
+        assert (dest / "gerado7.py").read_text() == "x = not 7\n"
+
+    def test_undecodable_file_reported(self, tree, tmp_path):
+        """Test that a file with a bad encoding is copied and reported."""
+        (tree / "ruim.py").write_bytes(b"# coding: nao-existe\nx = 1\n")
+        dest = tmp_path / "dest"
+
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1)
+
+        assert len(summary["errors"]) == 1
+        assert (dest / "ruim.py").read_bytes() == b"# coding: nao-existe\nx = 1\n"
+
+    def test_summary_format(self, tree, tmp_path):
+        """Test that the summary mentions files, bytes and workers."""
+        summary = bulk.translate_tree(str(tree), str(tmp_path / "dest"), jobs=1)
+        text = bulk.format_summary(summary)
+        assert "Files: 4" in text
+        assert "Bytes:" in text
+        assert "Per worker:" in text
+
+
+class TestReverseTree:
+    """Test translate_tree() with reverse=True."""
+
+    def test_round_trip(self, tree, tmp_path):
+        """Test that a translated tree translates back to pt-BR."""
+        python_tree = tmp_path / "python"
+        bulk.translate_tree(str(tree), str(python_tree), jobs=1)
+        back = tmp_path / "back"
+
+        summary = bulk.translate_tree(str(python_tree), str(back), jobs=2, reverse=True)
+
+        assert summary["errors"] == []
+        assert (back / "pacote" / "util.py").read_text() == (
+            (tree / "pacote" / "util.py").read_text()
+        )
+        assert (back / "pacote" / "dados.txt").read_text() == "para sempre"
+
+    def test_conflicting_names_reported(self, tmp_path):
+        """Test that a file using pt-BR words as names is copied as is."""
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "erro.py").write_text("for e in range(3):\n    print(e)\n")
+
+        summary = bulk.translate_tree(str(src), str(tmp_path / "dest"), reverse=True)
+
+        assert len(summary["errors"]) == 1
+        assert "'e' (line 1)" in summary["errors"][0]
+        assert (tmp_path / "dest" / "erro.py").read_text() == (
+            "for e in range(3):\n    print(e)\n"
+        )
+
+    def test_manifest_per_direction(self, tree, tmp_path):
+        """Test that a reverse run does not reuse forward results."""
+        dest = tmp_path / "dest"
+        bulk.translate_tree(str(tree), str(dest), jobs=1)
+        summary = bulk.translate_tree(str(tree), str(dest), jobs=1, reverse=True)
+        assert summary["skipped"] == 0
+        assert summary["written"] == 4
+
+
+class TestTraduzirCommand:
+    """Test 'python -m pt_br traduzir'."""
+
+    def test_cli(self, tree, tmp_path):
+        """Test the subcommand end to end."""
+        dest = tmp_path / "dest"
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", "traduzir", str(tree), str(dest), "-j", "2"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Files: 4" in result.stdout
+        assert (dest / "pacote" / "util.py").exists()
+
+    def test_cli_missing_source(self, tmp_path):
+        """Test the error for a missing source directory."""
+        assert bulk.main([str(tmp_path / "nada"), str(tmp_path / "dest")]) == 1
+
+    def test_cli_reverso(self, tmp_path):
+        """Test 'traduzir --reverso' end to end."""
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "ola.py").write_text("if True:\n    print('oi')\n")
+        dest = tmp_path / "dest"
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", "traduzir", "--reverso", src, dest],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert (dest / "ola.py").read_text() == "se verdadeiro:\n    imprimir('oi')\n"
@@ -0,0 +1,444 @@
+"""Unit tests for pt_br.cache and the loader's bytecode cache.
+
+Tests coverage for:
+- Mapping hash and cache tag
+- Bytecode cache paths and (de)serialization
+- Atomic cache writes
+- PTBRSourceLoader reading and writing the cache
+- The bytecode directory shared with child processes
+- The in-process translation cache (LRU)
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import importlib.util
+
+import pytest
+
+from pt_br import cache
+from pt_br.translator import PTBRSourceLoader, translate_source
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def write_bytecode(monkeypatch):
+    """Allow bytecode writing even if PYTHONDONTWRITEBYTECODE is set."""
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+
+
+@pytest.fixture
+def shared_dir(monkeypatch, tmp_path):
+    """Run with bytecode writing off and a shared directory in tmp_path."""
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    monkeypatch.setenv(cache.SHARED_CACHE_ENV, str(directory))
+    return directory
+
+
+@pytest.fixture
+def translation_cache():
+    """Enable a fresh translation cache for one test."""
+    yield cache.enable_translation_cache(max_entries=3)
+    cache.disable_translation_cache()
+
+
+class TestCacheTag:
+    """Test the mapping hash and the cache tag."""
+
+    def test_mapping_hash_is_stable(self):
+        """Test that the mapping hash does not change between calls."""
+        assert cache.mapping_hash() == cache.mapping_hash()
+
+    def test_engine_version_in_mapping_hash(self, monkeypatch):
+        """Test that bumping the engine version changes the hash."""
+        before = cache.mapping_hash()
+        monkeypatch.setattr(cache, "ENGINE_VERSION", cache.ENGINE_VERSION + 1)
+        monkeypatch.setattr(cache, "_mapping_hash", None)
+        assert cache.mapping_hash() != before
+
+    def test_cache_tag_contains_interpreter_tag(self):
+        """Test that the tag keeps the interpreter's own cache tag."""
+        tag = cache.cache_tag()
+        assert tag.startswith(sys.implementation.cache_tag)
+        assert cache.mapping_hash()[:12] in tag
+
+    def test_bytecode_path_in_pycache(self, tmp_path):
+        """Test that cache files go next to the regular .pyc files."""
+        source = str(tmp_path / "modulo.py")
+        path = cache.bytecode_path(source)
+        assert os.path.dirname(path) == os.path.dirname(
+            importlib.util.cache_from_source(source)
+        )
+        assert os.path.basename(path) == f"modulo.{cache.cache_tag()}.pyc"
+
+
+class TestBytecodeSerialization:
+    """Test dump_bytecode() and load_bytecode()."""
+
+    def test_round_trip(self):
+        """Test that a dumped code object loads back."""
+        code = compile("x = 1", "<test>", "exec")
+        data = cache.dump_bytecode(code, 1234.5, 5)
+        loaded = cache.load_bytecode(data, 1234.5, 5)
+        namespace = {}
+        exec(loaded, namespace)
+        assert namespace["x"] == 1
+
+    def test_header_matches_pyc_layout(self):
+        """Test that the header is a standard timestamp .pyc header."""
+        data = cache.dump_bytecode(compile("", "<test>", "exec"), 10, 20)
+        assert data[:4] == importlib.util.MAGIC_NUMBER
+        assert int.from_bytes(data[4:8], "little") == 0
+        assert int.from_bytes(data[8:12], "little") == 10
+        assert int.from_bytes(data[12:16], "little") == 20
+
+    def test_stale_mtime_rejected(self):
+        """Test that a changed source mtime invalidates the cache."""
+        data = cache.dump_bytecode(compile("", "<test>", "exec"), 10, 20)
+        assert cache.load_bytecode(data, 11, 20) is None
+
+    def test_stale_size_rejected(self):
+        """Test that a changed source size invalidates the cache."""
+        data = cache.dump_bytecode(compile("", "<test>", "exec"), 10, 20)
+        assert cache.load_bytecode(data, 10, 21) is None
+
+    def test_corrupt_data_rejected(self):
+        """Test that truncated data is treated as a miss."""
+        data = cache.dump_bytecode(compile("x = 1", "<test>", "exec"), 10, 20)
+        assert cache.load_bytecode(data[:20], 10, 20) is None
+
+
+class TestWriteAtomic:
+    """Test write_atomic()."""
+
+    def test_creates_parent_directories(self, tmp_path):
+        """Test that missing directories are created."""
+        path = tmp_path / "a" / "b" / "file.bin"
+        assert cache.write_atomic(str(path), b"data")
+        assert path.read_bytes() == b"data"
+
+    def test_failure_leaves_no_temp_file(self, tmp_path):
+        """Test that a failed write removes its temporary file."""
+        path = tmp_path / "dir"
+        path.mkdir()
+        (path / "inside").write_text("")
+
+        assert not cache.write_atomic(str(path), b"data")
+        assert sorted(os.listdir(tmp_path)) == ["dir"]
+
+    def test_interrupted_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        """Test that the temporary file is removed when the write is interrupted."""
+
+        def interrupt(source, target):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(cache.os, "replace", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            cache.write_atomic(str(tmp_path / "file.bin"), b"data")
+        assert os.listdir(tmp_path) == []
+
+    def test_threads_writing_same_path(self, tmp_path):
+        """Test that threads writing one path never share a temporary file."""
+        path = tmp_path / "file.bin"
+        payloads = [bytes([i]) * 100_000 for i in range(8)]
+        results = []
+        barrier = threading.Barrier(len(payloads))
+
+        def write(data):
+            barrier.wait()
+            for _ in range(20):
+                results.append(cache.write_atomic(str(path), data))
+
+        threads = [threading.Thread(target=write, args=(p,)) for p in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(results)
+        assert path.read_bytes() in payloads
+        assert os.listdir(tmp_path) == ["file.bin"]
+
+
+class TestLoaderBytecodeCache:
+    """Test PTBRSourceLoader with the bytecode cache."""
+
+    def test_cache_written_on_first_load(self, tmp_path, write_bytecode):
+        """Test that loading a module writes its cache file."""
+        source = tmp_path / "modulo.py"
+        source.write_text("x = soma([1, 2])")
+
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        assert os.path.exists(cache.bytecode_path(str(source)))
+
+    def test_cache_reused_without_translating(
+        self, tmp_path, write_bytecode, monkeypatch
+    ):
+        """Test that a warm load does not translate again."""
+        source = tmp_path / "modulo.py"
+        source.write_text("x = soma([1, 2])")
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        def fail(*args):
+            raise AssertionError("source was translated again")
+
+        monkeypatch.setattr(PTBRSourceLoader, "source_to_code", fail)
+        code = PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["x"] == 3
+
+    def test_cache_refreshed_when_source_changes(self, tmp_path, write_bytecode):
+        """Test that editing the source invalidates the cache."""
+        source = tmp_path / "modulo.py"
+        source.write_text("x = soma([1, 2])")
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        source.write_text("x = soma([1, 2, 3])")
+        os.utime(source, (1, 1))
+        code = PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["x"] == 6
+
+    def test_no_cache_when_writing_disabled(self, tmp_path, monkeypatch):
+        """Test that sys.dont_write_bytecode is honoured."""
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+        source = tmp_path / "modulo.py"
+        source.write_text("x = 1")
+
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        assert not os.path.exists(cache.bytecode_path(str(source)))
+
+    def test_plain_module_uses_stock_loader(self, tmp_path, write_bytecode):
+        """Test that a plain-Python module gets a marker and a regular .pyc."""
+        source = tmp_path / "simples.py"
+        source.write_text("x = sum([1, 2])  # soma\n")
+
+        code = PTBRSourceLoader("simples", str(source)).get_code("simples")
+
+        assert os.path.exists(cache.plain_marker_path(str(source)))
+        assert os.path.exists(importlib.util.cache_from_source(str(source)))
+        assert not os.path.exists(cache.bytecode_path(str(source)))
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["x"] == 3
+
+    def test_plain_marker_skips_scan(self, tmp_path, write_bytecode, monkeypatch):
+        """Test that a fresh marker is trusted without scanning again."""
+        source = tmp_path / "simples.py"
+        source.write_text("x = 1\n")
+        PTBRSourceLoader("simples", str(source)).get_code("simples")
+
+        def fail(*args):
+            raise AssertionError("source was scanned again")
+
+        monkeypatch.setattr("pt_br.translator.needs_translation", fail)
+        PTBRSourceLoader("simples", str(source)).get_code("simples")
+
+    def test_plain_marker_stale(self, tmp_path, write_bytecode):
+        """Test that a module that gains pt-BR code is translated again."""
+        source = tmp_path / "simples.py"
+        source.write_text("x = 1\n")
+        PTBRSourceLoader("simples", str(source)).get_code("simples")
+
+        source.write_text("x = nao 1\n")
+        os.utime(source, (1, 1))
+        code = PTBRSourceLoader("simples", str(source)).get_code("simples")
+
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["x"] is False
+
+    def test_path_stats(self, tmp_path):
+        """Test path_stats() reports mtime and size."""
+        source = tmp_path / "modulo.py"
+        source.write_text("x = 1")
+        stats = PTBRSourceLoader("modulo", str(source)).path_stats(str(source))
+        assert stats["size"] == 5
+        assert stats["mtime"] == os.stat(source).st_mtime
+
+
+class TestSharedBytecode:
+    """Test the bytecode directory shared with child processes."""
+
+    def test_path_per_source(self, shared_dir, tmp_path):
+        """Test that same-named modules get different shared files."""
+        first = cache.shared_bytecode_path(str(tmp_path / "a" / "modulo.py"))
+        second = cache.shared_bytecode_path(str(tmp_path / "b" / "modulo.py"))
+        assert os.path.dirname(first) == str(shared_dir)
+        assert os.path.basename(first).startswith("modulo-")
+        assert first != second
+
+    def test_no_directory(self, monkeypatch, tmp_path):
+        """Test that nothing is shared until a directory exists."""
+        monkeypatch.delenv(cache.SHARED_CACHE_ENV, raising=False)
+        assert cache.shared_cache_dir() is None
+        assert cache.shared_bytecode_path(str(tmp_path / "modulo.py")) is None
+
+    def test_written_when_writing_disabled(self, shared_dir, tmp_path, monkeypatch):
+        """Test that translated code goes to the shared directory and is reused."""
+        source = tmp_path / "modulo.py"
+        source.write_text("x = soma([1, 2])")
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        assert not os.path.exists(cache.bytecode_path(str(source)))
+        assert os.path.exists(cache.shared_bytecode_path(str(source)))
+
+        def fail(*args):
+            raise AssertionError("source was translated again")
+
+        monkeypatch.setattr(PTBRSourceLoader, "source_to_code", fail)
+        code = PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+        namespace = {}
+        exec(code, namespace)
+        assert namespace["x"] == 3
+
+    def test_created_on_demand(self, monkeypatch, tmp_path):
+        """Test that a temporary directory is created and advertised."""
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+        monkeypatch.delenv(cache.SHARED_CACHE_ENV, raising=False)
+        source = tmp_path / "modulo.py"
+        source.write_text("x = soma([1, 2])")
+
+        PTBRSourceLoader("modulo", str(source)).get_code("modulo")
+
+        directory = os.environ[cache.SHARED_CACHE_ENV]
+        assert os.path.exists(cache.shared_bytecode_path(str(source)))
+        cache._remove_shared_cache_dir(directory, os.getpid())
+        assert not os.path.exists(directory)
+        assert cache.SHARED_CACHE_ENV not in os.environ
+
+    def test_spawned_workers_skip_translation(self, tmp_path):
+        """Test that multiprocessing 'spawn' workers reuse the parent's code."""
+        (tmp_path / "trabalho.py").write_text(
+            "import pt_br\n"
+            "funcao relatorio():\n"
+            "    counters = pt_br.stats()\n"
+            "    retorna counters['translate']['calls'], counters['cache']['hits']\n"
+        )
+        (tmp_path / "principal.py").write_text(
+            "import pt_br\n"
+            "import multiprocessing, os\n"
+            "import trabalho\n"
+            "if __name__ == '__main__':\n"
+            "    print(os.environ['PT_BR_SHARED_CACHE'])\n"
+            "    with multiprocessing.get_context('spawn').Pool(2) as pool:\n"
+            "        print(pool.apply(trabalho.relatorio))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+        env.pop(cache.SHARED_CACHE_ENV, None)
+        result = subprocess.run(
+            [sys.executable, "principal.py"],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        directory, worker = result.stdout.splitlines()
+        assert worker == "(0, 1)"
+        assert not os.path.exists(directory)
+        assert not (tmp_path / "__pycache__").exists()
+
+
+class TestTranslationCache:
+    """Test the opt-in in-process translation cache."""
+
+    def test_disabled_by_default(self):
+        """Test that no cache is active unless enabled."""
+        assert cache.get_translation_cache() is None
+        assert cache.translation_cache_info() is None
+
+    def test_hit_after_miss(self, translation_cache):
+        """Test that the second identical translation is a hit."""
+        first = translate_source("se x:\n    imprimir(x)")
+        second = translate_source("se x:\n    imprimir(x)")
+
+        assert first == second == "if x:\n    print(x)"
+        info = cache.translation_cache_info()
+        assert info["misses"] == 1
+        assert info["hits"] == 1
+        assert info["entries"] == 1
+
+    def test_identical_content_shares_entry(self, translation_cache):
+        """Test that equal sources built separately share one entry."""
+        translate_source("".join(["para", " i em x: pass"]))
+        translate_source("".join(["para i", " em x: pass"]))
+        assert cache.translation_cache_info()["hits"] == 1
+
+    def test_evicts_least_recently_used(self, translation_cache):
+        """Test eviction by entry count."""
+        for source in ["x = 1", "x = 2", "x = 3"]:
+            translate_source(source)
+        translate_source("x = 1")  # refresh 'x = 1'
+        translate_source("x = 4")  # evicts 'x = 2'
+
+        info = cache.translation_cache_info()
+        assert info["evictions"] == 1
+        assert translation_cache.get("x = 1") == "x = 1"
+        assert translation_cache.get("x = 2") is None
+
+    def test_evicts_by_total_bytes(self):
+        """Test eviction by total size of the translations."""
+        translation_cache = cache.TranslationCache(max_entries=100, max_bytes=300)
+        translation_cache.put("a", "x" * 100)
+        translation_cache.put("b", "y" * 100)
+        translation_cache.put("c", "z" * 100)
+
+        info = translation_cache.info()
+        assert info["bytes"] <= 300
+        assert info["evictions"] >= 1
+        assert translation_cache.get("c") == "z" * 100
+
+    def test_oversized_entry_not_stored(self):
+        """Test that a translation larger than max_bytes is skipped."""
+        translation_cache = cache.TranslationCache(max_bytes=10)
+        translation_cache.put("a", "x" * 100)
+        assert translation_cache.info()["entries"] == 0
+
+    def test_clear(self, translation_cache):
+        """Test that clear() drops entries but keeps counting."""
+        translate_source("x = 1")
+        cache.clear_translation_cache()
+        translate_source("x = 1")
+
+        info = cache.translation_cache_info()
+        assert info["entries"] == 1
+        assert info["misses"] == 2
+
+    def test_disable(self, translation_cache):
+        """Test that disabling the cache bypasses it."""
+        cache.disable_translation_cache()
+        assert translate_source("nao x") == "not x"
+        assert cache.translation_cache_info() is None
+
+    def test_thread_safety(self):
+        """Test concurrent use from several threads."""
+        translation_cache = cache.TranslationCache(max_entries=8)
+        sources = [f"x = {i}" for i in range(32)]
+
+        def worker():
+            for _ in range(50):
+                for source in sources:
+                    if translation_cache.get(source) is None:
+                        translation_cache.put(source, source)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        info = translation_cache.info()
+        assert info["entries"] <= 8
+        assert info["hits"] + info["misses"] == 4 * 50 * 32
@@ -0,0 +1,164 @@
+"""Unit tests for the pt_br source codec.
+
+Tests coverage for:
+- Decoding (whole and incremental) and encoding
+- The codec search function and registration
+- Detecting the codec's cookie and declaring UTF-8 instead
+- pt_br_codec.pth: 'python script.py' and imports of marked files
+"""
+
+import codecs
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pt_br import codec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE = "# -*- coding: pt_br -*-\nse verdadeiro:\n    imprimir('olá')\n"
+TRANSLATED = "# -*- coding: pt_br -*-\nif True:\n    print('olá')\n"
+
+
+@pytest.fixture
+def user_site(tmp_path):
+    """An environment whose user site-packages has pt_br_codec.pth."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONUSERBASE=str(tmp_path / "base"))
+    directory = subprocess.run(
+        [sys.executable, "-c", "import site; print(site.getusersitepackages())"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    os.makedirs(directory)
+    with open(os.path.join(ROOT, codec.PTH_FILE)) as source:
+        contents = source.read()
+    with open(os.path.join(directory, codec.PTH_FILE), "w") as target:
+        target.write(contents)
+    return env
+
+
+class TestCodec:
+    """Test the codec functions."""
+
+    def test_decode(self):
+        """Test that decoding translates the source."""
+        assert codec.decode(SOURCE.encode("utf-8")) == (
+            TRANSLATED,
+            len(SOURCE.encode("utf-8")),
+        )
+
+    def test_incremental_decode(self):
+        """Test decoding line by line, like Python reads a script."""
+        codec.register()
+        stream = io.TextIOWrapper(
+            io.BytesIO(SOURCE.encode("utf-8")), encoding="pt_br", newline=""
+        )
+        assert stream.readline() == "# -*- coding: pt_br -*-\n"
+        assert stream.read() == "if True:\n    print('olá')\n"
+
+    def test_encode(self):
+        """Test that encoding is plain UTF-8."""
+        codec.register()
+        assert codecs.encode(SOURCE, "pt_br") == SOURCE.encode("utf-8")
+
+    def test_search_function(self):
+        """Test the names the search function answers to."""
+        assert codec.search_function("pt_br").name == "pt_br"
+        assert codec.search_function("PT-BR").name == "pt_br"
+        assert codec.search_function("utf-8") is None
+
+    def test_register(self):
+        """Test registering the codec in this interpreter."""
+        codec.register()
+        codec.register()
+        assert codecs.lookup("pt-br").name == "pt_br"
+
+    def test_pth_file_matches(self):
+        """Test that the shipped .pth file is PTH_LINE."""
+        with open(os.path.join(ROOT, codec.PTH_FILE)) as f:
+            assert f.read() == codec.PTH_LINE + "\n"
+
+
+class TestCookie:
+    """Test source_encoding(), declares_codec() and declare_utf8()."""
+
+    def test_declares_codec(self):
+        """Test the cookies that name the codec."""
+        assert codec.declares_codec(b"# -*- coding: pt_br -*-\n")
+        assert codec.declares_codec(b"#!/usr/bin/env python\n# coding=PT-BR\n")
+        assert codec.declares_codec(codecs.BOM_UTF8 + b"# coding: pt_br\n")
+        assert not codec.declares_codec(b"# coding: utf-8\n")
+        assert not codec.declares_codec(b"x = 1\n# coding: pt_br\n")
+
+    @pytest.mark.parametrize("registered", [False, True])
+    def test_source_encoding(self, registered, monkeypatch):
+        """Test that the codec's files are UTF-8, registered or not."""
+        if registered:
+            codec.register()
+        else:
+            monkeypatch.setattr(codecs, "lookup", _lookup_without_codec)
+        readline = io.BytesIO(SOURCE.encode("utf-8")).readline
+        assert codec.source_encoding(readline) == ("utf-8", True)
+
+    def test_source_encoding_other_cookie(self):
+        """Test that other files are detected like tokenize does."""
+        readline = io.BytesIO(b"# coding: latin-1\nx = 1\n").readline
+        assert codec.source_encoding(readline) == ("iso-8859-1", False)
+
+    def test_declare_utf8(self):
+        """Test that the codec's cookie is replaced, and only that one."""
+        assert codec.declare_utf8(TRANSLATED).startswith("# -*- coding: utf-8 -*-\n")
+        assert codec.declare_utf8("# coding: latin-1\n") == "# coding: latin-1\n"
+
+
+def _lookup_without_codec(name, lookup=codecs.lookup):
+    if name.lower().replace("-", "_") == "pt_br":
+        raise LookupError(f"unknown encoding: {name}")
+    return lookup(name)
+
+
+class TestPthRegistration:
+    """Test the codec registered through pt_br_codec.pth."""
+
+    def test_run_script(self, user_site, tmp_path):
+        """Test 'python script.py' on a marked script."""
+        script = tmp_path / "ola.py"
+        script.write_text(SOURCE, encoding="utf-8")
+        result = subprocess.run(
+            [sys.executable, str(script)], env=user_site, capture_output=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.decode("utf-8") == "olá\n"
+
+    def test_import_marked_module(self, user_site, tmp_path):
+        """Test importing a marked module and caching its bytecode."""
+        (tmp_path / "modulo.py").write_text(
+            "# coding: pt_br\nfuncao f():\n    retorna nulo\n", encoding="utf-8"
+        )
+        env = dict(user_site, PYTHONDONTWRITEBYTECODE="")
+        result = subprocess.run(
+            [sys.executable, "-c", "import modulo; print(modulo.f())"],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "None\n"
+        pyc = f"modulo.{sys.implementation.cache_tag}.pyc"
+        assert (tmp_path / "__pycache__" / pyc).exists()
+
+    def test_no_cost_without_marked_files(self, user_site):
+        """Test that the .pth does not import pt_br at startup."""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys; print('pt_br' in sys.modules)"],
+            env=user_site,
+            capture_output=True,
+            text=True,
+        )
+        assert result.stdout == "False\n"
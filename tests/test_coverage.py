@@ -18,6 +18,8 @@ from pt_br.mappings import (
     ALL_KEYWORDS,
     ALL_BUILTINS,
     ALL_TRANSLATIONS,
+    VocabularyMatcher,
+    get_matcher,
 )
 
 
@@ -111,6 +113,49 @@ class TestMappingsStructure:
         assert len(PT_BR_BUILTINS) >= 10  # MVP scope: 10+ functions
 
 
+class TestVocabularyMatcher:
+    """Test the compiled matcher over the whole vocabulary."""
+
+    def test_matcher_is_cached(self):
+        """Test that get_matcher() builds the matcher only once."""
+        assert get_matcher() is get_matcher()
+
+    def test_every_keyword_matched_as_word(self):
+        """Test that every keyword is found as a whole word."""
+        matcher = get_matcher()
+        for keyword in PT_BR_KEYWORDS:
+            match = matcher.search(f"x {keyword} y")
+            assert match.lastgroup == "keyword"
+            assert match.group() == keyword
+
+    def test_every_builtin_matched_at_call_site(self):
+        """Test that every built-in is found when called."""
+        matcher = get_matcher()
+        for builtin in PT_BR_BUILTINS:
+            match = matcher.search(f"x = {builtin}(y)")
+            assert match.lastgroup == "call"
+            assert match.group() == builtin
+
+    def test_builtin_without_call_not_matched(self):
+        """Test that a built-in name alone is not a call site."""
+        assert get_matcher().search("x = imprimir") is None
+
+    def test_longest_keyword_wins(self):
+        """Test that 'senao_se' is not matched as 'senao' or 'se'."""
+        matches = [m.group() for m in get_matcher().finditer("senao_se x")]
+        assert matches == ["senao_se"]
+
+    def test_partial_words_not_matched(self):
+        """Test that identifiers containing a keyword are not matched."""
+        assert get_matcher().search("para_index = meu_se + elemento") is None
+
+    def test_custom_vocabulary(self):
+        """Test building a matcher from arbitrary tables."""
+        matcher = VocabularyMatcher({"faca": "do"}, {})
+        assert matcher.search("faca x").group() == "faca"
+        assert matcher.search("x(y)") is None
+
+
 class TestTranslatorLoaderMethods:
     """Test methods of PTBRSourceLoader class."""
 
@@ -0,0 +1,172 @@
+"""Unit tests for the import hook's path classification.
+
+Tests coverage for:
+- Include/exclude roots from the environment and pyproject.toml
+- Directory classification (installation, site-packages, user code)
+- Specs returned by TranslatorFinder, shadowing and the miss cache
+"""
+
+import os
+import sys
+
+import pytest
+
+from pt_br.hook import TranslatorFinder, load_roots
+from pt_br.translator import PTBRSourceLoader
+
+
+@pytest.fixture
+def finder(monkeypatch, tmp_path):
+    """A finder with default roots and no environment configuration."""
+    monkeypatch.delenv("PT_BR_INCLUDE", raising=False)
+    monkeypatch.delenv("PT_BR_EXCLUDE", raising=False)
+    finder = TranslatorFinder()
+    finder._roots = load_roots(str(tmp_path))
+    return finder
+
+
+@pytest.fixture
+def search_path(monkeypatch):
+    """Run with a temporary sys.path and fresh import caches."""
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    yield sys.path
+    sys.path_importer_cache.clear()
+
+
+class TestLoadRoots:
+    """Test reading the include and exclude roots."""
+
+    def test_defaults_exclude_installation(self, finder):
+        """Test that the Python installation is always excluded."""
+        _, exclude = finder._roots
+        assert os.path.abspath(sys.prefix) in exclude
+
+    def test_environment(self, monkeypatch, tmp_path):
+        """Test roots from PT_BR_INCLUDE and PT_BR_EXCLUDE."""
+        monkeypatch.setenv("PT_BR_INCLUDE", str(tmp_path / "a"))
+        monkeypatch.setenv(
+            "PT_BR_EXCLUDE", os.pathsep.join([str(tmp_path / "b"), str(tmp_path / "c")])
+        )
+        include, exclude = load_roots(str(tmp_path))
+        assert include == [str(tmp_path / "a")]
+        assert str(tmp_path / "b") in exclude
+        assert str(tmp_path / "c") in exclude
+
+    def test_pyproject(self, monkeypatch, tmp_path):
+        """Test roots from [tool.pt_br], relative to the pyproject.toml."""
+        pytest.importorskip("tomllib")
+        monkeypatch.delenv("PT_BR_INCLUDE", raising=False)
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.pt_br]\ninclude = ["src"]\nexclude = ["src/gerado"]\n'
+        )
+        (tmp_path / "src").mkdir()
+        include, exclude = load_roots(str(tmp_path / "src"))
+        assert include == [str(tmp_path / "src")]
+        assert str(tmp_path / "src" / "gerado") in exclude
+
+    def test_pyproject_without_toml_parser(self, monkeypatch, tmp_path):
+        """Test that [tool.pt_br] is not ignored silently without a parser."""
+        monkeypatch.delenv("PT_BR_INCLUDE", raising=False)
+        monkeypatch.setitem(sys.modules, "tomllib", None)
+        monkeypatch.setitem(sys.modules, "tomli", None)
+        (tmp_path / "pyproject.toml").write_text('[tool.pt_br]\ninclude = ["src"]\n')
+        with pytest.warns(RuntimeWarning, match="tomli"):
+            include, _ = load_roots(str(tmp_path))
+        assert include == []
+
+    def test_pyproject_without_section(self, monkeypatch, tmp_path):
+        """Test that a pyproject.toml without [tool.pt_br] adds nothing."""
+        monkeypatch.delenv("PT_BR_INCLUDE", raising=False)
+        (tmp_path / "pyproject.toml").write_text('[project]\nname = "x"\n')
+        include, _ = load_roots(str(tmp_path))
+        assert include == []
+
+
+class TestClassification:
+    """Test which directories are translated."""
+
+    def test_user_code_translated(self, finder, tmp_path):
+        """Test that an ordinary directory is translated."""
+        assert finder.translatable(str(tmp_path))
+
+    def test_installation_not_translated(self, finder):
+        """Test that the standard library directory is not translated."""
+        assert not finder.translatable(os.path.dirname(os.__file__))
+
+    def test_site_packages_not_translated(self, finder, tmp_path):
+        """Test that site-packages outside the installation is excluded."""
+        venv = tmp_path / "venv" / "lib" / "site-packages"
+        assert not finder.translatable(str(venv))
+
+    def test_longest_root_wins(self, finder, tmp_path):
+        """Test an include root inside an exclude root."""
+        finder._roots = ([str(tmp_path / "a" / "b")], [str(tmp_path / "a")])
+        assert not finder.translatable(str(tmp_path / "a"))
+        assert finder.translatable(str(tmp_path / "a" / "b" / "c"))
+
+    def test_include_roots_are_exclusive(self, finder, tmp_path):
+        """Test that with include roots, other directories are skipped."""
+        finder._roots = ([str(tmp_path / "src")], [])
+        assert finder.translatable(str(tmp_path / "src"))
+        assert not finder.translatable(str(tmp_path / "scripts"))
+
+    def test_cached(self, finder, tmp_path):
+        """Test that classifications are cached until invalidated."""
+        finder.translatable(str(tmp_path))
+        finder._roots = ([], [str(tmp_path)])
+        assert finder.translatable(str(tmp_path))
+        finder.invalidate_caches()
+        assert finder._directories == {}
+
+
+class TestFindSpec:
+    """Test the specs returned by the finder."""
+
+    def test_user_module(self, finder, search_path, tmp_path):
+        """Test that a module in user code gets the pt-BR loader."""
+        (tmp_path / "modulo_usuario.py").write_text("imprimir(1)\n")
+        search_path.insert(0, str(tmp_path))
+        spec = finder.find_spec("modulo_usuario", None)
+        assert isinstance(spec.loader, PTBRSourceLoader)
+
+    def test_excluded_module(self, finder, search_path, tmp_path):
+        """Test that a module in an excluded directory is left alone."""
+        (tmp_path / "modulo_excluido.py").write_text("x = 1\n")
+        search_path.insert(0, str(tmp_path))
+        finder._roots = ([], [str(tmp_path)])
+        assert finder.find_spec("modulo_excluido", None) is None
+
+    def test_shadowed_module(self, finder, search_path, tmp_path):
+        """Test that an excluded module earlier on sys.path wins."""
+        for name in ("instalado", "usuario"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "modulo_sombra.py").write_text("x = 1\n")
+        search_path[:0] = [str(tmp_path / "instalado"), str(tmp_path / "usuario")]
+        finder._roots = ([], [str(tmp_path / "instalado")])
+        assert finder.find_spec("modulo_sombra", None) is None
+
+    def test_stdlib_submodule(self, finder):
+        """Test that submodules of standard library packages are skipped."""
+        if not sys.version_info >= (3, 10):
+            pytest.skip("needs sys.stdlib_module_names")
+        assert finder.find_spec("xml.dom", None) is None
+
+    def test_misses_cached(self, finder, search_path, tmp_path):
+        """Test that a missing module is remembered until invalidated."""
+        search_path.insert(0, str(tmp_path))
+        assert finder.find_spec("modulo_ausente", None) is None
+        assert "modulo_ausente" in finder._misses
+
+        (tmp_path / "modulo_ausente.py").write_text("x = 1\n")
+        assert finder.find_spec("modulo_ausente", None) is None
+        finder.invalidate_caches()
+        sys.path_importer_cache.clear()
+        finder._roots = load_roots(str(tmp_path))
+        assert finder.find_spec("modulo_ausente", None) is not None
+
+    def test_sys_path_change_clears_misses(self, finder, search_path, tmp_path):
+        """Test that changing sys.path forgets the misses."""
+        assert finder.find_spec("modulo_novo", None) is None
+        (tmp_path / "modulo_novo.py").write_text("x = 1\n")
+        search_path.insert(0, str(tmp_path))
+        assert finder.find_spec("modulo_novo", None) is not None
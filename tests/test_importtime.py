@@ -0,0 +1,90 @@
+"""Unit tests for the PT_BR_IMPORTTIME tree.
+
+Tests coverage for:
+- Row format of the tree (stable columns, indentation by nesting)
+- Tracing the pt-BR modules of a real import
+"""
+
+import os
+import subprocess
+import sys
+
+from pt_br.importtime import PHASES, _Node, format_tree, header
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_traced(directory, code):
+    """Run code with PT_BR_IMPORTTIME=1 and return (stdout, tree lines)."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PT_BR_IMPORTTIME="1")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    lines = [
+        line
+        for line in result.stderr.splitlines()
+        if line.startswith("pt_br importtime:")
+    ]
+    return result.stdout, lines
+
+
+def columns(line):
+    """Split a tree row into (self times, cumulative times, module)."""
+    own, total, name = line[len("pt_br importtime:") :].split(" | ")
+    return [int(v) for v in own.split()], [int(v) for v in total.split()], name
+
+
+class TestFormat:
+    """Test the rows of the tree."""
+
+    def test_rows(self):
+        """Test self and cumulative columns and the indentation."""
+        parent = _Node("app", 0.000010)
+        parent.times["exec"] = 0.000005
+        child = _Node("app.util", 0.000002)
+        child.times["translate"] = 0.000030
+        parent.children.append(child)
+
+        lines = format_tree(parent)
+        assert columns(lines[0]) == ([10, 0, 0, 0, 5], [12, 0, 30, 0, 5], "app")
+        assert columns(lines[1]) == ([2, 0, 30, 0, 0], [2, 0, 30, 0, 0], "  app.util")
+
+    def test_header_aligned(self):
+        """Test that the header columns line up with the rows."""
+        row = format_tree(_Node("app", 0.0))[0]
+        assert len(header()) == len(row) - len("app") + len("module")
+        assert header().split(" | ")[0].split()[2:] == list(PHASES)
+
+
+class TestTracing:
+    """Test the tree printed for real imports."""
+
+    def test_nested_imports(self, tmp_path):
+        """Test that every pt-BR module is a row, nested by importer."""
+        package = tmp_path / "app"
+        package.mkdir()
+        (package / "__init__.py").write_text("from . import util\nimport json\n")
+        (package / "util.py").write_text(
+            "import plano\nfuncao f():\n    retorna verdadeiro\n"
+        )
+        (tmp_path / "plano.py").write_text("y = 1\n")
+
+        stdout, lines = run_traced(tmp_path, "import pt_br, app\nprint(app.util.f())")
+        assert stdout == "True\n"
+        assert lines[0] == header()
+        names = [columns(line)[2] for line in lines[1:]]
+        assert names == ["app", "  app.util", "    plano"]
+
+        own, total, _ = columns(lines[2])
+        assert own[PHASES.index("translate")] > 0
+        assert all(t >= o for o, t in zip(own, total))
+
+    def test_silent_without_pt_br_modules(self, tmp_path):
+        """Test that only imports through the pt-BR loader are printed."""
+        _, lines = run_traced(tmp_path, "import pt_br, json")
+        assert lines == []
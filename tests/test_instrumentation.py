@@ -0,0 +1,181 @@
+"""Unit tests for the runtime counters.
+
+Tests coverage for:
+- stats() snapshots and reset_stats()
+- Counting translations, reads, compiles, cache use and finder decisions
+- Dumping the counters at exit with PT_BR_STATS
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pt_br
+from pt_br import instrumentation
+from pt_br.hook import TranslatorFinder
+from pt_br.translator import PTBRSourceLoader, translate_source, translate_stream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    """Start every test with zeroed counters."""
+    instrumentation.reset_stats()
+    yield
+    instrumentation.reset_stats()
+
+
+class TestStats:
+    """Test the snapshot and reset functions."""
+
+    def test_public_api(self):
+        """Test that stats() and reset_stats() are exported by pt_br."""
+        assert pt_br.stats is instrumentation.stats
+        assert pt_br.reset_stats is instrumentation.reset_stats
+
+    def test_sections(self):
+        """Test the sections of a snapshot."""
+        assert set(pt_br.stats()) == {"read", "translate", "compile", "cache", "finder"}
+        assert pt_br.stats()["translate"]["replacements"] == {}
+
+    def test_snapshot_is_a_copy(self):
+        """Test that later updates do not change a snapshot."""
+        snapshot = pt_br.stats()
+        translate_source("imprimir(1)\n")
+        assert snapshot["translate"]["calls"] == 0
+        assert snapshot["translate"]["replacements"] == {}
+
+    def test_reset(self):
+        """Test that reset_stats() zeroes every counter."""
+        translate_source("se verdadeiro:\n    imprimir(1)\n")
+        pt_br.reset_stats()
+        snapshot = pt_br.stats()
+        assert snapshot["translate"]["calls"] == 0
+        assert snapshot["translate"]["seconds"] == 0.0
+        assert snapshot["translate"]["replacements"] == {}
+
+
+class TestCounters:
+    """Test what the package counts."""
+
+    def test_translate(self):
+        """Test translation calls, sizes and per-word counts."""
+        source = "se nao verdadeiro:\n    imprimir('olá')\nimprimir(1)\n"
+        translated = translate_source(source)
+        counters = pt_br.stats()["translate"]
+        assert counters["calls"] == 1
+        assert counters["bytes_in"] == len(source.encode("utf-8"))
+        assert counters["bytes_out"] == len(translated.encode("utf-8"))
+        assert counters["seconds"] > 0
+        assert counters["replacements"] == {
+            "se": 1,
+            "nao": 1,
+            "verdadeiro": 1,
+            "imprimir": 2,
+        }
+
+    def test_stream_counted_like_source(self):
+        """Test that streamed chunks count calls and words together."""
+        chunks = list(translate_stream(["se x:\n", "    imprimir(1)\n"]))
+        counters = pt_br.stats()["translate"]
+        assert counters["calls"] == len(chunks) == 2
+        assert counters["bytes_out"] == len("".join(chunks))
+        assert counters["replacements"] == {"se": 1, "imprimir": 1}
+
+    def test_cache_hit_not_counted(self):
+        """Test that a translation cache hit is not counted as a translation."""
+        pt_br.enable_translation_cache()
+        try:
+            translate_source("imprimir(1)\n")
+            translate_source("imprimir(1)\n")
+        finally:
+            pt_br.disable_translation_cache()
+        counters = pt_br.stats()["translate"]
+        assert counters["calls"] == 1
+        assert counters["replacements"] == {"imprimir": 1}
+
+    def test_words_in_strings_not_counted(self):
+        """Test that untranslated words are not counted."""
+        translate_source("x = 'se nao'  # imprimir\n")
+        assert pt_br.stats()["translate"]["replacements"] == {}
+
+    def test_import(self, tmp_path, monkeypatch):
+        """Test the counters of importing a pt-BR module and its cache."""
+        monkeypatch.setattr(sys, "dont_write_bytecode", False)
+        path = tmp_path / "modulo_contado.py"
+        path.write_text("funcao f():\n    retorna verdadeiro\n", encoding="utf-8")
+
+        loader = PTBRSourceLoader("modulo_contado", str(path))
+        loader.get_code("modulo_contado")
+        snapshot = pt_br.stats()
+        assert snapshot["read"]["files"] == 1
+        assert snapshot["read"]["bytes"] == path.stat().st_size
+        assert snapshot["compile"]["calls"] == 1
+        assert snapshot["cache"] == {"hits": 0, "misses": 1, "writes": 1, "plain": 0}
+
+        loader.get_code("modulo_contado")
+        snapshot = pt_br.stats()
+        assert snapshot["read"]["files"] == 1
+        assert snapshot["cache"]["hits"] == 1
+
+    def test_plain_module(self, tmp_path, monkeypatch):
+        """Test that a plain-Python marker found is counted."""
+        monkeypatch.setattr(sys, "dont_write_bytecode", False)
+        path = tmp_path / "modulo_simples.py"
+        path.write_text("x = 1\n", encoding="utf-8")
+
+        loader = PTBRSourceLoader("modulo_simples", str(path))
+        loader.get_code("modulo_simples")
+        loader.get_code("modulo_simples")
+        assert pt_br.stats()["cache"]["plain"] == 1
+
+    def test_finder_decisions(self, tmp_path, monkeypatch):
+        """Test the translated, skipped and delegated counts."""
+        monkeypatch.setattr(sys, "path", [str(tmp_path)] + sys.path)
+        (tmp_path / "modulo_achado.py").write_text("x = 1\n")
+        finder = TranslatorFinder()
+        try:
+            assert finder.find_spec("modulo_achado", None) is not None
+            assert finder.find_spec("json", None) is None
+            assert finder.find_spec("modulo_inexistente", None) is None
+            assert finder.find_spec("modulo_inexistente", None) is None
+        finally:
+            sys.path_importer_cache.clear()
+        assert pt_br.stats()["finder"] == {
+            "translated": 1,
+            "skipped": 2,
+            "delegated": 1,
+        }
+
+
+class TestDump:
+    """Test writing the counters at exit."""
+
+    def test_pt_br_stats(self, tmp_path):
+        """Test that PT_BR_STATS writes a JSON snapshot at exit."""
+        (tmp_path / "modulo.py").write_text("imprimir(comprimento('abc'))\n")
+        output = tmp_path / "stats-{pid}.json"
+        env = dict(os.environ, PYTHONPATH=ROOT, PT_BR_STATS=str(output))
+        result = subprocess.run(
+            [sys.executable, "-c", "import pt_br, modulo"],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "3\n"
+
+        (path,) = tmp_path.glob("stats-*.json")
+        assert path.name != "stats-{pid}.json"
+        with open(path) as f:
+            snapshot = json.load(f)
+        assert snapshot["finder"]["translated"] == 1
+        assert snapshot["translate"]["replacements"] == {
+            "imprimir": 1,
+            "comprimento": 1,
+        }
@@ -0,0 +1,88 @@
+"""Unit tests for the lazy package import.
+
+Tests coverage for:
+- 'import pt_br' not importing the translator or heavy stdlib modules
+- Public API names loaded on first access
+- Submodules reachable as attributes
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pt_br
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    """Run code in a fresh interpreter and return its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+class TestLazyImport:
+    """Test the cost and behavior of 'import pt_br'."""
+
+    def test_heavy_modules_not_imported(self):
+        """Test that importing pt_br leaves the translator unloaded."""
+        output = run_python(
+            "import sys\n"
+            "before = set(sys.modules)\n"
+            "import pt_br\n"
+            "print(sorted(set(sys.modules) - before))\n"
+        )
+        loaded = eval(output)
+        for name in ("re", "typing", "tokenize", "importlib.abc", "pt_br.translator"):
+            assert name not in loaded
+
+    def test_hook_registered(self):
+        """Test that the import hook is installed without loading the API."""
+        output = run_python(
+            "import sys, pt_br\n"
+            "print(type(sys.meta_path[0]).__name__, 'pt_br.translator' in sys.modules)\n"
+        )
+        assert output.split() == ["TranslatorFinder", "False"]
+
+    def test_register_translator_idempotent(self):
+        """Test that registering twice installs a single finder."""
+        from pt_br.hook import TranslatorFinder, register_translator
+
+        register_translator()
+        register_translator()
+        assert sum(isinstance(f, TranslatorFinder) for f in sys.meta_path) == 1
+
+    def test_api_loaded_on_access(self):
+        """Test that public names resolve to the submodule objects."""
+        from pt_br import translator, mappings
+
+        assert pt_br.translate_source is translator.translate_source
+        assert pt_br.PT_BR_KEYWORDS is mappings.PT_BR_KEYWORDS
+
+    def test_star_import(self):
+        """Test that 'from pt_br import *' gives every public name."""
+        namespace = {}
+        exec("from pt_br import *", namespace)
+        assert set(pt_br.__all__) <= set(namespace)
+
+    def test_submodule_attribute(self):
+        """Test that submodules are reachable as attributes."""
+        output = run_python("import pt_br\nprint(pt_br.cache.cache_tag() is not None)\n")
+        assert output.strip() == "True"
+
+    def test_unknown_attribute(self):
+        """Test that unknown names raise AttributeError."""
+        with pytest.raises(AttributeError):
+            pt_br.nao_existe
+
+    def test_dir_lists_public_api(self):
+        """Test that dir() includes names that are not loaded yet."""
+        assert set(pt_br.__all__) <= set(dir(pt_br))
@@ -0,0 +1,213 @@
+"""Unit tests for running a pt-BR main script with 'python script.py'.
+
+Tests coverage for:
+- The rest of the script running translated, exactly once
+- Code before 'import pt_br' not running again
+- Exit codes and exceptions of the script
+- Plain Python scripts left alone, marked, and without the translator
+- Threads started by the script importing pt_br
+- multiprocessing 'spawn' pools in scripts run with 'python -m pt_br'
+- The bytecode cache of the rest of the script
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_script(path, *args, **env):
+    """Run a script in a fresh interpreter and return the result."""
+    environ = dict(os.environ, PYTHONPATH=ROOT)
+    environ.update(env)
+    return subprocess.run(
+        [sys.executable, *args, str(path)],
+        env=environ,
+        capture_output=True,
+        text=True,
+    )
+
+
+class TestMainScriptHook:
+    """Test the translation of the main script after 'import pt_br'."""
+
+    def test_runs_once(self, tmp_path):
+        """Test that the script's output appears once."""
+        script = tmp_path / "ola.py"
+        script.write_text(
+            'import pt_br\nimprimir("oi")\nimprimir(comprimento([1]))\n'
+        )
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "oi\n1\n"
+
+    def test_code_before_import_not_repeated(self, tmp_path):
+        """Test that statements before the import run only once."""
+        script = tmp_path / "antes.py"
+        script.write_text('print("antes")\nimport pt_br\nimprimir("depois")\n')
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "antes\ndepois\n"
+
+    def test_import_on_shared_line(self, tmp_path):
+        """Test an import sharing its line with other statements."""
+        script = tmp_path / "linha.py"
+        script.write_text('print("a"); import pt_br; imprimir("b")\nimprimir("c")\n')
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "a\nb\nc\n"
+
+    def test_exit_code(self, tmp_path):
+        """Test that the script's exit code is kept."""
+        script = tmp_path / "sair.py"
+        script.write_text("import pt_br\nimport sys\nimprimir(1)\nsys.exit(3)\n")
+        result = run_script(script)
+        assert result.returncode == 3
+        assert result.stdout == "1\n"
+
+    def test_exception_propagates(self, tmp_path):
+        """Test that an exception in the script ends it with a traceback."""
+        script = tmp_path / "erro.py"
+        script.write_text('import pt_br\nimprimir(1)\nraise ValueError("falhou")\n')
+        result = run_script(script)
+        assert result.returncode == 1
+        assert result.stdout == "1\n"
+        assert "ValueError: falhou" in result.stderr
+        assert str(script) in result.stderr
+
+    def test_plain_python_untouched(self, tmp_path):
+        """Test that a script without pt-BR code runs normally."""
+        script = tmp_path / "python.py"
+        script.write_text('import pt_br\nprint("imprimir")  # imprimir\n')
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "imprimir\n"
+        assert not list(tmp_path.glob("__pycache__/*.main*.pyc"))
+
+    def test_plain_python_without_translator(self, tmp_path):
+        """Test that a script with no pt-BR word skips the translator."""
+        script = tmp_path / "leve.py"
+        script.write_text(
+            "import pt_br\nimport sys\n"
+            'print("pt_br.translator" in sys.modules, "pt_br.cache" in sys.modules)\n'
+        )
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "False False\n"
+
+    def test_plain_python_marked(self, tmp_path):
+        """Test that a plain script is marked, then not scanned again."""
+        script = tmp_path / "marcado.py"
+        script.write_text(
+            'import pt_br\nimport sys\nprint("pt_br.translator" in sys.modules)  # se\n'
+        )
+        env = {"PYTHONDONTWRITEBYTECODE": ""}
+
+        first = run_script(script, **env)
+        assert first.stdout == "True\n", first.stderr
+        assert len(list(tmp_path.glob("__pycache__/marcado.*.plain"))) == 1
+
+        second = run_script(script, **env)
+        assert second.stdout == "False\n", second.stderr
+
+    def test_thread_imports_pt_br(self, tmp_path):
+        """Test that a thread importing pt_br does not wait for the script."""
+        script = tmp_path / "fios.py"
+        script.write_text(
+            "import pt_br\nimport threading\n"
+            "def f():\n    import pt_br\n    imprimir('fio')\n"
+            "t = threading.Thread(target=f)\nt.start()\nt.join()\nimprimir('fim')\n"
+        )
+        result = subprocess.run(
+            [sys.executable, str(script)],
+            env=dict(os.environ, PYTHONPATH=ROOT),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "fio\nfim\n"
+
+    def test_coding_comment_is_not_a_cookie(self, tmp_path):
+        """Test that a comment mentioning coding and pt-br is not the codec."""
+        script = tmp_path / "curso.py"
+        script.write_text(
+            "# coding notes: this file is pt-br course material\n"
+            'import pt_br\nimprimir("oi")\n'
+        )
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "oi\n"
+
+    def test_import_inside_function_ignored(self, tmp_path):
+        """Test that an import that is not top-level code is left alone."""
+        script = tmp_path / "funcao.py"
+        script.write_text('def f():\n    import pt_br\nf()\nprint("fim")\n')
+        result = run_script(script)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "fim\n"
+
+    def test_rest_is_cached(self, tmp_path):
+        """Test that the rest of the script is cached and reused."""
+        script = tmp_path / "cache.py"
+        script.write_text('import pt_br\nimprimir("oi")\n')
+        env = {"PYTHONDONTWRITEBYTECODE": ""}
+
+        first = run_script(script, **env)
+        assert first.returncode == 0, first.stderr
+        cached = list(tmp_path.glob("__pycache__/cache.*.main1.pyc"))
+        assert len(cached) == 1
+
+        second = run_script(script, **env)
+        assert second.stdout == "oi\n"
+
+    def test_module_runner_not_hooked(self, tmp_path):
+        """Test that 'python -m pt_br' runs the script only once."""
+        script = tmp_path / "modulo.py"
+        script.write_text('import pt_br\nse verdadeiro:\n    imprimir("uma vez")\n')
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", str(script)],
+            env=dict(os.environ, PYTHONPATH=ROOT),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "uma vez\n"
+
+    def test_module_runner_syntax_error(self, tmp_path):
+        """Test that 'python -m pt_br' reports only the script's syntax error."""
+        script = tmp_path / "quebrado.py"
+        script.write_text("se (verdadeiro:\n    imprimir(1)\n")
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", str(script)],
+            env=dict(os.environ, PYTHONPATH=ROOT),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 1
+        assert "SyntaxError" in result.stderr
+        assert "se (verdadeiro:" in result.stderr
+        assert os.path.join("pt_br", "translator.py") not in result.stderr
+        assert "Traceback" not in result.stderr
+
+    def test_module_runner_spawn_pool(self, tmp_path):
+        """Test that 'spawn' workers can load functions of the script."""
+        script = tmp_path / "piscina.py"
+        script.write_text(
+            "import multiprocessing\n"
+            "funcao dobro(x):\n"
+            "    retorna x * 2\n"
+            "se __name__ == '__main__':\n"
+            "    with multiprocessing.get_context('spawn').Pool(2) as pool:\n"
+            "        imprimir(pool.map(dobro, [1, 2, 3]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", str(script)],
+            env=dict(os.environ, PYTHONPATH=ROOT),
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "[2, 4, 6]\n"
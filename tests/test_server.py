@@ -0,0 +1,242 @@
+"""Unit tests for the pre-fork server (pt_br.server) and the pt-br client.
+
+Tests coverage for:
+- Encoding and decoding requests
+- Running scripts through the server: argv, stdio, cwd, environment
+- Exit codes and signals
+- Falling back to running locally
+- Refusing socket directories and servers of other users
+"""
+
+import importlib.machinery
+import importlib.util
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from pt_br import server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "pt-br")
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not hasattr(server.socket, "AF_UNIX"),
+    reason="the server needs fork() and Unix sockets",
+)
+
+SCRIPT = """import os
+import sys
+
+imprimir("args:", sys.argv[1:])
+imprimir("cwd:", os.getcwd())
+imprimir("env:", os.environ.get("PT_BR_TESTE"))
+imprimir("lido:", entrada())
+sys.exit(int(sys.argv[1]))
+"""
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """A short socket path (Unix socket paths are limited in length)."""
+    return str(tmp_path / "s.sock")
+
+
+@pytest.fixture
+def env(socket_path):
+    """Environment pointing the launcher at the test server."""
+    return dict(os.environ, PYTHONPATH=ROOT, PT_BR_SERVER_SOCKET=socket_path)
+
+
+@pytest.fixture
+def running_server(env, socket_path):
+    """A 'pt-br --servidor' process listening on socket_path."""
+    process = subprocess.Popen(
+        [sys.executable, LAUNCHER, "--servidor"],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout.readline().startswith("Listening on")
+    yield process
+    process.terminate()
+    process.wait(timeout=10)
+
+
+@pytest.fixture
+def script(tmp_path):
+    """A pt-BR script that reports what it received."""
+    path = tmp_path / "roteiro.py"
+    path.write_text(SCRIPT, encoding="utf-8")
+    return str(path)
+
+
+def run_launcher(script, env, *args, cwd=None):
+    return subprocess.run(
+        [sys.executable, LAUNCHER, script, *args],
+        env=dict(env, PT_BR_TESTE="sim"),
+        input="linha\n",
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        timeout=30,
+    )
+
+
+class TestRequestEncoding:
+    """Test encode_request() and decode_request()."""
+
+    def test_round_trip(self):
+        """Test that a request survives encoding."""
+        payload = server.encode_request(
+            "/tmp", ["a.py", "x y", ""], {"A": "1", "B": "c=d"}
+        )
+        assert server.decode_request(payload) == (
+            "/tmp",
+            ["a.py", "x y", ""],
+            {"A": "1", "B": "c=d"},
+        )
+
+    def test_socket_path_override(self, monkeypatch):
+        """Test that PT_BR_SERVER_SOCKET sets the socket path."""
+        monkeypatch.setenv("PT_BR_SERVER_SOCKET", "/tmp/outro.sock")
+        assert server.socket_path() == "/tmp/outro.sock"
+
+
+class TestServer:
+    """Test running scripts through 'pt-br --servidor'."""
+
+    def test_script_runs_in_server_child(self, running_server, script, env, tmp_path):
+        """Test that argv, stdio, cwd, environment and exit code are forwarded."""
+        result = run_launcher(script, env, "3", "b", cwd=str(tmp_path))
+
+        assert result.returncode == 3, result.stderr
+        assert result.stdout.splitlines() == [
+            "args: ['3', 'b']",
+            f"cwd: {tmp_path}",
+            "env: sim",
+            "lido: linha",
+        ]
+
+    def test_uses_server(self, running_server, script, env):
+        """Test that the script runs in a process forked from the server."""
+        path = os.path.join(os.path.dirname(script), "pai.py")
+        with open(path, "w") as f:
+            f.write("import os\nimprimir(os.getppid())\n")
+        result = run_launcher(path, env)
+        assert result.stdout.strip() == str(running_server.pid)
+
+    def test_errors_reach_client_stderr(self, running_server, tmp_path, env):
+        """Test that a traceback is written to the client's stderr."""
+        path = tmp_path / "erro.py"
+        path.write_text("levantar ValueError('ruim')\n")
+        result = run_launcher(str(path), env)
+        assert result.returncode == 1
+        assert "ValueError" in result.stderr
+
+    def test_killed_script(self, running_server, tmp_path, env):
+        """Test that a script killed by a signal exits with 128 + signal."""
+        path = tmp_path / "morto.py"
+        path.write_text("import os, signal\nos.kill(os.getpid(), signal.SIGKILL)\n")
+        result = run_launcher(str(path), env)
+        assert result.returncode == 128 + signal.SIGKILL
+
+    def test_second_server_refused(self, running_server, socket_path):
+        """Test that a second server does not steal a live socket."""
+        with pytest.raises(OSError):
+            server.serve(socket_path)
+
+    def test_script_shuts_down_normally(self, running_server, tmp_path, env):
+        """Test that atexit handlers run and non-daemon threads finish."""
+        path = tmp_path / "fim.py"
+        path.write_text(
+            "import atexit, threading, time\n"
+            "funcao fim():\n    imprimir('atexit')\n"
+            "funcao fio():\n    time.sleep(0.2)\n    imprimir('fio')\n"
+            "atexit.register(fim)\n"
+            "threading.Thread(target=fio).start()\n"
+        )
+        result = run_launcher(str(path), env)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["fio", "atexit"]
+
+    def test_socket_removed_on_exit(self, running_server, socket_path):
+        """Test that stopping the server removes its socket."""
+        running_server.terminate()
+        running_server.wait(timeout=10)
+        assert not os.path.exists(socket_path)
+
+
+class TestLocalFallback:
+    """Test the launcher without a server."""
+
+    def test_no_server(self, script, env, tmp_path):
+        """Test that the launcher runs the script itself when no server runs."""
+        result = run_launcher(script, env, "0")
+        assert result.returncode == 0, result.stderr
+        assert "lido: linha" in result.stdout
+
+    def test_stale_socket(self, script, env, socket_path):
+        """Test that a socket file without a server is ignored."""
+        stale = server.socket.socket(server.socket.AF_UNIX)
+        stale.bind(socket_path)
+        stale.close()
+        result = run_launcher(script, env, "2")
+        assert result.returncode == 2
+        assert "lido: linha" in result.stdout
+
+    def test_disabled(self, running_server, script, env):
+        """Test that PT_BR_SERVER=0 bypasses a running server."""
+        path = os.path.join(os.path.dirname(script), "pai.py")
+        with open(path, "w") as f:
+            f.write("import os\nimprimir(os.getppid())\n")
+        result = run_launcher(path, dict(env, PT_BR_SERVER="0"))
+        assert result.stdout.strip() != str(running_server.pid)
+
+
+class TestPrivateSocket:
+    """Test that the socket is only shared with the user running it."""
+
+    def test_directory_created_private(self, tmp_path):
+        """Test that a new directory gets mode 0700."""
+        path = str(tmp_path / "pt_br-1")
+        server.make_private_dir(path)
+        assert os.stat(path).st_mode & 0o777 == 0o700
+
+    def test_open_directory_refused(self, tmp_path):
+        """Test that an existing directory others can use is refused."""
+        path = tmp_path / "pt_br-1"
+        path.mkdir(mode=0o777)
+        path.chmod(0o777)
+        with pytest.raises(OSError, match="0700"):
+            server.make_private_dir(str(path))
+
+    def test_symlink_refused(self, tmp_path):
+        """Test that a symlink to a private directory is refused."""
+        (tmp_path / "real").mkdir(mode=0o700)
+        os.symlink(tmp_path / "real", tmp_path / "pt_br-1")
+        with pytest.raises(OSError, match="not a directory"):
+            server.make_private_dir(str(tmp_path / "pt_br-1"))
+
+    def test_default_directory_checked(self, tmp_path, monkeypatch):
+        """Test that serve() refuses an unsafe default socket directory."""
+        monkeypatch.delenv("PT_BR_SERVER_SOCKET", raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        directory = tmp_path / f"pt_br-{os.getuid()}"
+        directory.mkdir()
+        directory.chmod(0o755)
+        with pytest.raises(OSError, match="0700"):
+            server.serve()
+
+    def test_other_user_server_ignored(self, running_server, socket_path, monkeypatch):
+        """Test that the client sends nothing to another user's server."""
+        loader = importlib.machinery.SourceFileLoader("pt_br_launcher", LAUNCHER)
+        spec = importlib.util.spec_from_loader("pt_br_launcher", loader)
+        launcher = importlib.util.module_from_spec(spec)
+        loader.exec_module(launcher)
+
+        monkeypatch.setenv("PT_BR_SERVER_SOCKET", socket_path)
+        monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+        assert launcher.run_on_server(["nenhum.py"]) is None
@@ -0,0 +1,152 @@
+"""Unit tests for incremental retranslation (pt_br.session).
+
+Tests coverage for:
+- Edits inside a single logical line
+- Edits that change how lines are grouped
+- The edit reported on the translation
+- Consistency with a full retranslation
+"""
+
+import random
+
+import pytest
+
+from pt_br import session as session_module
+from pt_br.session import TranslationSession
+from pt_br.translator import translate_source
+
+
+SOURCE = (
+    "funcao dobro(x):\n"
+    "    retorna x * 2\n"
+    "\n"
+    "para i em intervalo(3):\n"
+    "    imprimir(dobro(i))\n"
+)
+
+
+class TestTranslationSession:
+    """Test TranslationSession."""
+
+    def test_initial_translation(self):
+        """Test that a new session holds the full translation."""
+        session = TranslationSession(SOURCE)
+        assert session.source == SOURCE
+        assert session.translation == translate_source(SOURCE)
+
+    def test_edit_keyword(self):
+        """Test typing a keyword in place of a name."""
+        session = TranslationSession("x = a\n")
+        session.edit(4, 1, "nao a")
+        assert session.translation == "x = not a\n"
+
+    def test_edit_returns_translation_edit(self):
+        """Test that the returned edit patches the previous translation."""
+        session = TranslationSession(SOURCE)
+        before = session.translation
+        offset = SOURCE.index("para")
+
+        t_offset, t_removed, t_inserted = session.edit(offset, 4, "enquanto")
+
+        patched = before[:t_offset] + t_inserted + before[t_offset + t_removed :]
+        assert patched == session.translation
+        assert "while i in range(3):" in session.translation
+
+    def test_edit_only_touches_edited_line(self):
+        """Test that the reported edit stays inside the edited line."""
+        session = TranslationSession(SOURCE)
+        offset = SOURCE.index("x * 2")
+        t_offset, t_removed, t_inserted = session.edit(offset, 1, "y")
+        assert (t_removed, t_inserted) == (1, "y")
+        assert session.translation.index("y * 2") == t_offset
+
+    def test_opening_triple_quote_swallows_following_lines(self):
+        """Test that an unclosed string protects the lines after it."""
+        session = TranslationSession("x = 1\nse y:\n    passar\n")
+        session.edit(4, 1, '"""')
+        assert session.translation == 'x = """\nse y:\n    passar\n'
+
+        session.edit(len(session.source), 0, '"""\nse z: passar\n')
+        assert session.translation.endswith('"""\nif z: passar\n')
+
+    def test_opening_bracket_joins_lines(self):
+        """Test that a call split over lines by an edit is translated."""
+        session = TranslationSession("x = imprimir\n(1)\n")
+        session.edit(4, 0, "(")
+        session.edit(len(session.source) - 1, 0, ")")
+        assert session.translation == "x = (imprimir\n(1))\n"
+        session.edit(5, 8, "tamanho")
+        assert session.translation == translate_source(session.source)
+
+    def test_joining_lines(self):
+        """Test deleting a line break between two logical lines."""
+        session = TranslationSession("se x:\nnao y\n")
+        session.edit(5, 1, " ")
+        assert session.translation == "if x: not y\n"
+
+    def test_edit_at_end_without_newline(self):
+        """Test appending to a source that does not end with a newline."""
+        session = TranslationSession("x = nao")
+        session.edit(7, 0, " y")
+        assert session.translation == "x = not y"
+
+    def test_empty_session(self):
+        """Test editing an empty source."""
+        session = TranslationSession()
+        session.edit(0, 0, "imprimir(1)\n")
+        assert session.translation == "print(1)\n"
+
+    def test_reset(self):
+        """Test replacing the whole source."""
+        session = TranslationSession(SOURCE)
+        session.reset("se x: imprimir(1)\n")
+        assert session.translation == "if x: print(1)\n"
+
+    def test_edit_outside_source(self):
+        """Test that an edit past the end is rejected."""
+        session = TranslationSession("x = 1\n")
+        with pytest.raises(ValueError):
+            session.edit(5, 3, "")
+
+    def test_random_edits_match_full_translation(self):
+        """Test that many random edits agree with translating from scratch."""
+        rng = random.Random(7)
+        pieces = ["(", ")", '"""', "'", "\n", "se ", "nao ", "imprimir(", "#", "x", "["]
+        session = TranslationSession(SOURCE)
+        source = SOURCE
+        translation = session.translation
+
+        for _ in range(200):
+            offset = rng.randint(0, len(source))
+            removed = rng.randint(0, min(3, len(source) - offset))
+            inserted = rng.choice(pieces)
+            t_offset, t_removed, t_inserted = session.edit(offset, removed, inserted)
+            source = source[:offset] + inserted + source[offset + removed :]
+            translation = (
+                translation[:t_offset] + t_inserted + translation[t_offset + t_removed :]
+            )
+
+            fresh = TranslationSession(source)
+            assert session.source == source
+            assert session.translation == fresh.translation == translation
+
+    def test_groups_follow_edits(self, monkeypatch):
+        """Test that chunk groups stay consistent through random edits."""
+        monkeypatch.setattr(session_module, "_GROUP_SIZE", 2)
+        rng = random.Random(11)
+        pieces = ["\n", "(", ")", "se x:\n", "nao ", "y\n\n"]
+        session = TranslationSession(SOURCE * 4)
+        source = session.source
+
+        for _ in range(300):
+            offset = rng.randint(0, len(source))
+            removed = rng.randint(0, min(12, len(source) - offset))
+            inserted = rng.choice(pieces) if rng.random() < 0.7 else ""
+            session.edit(offset, removed, inserted)
+            source = source[:offset] + inserted + source[offset + removed :]
+
+            assert session.translation == TranslationSession(source).translation
+            assert sum(session._group_sizes) == len(session._source_chunks)
+            assert sum(session._group_source_lengths) == len(source)
+            assert sum(session._group_translated_lengths) == len(session.translation)
+            assert all(session._group_sizes)
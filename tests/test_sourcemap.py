@@ -0,0 +1,165 @@
+"""Unit tests for pt_br.sourcemap.
+
+Tests coverage for:
+- Mapping translated columns back to pt-BR columns
+- Lazy registration of translated files
+- Tracebacks and SyntaxErrors rendered with pt-BR columns
+"""
+
+import glob
+import io
+import os
+import subprocess
+import sys
+import tokenize
+
+import pytest
+
+from pt_br import sourcemap
+from pt_br.sourcemap import SourceMap
+from pt_br.translator import PTBRSourceLoader, _iter_replacements, translate_source
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build(source):
+    """Build the SourceMap of a source."""
+    return SourceMap.from_replacements(source, _iter_replacements(source))
+
+
+def name_columns(source):
+    """Get (line, UTF-8 column) of every NAME token of a source."""
+    lines = io.StringIO(source, newline="").readlines()
+    columns = []
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.NAME:
+            row, column = token.start
+            prefix = lines[row - 1][:column]
+            columns.append((row, len(prefix.encode("utf-8")), token.string))
+    return columns
+
+
+class TestSourceMap:
+    """Test the column mapping."""
+
+    def test_column_after_replacement(self):
+        """Test a column shifted by a shorter replacement."""
+        source_map = build("funcao f(a):\n    retorna a\n")
+        # 'def f(a):' -> 'funcao f(a):'
+        assert source_map.original_column(1, 4) == 7
+        # '    return a' -> '    retorna a'
+        assert source_map.original_column(2, 11) == 12
+
+    def test_column_before_replacement(self):
+        """Test that columns before the first replacement are unchanged."""
+        source_map = build("x = nao y\n")
+        assert source_map.original_column(1, 2) == 2
+
+    def test_column_inside_replacement(self):
+        """Test that columns inside a replaced word stay inside it."""
+        source_map = build("funcao f(): pass\n")
+        assert source_map.original_column(1, 0) == 0
+        assert source_map.original_column(1, 2) == 2
+        assert source_map.original_column(1, 3) == 6
+
+    def test_unchanged_line(self):
+        """Test that lines without replacements are not stored."""
+        source_map = build("x = 1\nse x: pass\n")
+        assert list(source_map.rows) == [2]
+        assert source_map.original_column(1, 4) == 4
+
+    def test_non_ascii_line(self):
+        """Test that columns are UTF-8 byte offsets."""
+        source_map = build("s = 'olá' ; funcao f(): pass\n")
+        translated_f = len("s = 'olá' ; def ".encode("utf-8"))
+        original_f = len("s = 'olá' ; funcao ".encode("utf-8"))
+        assert source_map.original_column(1, translated_f) == original_f
+
+    @pytest.mark.parametrize(
+        "path", sorted(glob.glob(os.path.join(ROOT, "examples", "*.py")))
+    )
+    def test_names_line_up(self, path):
+        """Test every name of the examples maps back to its pt-BR column."""
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        source_map = build(source)
+        original = name_columns(source)
+        translated = name_columns(translate_source(source))
+        assert len(original) == len(translated)
+        for (row, column, _), (_, translated_column, _) in zip(original, translated):
+            assert source_map.original_column(row, translated_column) == column
+
+    def test_fstring_fields(self):
+        """Test replacements inside f-string fields."""
+        source = 'x = f"{a se b senao c}" + y\n'
+        source_map = build(source)
+        translated = translate_source(source)
+        column = source_map.original_column(1, translated.index("y"))
+        assert column == source.index("y")
+
+
+class TestRegistry:
+    """Test the registration of translated files."""
+
+    def test_map_built_lazily(self, tmp_path):
+        """Test that loading a module registers it without building a map."""
+        path = tmp_path / "modulo_mapa.py"
+        path.write_text("funcao f():\n    retorna 1\n")
+        PTBRSourceLoader("modulo_mapa", str(path)).get_code("modulo_mapa")
+
+        assert str(path) in sourcemap._registry
+        assert sourcemap._registry[str(path)] is None
+        assert sourcemap.get_source_map(str(path)).original_column(1, 4) == 7
+        assert sourcemap._registry[str(path)] is not None
+
+    def test_unregistered_file(self):
+        """Test that files that were not translated have no map."""
+        assert sourcemap.get_source_map(__file__) is None
+
+
+def run_pt_br(script):
+    """Run a script with 'python -m pt_br' and return its stderr lines."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pt_br", str(script)],
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1
+    return result.stderr.splitlines()
+
+
+class TestErrorRendering:
+    """Test tracebacks and SyntaxErrors of translated code."""
+
+    @pytest.mark.skipif(sys.version_info < (3, 11), reason="needs 3.11 carets")
+    def test_traceback_carets(self, tmp_path):
+        """Test that the ^^^ markers point at the pt-BR expression."""
+        script = tmp_path / "erro.py"
+        script.write_text("se nao falso ou verdadeiro: imprimir(comprimento(nulo))\n")
+        lines = run_pt_br(script)
+        index = next(i for i, line in enumerate(lines) if "comprimento(nulo)" in line)
+        assert lines[index + 1].index("^") == lines[index].index("comprimento")
+        assert lines[index + 1].rstrip().endswith("^")
+        assert len(lines[index + 1].strip()) == len("comprimento(nulo)")
+
+    def test_syntax_error(self, tmp_path):
+        """Test that a SyntaxError shows the pt-BR line and column."""
+        script = tmp_path / "sintaxe.py"
+        script.write_text("funcao f(a, b):\n    retorna a +* b\n")
+        lines = run_pt_br(script)
+        index = next(i for i, line in enumerate(lines) if "retorna a +* b" in line)
+        assert lines[index + 1].index("^") == lines[index].index("*")
+        assert lines[-1].startswith("SyntaxError")
+
+    def test_format_exception_without_maps(self):
+        """Test that other exceptions are formatted as usual."""
+        import traceback
+
+        try:
+            raise ValueError("falhou")
+        except ValueError as error:
+            expected = traceback.format_exception(
+                type(error), error, error.__traceback__
+            )
+            assert sourcemap.format_exception(error) == expected
@@ -0,0 +1,179 @@
+"""Unit tests for the persistent translation store (pt_br.store).
+
+Tests coverage for:
+- Reading and writing translations
+- Rows of other mapping tables, and pruning old and unused rows
+- Concurrent writers in several processes
+- Integration with translate_source() and PT_BR_STORE
+"""
+
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from pt_br import store
+from pt_br.translator import translate_source
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Path of a fresh store file."""
+    return str(tmp_path / "translations.sqlite3")
+
+
+@pytest.fixture
+def active_store(store_path):
+    """Enable the store for one test."""
+    yield store.enable_translation_store(store_path)
+    store.disable_translation_store()
+
+
+class TestTranslationStore:
+    """Test TranslationStore on its own."""
+
+    def test_put_and_get(self, store_path):
+        """Test that a stored translation can be read back."""
+        translation_store = store.TranslationStore(store_path)
+        translation_store.put("se x: pass", "if x: pass")
+        assert translation_store.get("se x: pass") == "if x: pass"
+
+    def test_miss_returns_none(self, store_path):
+        """Test that an unknown source is a miss."""
+        assert store.TranslationStore(store_path).get("x = 1") is None
+
+    def test_shared_between_instances(self, store_path):
+        """Test that a second connection sees the first one's writes."""
+        store.TranslationStore(store_path).put("nao x", "not x")
+        assert store.TranslationStore(store_path).get("nao x") == "not x"
+
+    def test_other_mapping_rows_kept(self, store_path, monkeypatch):
+        """Test that rows of other mapping tables are invisible but kept."""
+        monkeypatch.setattr(store.cache, "mapping_hash", lambda: "antigo")
+        store.TranslationStore(store_path).put("nao x", "not x")
+
+        monkeypatch.setattr(store.cache, "mapping_hash", lambda: "novo")
+        translation_store = store.TranslationStore(store_path)
+        assert translation_store.get("nao x") is None
+        assert len(translation_store) == 0
+
+        monkeypatch.setattr(store.cache, "mapping_hash", lambda: "antigo")
+        assert store.TranslationStore(store_path).get("nao x") == "not x"
+
+    def test_pruned_once_per_interval(self, store_path, monkeypatch):
+        """Test that opening a store that was just pruned does not prune."""
+        store.TranslationStore(store_path)
+
+        def fail(self):
+            raise AssertionError("pruned again")
+
+        monkeypatch.setattr(store.TranslationStore, "prune", fail)
+        store.TranslationStore(store_path)
+
+        monkeypatch.setattr(store, "PRUNE_INTERVAL", 0.0)
+        with pytest.raises(AssertionError):
+            store.TranslationStore(store_path)
+
+    def test_prune_old_rows(self, store_path):
+        """Test that prune() deletes rows unused for max_age seconds."""
+        translation_store = store.TranslationStore(store_path, max_age=60)
+        translation_store.put("nao x", "not x")
+        translation_store.put("nao y", "not y")
+        connection = sqlite3.connect(store_path)
+        with connection:
+            connection.execute(
+                "UPDATE translations SET used = used - 120"
+                " WHERE translated = 'not x'"
+            )
+        connection.close()
+        assert translation_store.prune() == 1
+        assert translation_store.get("nao x") is None
+        assert translation_store.get("nao y") == "not y"
+
+    def test_prune_least_recently_used(self, store_path, monkeypatch):
+        """Test that prune() keeps the max_entries most recently used rows."""
+        clock = iter(range(1000, 2000, 10))
+        monkeypatch.setattr(store.time, "time", lambda: float(next(clock)))
+        monkeypatch.setattr(store, "TOUCH_INTERVAL", 0.0)
+        translation_store = store.TranslationStore(store_path, max_entries=2)
+        for n in range(3):
+            translation_store.put(f"nao x{n}", f"not x{n}")
+        assert translation_store.get("nao x0") == "not x0"
+        assert translation_store.prune() == 1
+        assert translation_store.get("nao x1") is None
+        assert translation_store.get("nao x0") == "not x0"
+
+    def test_older_layout_replaced(self, store_path):
+        """Test that a store file with the old table layout is emptied."""
+        connection = sqlite3.connect(store_path)
+        with connection:
+            connection.execute(
+                "CREATE TABLE translations (source_hash BLOB, mapping_hash TEXT,"
+                " translated TEXT, created REAL)"
+            )
+            connection.execute(
+                "INSERT INTO translations VALUES (x'00', 'h', 'x', 0)"
+            )
+        connection.close()
+        translation_store = store.TranslationStore(store_path)
+        translation_store.put("nao x", "not x")
+        assert translation_store.get("nao x") == "not x"
+
+    def test_clear(self, store_path):
+        """Test that clear() empties the store."""
+        translation_store = store.TranslationStore(store_path)
+        translation_store.put("nao x", "not x")
+        translation_store.clear()
+        assert len(translation_store) == 0
+
+    def test_default_path_honours_cache_dir(self, tmp_path, monkeypatch):
+        """Test that PT_BR_CACHE_DIR moves the default store."""
+        monkeypatch.setenv("PT_BR_CACHE_DIR", str(tmp_path))
+        assert store.default_store_path() == str(tmp_path / store.STORE_FILENAME)
+
+    def test_concurrent_writers(self, store_path):
+        """Test several processes writing to the same store at once."""
+        script = (
+            "import sys\n"
+            "from pt_br.store import TranslationStore\n"
+            "s = TranslationStore(sys.argv[1])\n"
+            "for i in range(50):\n"
+            "    s.put(f'x = {i} # {sys.argv[2]}', f'x = {i}')\n"
+        )
+        workers = [
+            subprocess.Popen([sys.executable, "-c", script, store_path, str(n)])
+            for n in range(4)
+        ]
+        assert all(worker.wait(timeout=60) == 0 for worker in workers)
+        assert len(store.TranslationStore(store_path)) == 200
+
+
+class TestStoreIntegration:
+    """Test translate_source() with the store enabled."""
+
+    def test_translation_written_to_store(self, active_store):
+        """Test that translate_source() fills the store."""
+        translate_source("para i em x: pass")
+        assert active_store.get("para i em x: pass") == "for i in x: pass"
+
+    def test_translation_read_from_store(self, active_store):
+        """Test that translate_source() reuses stored translations."""
+        active_store.put("se x: pass", "if x: pass  # do store")
+        assert translate_source("se x: pass") == "if x: pass  # do store"
+
+    def test_enabled_from_environment(self, store_path, monkeypatch):
+        """Test that PT_BR_STORE opens the store on first use."""
+        monkeypatch.setenv("PT_BR_STORE", store_path)
+        monkeypatch.setattr(store, "_translation_store", False)
+        try:
+            translation_store = store.get_translation_store()
+            assert translation_store.path == store_path
+        finally:
+            store.disable_translation_store()
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that the store stays off without PT_BR_STORE."""
+        monkeypatch.delenv("PT_BR_STORE", raising=False)
+        monkeypatch.setattr(store, "_translation_store", False)
+        assert store.get_translation_store() is None
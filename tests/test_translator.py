@@ -6,10 +6,21 @@ Tests the translate_source() function with various input scenarios:
 - Multiple translations in one line
 - Context detection (strings, comments, f-strings)
 - Edge cases (variable names, nested structures)
+- Reverse translation (untranslate_source)
 """
 
+import io
+import subprocess
+import sys
+
 import pytest
-from pt_br.translator import translate_source
+from pt_br.translator import (
+    needs_translation,
+    translate_file,
+    translate_source,
+    translate_stream,
+    untranslate_source,
+)
 
 
 class TestBasicKeywords:
@@ -545,3 +556,208 @@ para i em intervalo(5):
         assert "import pt_br" in result
         assert "for i in range(5):" in result
         assert "print(i)" in result
+
+
+class TestSinglePassEngine:
+    """Test the tokenizer-driven translation engine."""
+
+    def test_keywords_inside_fstring_fields(self):
+        """Test that keywords inside f-string fields are translated."""
+        source = 'x = f"{a se b senao c}"'
+        result = translate_source(source)
+        assert result == 'x = f"{a if b else c}"'
+
+    def test_fstring_format_spec_not_translated(self):
+        """Test that format specs and conversions are left untouched."""
+        source = 'x = f"{valor:e} {soma(lst)!r}"'
+        result = translate_source(source)
+        assert result == 'x = f"{valor:e} {sum(lst)!r}"'
+
+    def test_triple_quoted_string_protected(self):
+        """Test that triple-quoted strings spanning lines are not translated."""
+        source = 's = """\npara sempre\n"""\npara i em x:\n    pass'
+        result = translate_source(source)
+        assert '"""\npara sempre\n"""' in result
+        assert "for i in x:" in result
+
+    def test_inconsistent_indentation_still_translated(self):
+        """Test that bad indentation does not stop translation."""
+        source = "se x:\n        y = 1\n    senao:\n  z = nao y"
+        result = translate_source(source)
+        assert result == "if x:\n        y = 1\n    else:\n  z = not y"
+
+    def test_builtin_call_requires_adjacent_paren(self):
+        """Test that built-ins are translated only when directly called."""
+        source = "x = imprimir\ny = imprimir (1)\nimprimir(2)"
+        result = translate_source(source)
+        assert result == "x = imprimir\ny = imprimir (1)\nprint(2)"
+
+    def test_crlf_line_endings_preserved(self):
+        """Test that Windows line endings survive translation."""
+        source = "se x:\r\n    imprimir(x)\r\n"
+        result = translate_source(source)
+        assert result == "if x:\r\n    print(x)\r\n"
+
+    def test_large_source_matches_small_source(self):
+        """Test that translating a repeated block scales without drift."""
+        block = "para i em intervalo(3):\n    imprimir(i)\n"
+        result = translate_source(block * 2000)
+        assert result == "for i in range(3):\n    print(i)\n" * 2000
+
+
+class TestNeedsTranslation:
+    """Test the plain-Python pre-scan."""
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "",
+            "x = 1\nprint(x)\n",
+            "s = 'se x em lista'  # para cada\n",
+            "imprimir = print\nx = soma\n",
+            'f"{x!r:e}"\n',
+            '"""\npara i em x:\n"""\n',
+        ],
+    )
+    def test_plain_python(self, source):
+        """Test sources that translate_source() leaves unchanged."""
+        assert not needs_translation(source)
+        assert translate_source(source) == source
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "se x:\n    pass\n",
+            "x = 1\nimprimir(x)\n",
+            'x = f"{a se b senao c}"\n',
+            "s = 'ok'\ny = 'aberta\nz = nao y\n",
+        ],
+    )
+    def test_pt_br(self, source):
+        """Test sources with something to translate."""
+        assert needs_translation(source)
+        assert translate_source(source) != source
+
+
+class TestStreamingTranslation:
+    """Test translate_stream() and translate_file()."""
+
+    def stream(self, source):
+        return "".join(translate_stream(io.StringIO(source, newline="")))
+
+    def test_matches_translate_source(self):
+        """Test that streaming gives the same result as translate_source."""
+        source = (
+            "funcao f(x):\n"
+            "    s = \"\"\"\n    se nao\n\"\"\"\n"
+            "    retorna (x e\n            nao y)\n"
+            "imprimir(f\"{a se b senao c}\")  # para sempre\n"
+        )
+        assert self.stream(source) == translate_source(source)
+
+    def test_yields_logical_lines(self):
+        """Test that multi-line constructs are kept in a single chunk."""
+        source = "x = [1,\n     2]\nse x:\n    passar\n"
+        chunks = list(translate_stream(io.StringIO(source)))
+        assert chunks == ["x = [1,\n     2]\n", "if x:\n", "    passar\n"]
+
+    def test_builtin_call_split_over_lines(self):
+        """Test that a call whose parenthesis is on the next line is not split."""
+        source = "x = (imprimir\n(1))\nimprimir(2)\n"
+        assert self.stream(source) == translate_source(source)
+
+    def test_malformed_line_does_not_stop_stream(self):
+        """Test that lines after an unterminated string are still translated."""
+        source = "x = 'abc\nse y:\n    retorna nao z\n"
+        assert self.stream(source) == "x = 'abc\nif y:\n    return not z\n"
+
+    def test_is_lazy(self):
+        """Test that output is produced before the input is exhausted."""
+        consumed = []
+
+        def lines():
+            for line in ["se x:\n", "    imprimir(x)\n", "senao:\n"]:
+                consumed.append(line)
+                yield line
+
+        stream = translate_stream(lines())
+        assert next(stream) == "if x:\n"
+        assert len(consumed) == 1
+
+    def test_translate_file(self, tmp_path):
+        """Test translating a file with its own encoding into a stream."""
+        path = tmp_path / "entrada.py"
+        path.write_bytes("# coding: latin-1\nse x: imprimir('ol\u00e1')\r\n".encode("latin-1"))
+        out = io.StringIO(newline="")
+        translate_file(str(path), out)
+        assert out.getvalue() == "# coding: latin-1\nif x: print('ol\u00e1')\r\n"
+
+    def test_translate_file_codec_cookie(self, tmp_path):
+        """Test a file declaring the pt_br codec: translated once, as UTF-8."""
+        from pt_br import codec
+
+        codec.register()
+        path = tmp_path / "marcado.py"
+        path.write_text("# coding: pt_br\nse x: imprimir('ol\u00e1')\n", "utf-8")
+        out = io.StringIO(newline="")
+        translate_file(str(path), out)
+        assert out.getvalue() == "# coding: utf-8\nif x: print('ol\u00e1')\n"
+
+    def test_cli_stdin(self):
+        """Test 'python -m pt_br -' in a pipeline."""
+        result = subprocess.run(
+            [sys.executable, "-m", "pt_br", "-"],
+            input="para i em intervalo(3):\n    imprimir(i)\n",
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "for i in range(3):\n    print(i)\n"
+
+
+class TestUntranslateSource:
+    """Test translating Python back to pt-BR."""
+
+    def test_keywords_and_calls(self):
+        """Test that keywords and built-in calls are translated."""
+        source = "def f(x):\n    if x is None and not y:\n        return len(x)\n"
+        assert untranslate_source(source) == (
+            "funcao f(x):\n    se x is nulo e nao y:\n        retorna comprimento(x)\n"
+        )
+
+    def test_builtins_only_at_call_sites(self):
+        """Test that built-in names that are not called stay in Python."""
+        source = "isinstance(x, str) and print(str(x), list)\n"
+        assert untranslate_source(source) == (
+            "eh_instancia(x, str) e imprimir(texto(x), list)\n"
+        )
+
+    def test_literals_untouched(self):
+        """Test that strings and comments keep their Python words."""
+        source = "x = 'if not True'  # for x in range\ny = f'{x if x else None}'\n"
+        assert untranslate_source(source) == (
+            "x = 'if not True'  # for x in range\n"
+            "y = f'{x se x senao nulo}'\n"
+        )
+
+    def test_round_trip(self):
+        """Test that translate_source() gives back the original code."""
+        source = (
+            "class A:\n"
+            "    def run(self, items):\n"
+            "        for i, item in enumerate(sorted(items)):\n"
+            "            while i or item:\n"
+            "                break\n"
+            "        return {k: max(v) for k, v in zip(items, items)}\n"
+        )
+        assert translate_source(untranslate_source(source)) == source
+
+    def test_pt_br_names_rejected(self):
+        """Test that code using pt-BR words as names is refused."""
+        source = "try:\n    pass\nexcept OSError as e:\n    lista(e)\n"
+        with pytest.raises(ValueError, match="'e' \\(line 3\\).*'lista' \\(line 4\\)"):
+            untranslate_source(source)
+
+    def test_pt_br_builtin_name_not_called(self):
+        """Test that a pt-BR built-in name that is not called is allowed."""
+        assert untranslate_source("lista = [1]\n") == "lista = [1]\n"
@@ -5,16 +5,23 @@ Tests the context detection functions and safe replacement utilities:
 - Comment detection
 - Word boundary detection
 - Safe word and function replacement
+- Span index (string/comment intervals)
+- Counting the pt-BR words of a source
 """
 
+import sys
+
 import pytest
 from pt_br.utils import (
     is_inside_string,
     is_inside_comment,
     is_word_boundary,
+    SpanIndex,
+    build_span_index,
     safe_replace_word,
     safe_replace_function,
     debug_show_translation,
+    analyze_translations,
     count_translations,
 )
 
@@ -73,6 +80,64 @@ class TestStringDetection:
         assert is_inside_string(source, 100) is False
 
 
+class TestSpanIndex:
+    """Test SpanIndex and the precomputed string/comment spans."""
+
+    def test_triple_quoted_string_spans_lines(self):
+        """Test that triple-quoted strings cover every line they span."""
+        source = 'x = """\npara\n"""\ny = 1'
+        assert is_inside_string(source, source.index("para")) is True
+        assert is_inside_string(source, source.index("y =")) is False
+
+    def test_quote_inside_triple_quoted_string(self):
+        """Test that a lone quote does not end a triple-quoted string."""
+        source = "x = '''it's''' + para"
+        assert is_inside_string(source, source.index("s'''")) is True
+        assert is_inside_string(source, source.index("para")) is False
+
+    def test_fstring_field_is_code(self):
+        """Test that f-string replacement fields are not string content."""
+        source = 'f"texto {soma(x)} fim"'
+        assert is_inside_string(source, source.index("texto")) is True
+        assert is_inside_string(source, source.index("soma")) is False
+        assert is_inside_string(source, source.index("fim")) is True
+
+    def test_string_nested_in_fstring_field(self):
+        """Test that strings nested in a field are still strings."""
+        source = "f\"{d['para']}\""
+        assert is_inside_string(source, source.index("para")) is True
+
+    def test_fstring_format_spec_is_string(self):
+        """Test that a format spec is string content."""
+        source = 'f"{valor:e}"'
+        assert is_inside_string(source, source.index("e}")) is True
+
+    def test_hash_after_string_is_comment(self):
+        """Test that a '#' following a string starts a comment."""
+        source = 'x = "#"  # para'
+        assert is_inside_comment(source, source.index("para")) is True
+        assert is_inside_comment(source, source.index("#")) is False
+
+    def test_kind_at(self):
+        """Test kind_at() reports strings, comments and code."""
+        index = SpanIndex('x = "a"  # b')
+        assert index.kind_at(5) == SpanIndex.STRING
+        assert index.kind_at(11) == SpanIndex.COMMENT
+        assert index.kind_at(0) is None
+
+    def test_index_reused_for_same_source(self):
+        """Test that the index is built once per source."""
+        source = "x = 1  # comentario"
+        assert build_span_index(source) is build_span_index(source)
+
+    def test_cache_does_not_keep_sources(self):
+        """Test that caching an index takes no reference to the source."""
+        source = "".join(["x = 1  # comentario", "!" * 10])
+        before = sys.getrefcount(source)
+        build_span_index(source)
+        assert sys.getrefcount(source) == before
+
+
 class TestCommentDetection:
     """Test is_inside_comment() function."""
 
@@ -325,9 +390,47 @@ class TestCountTranslations:
         assert functions == 0
 
     def test_count_ignores_strings(self):
-        """Test that count is based on pattern, not avoiding strings."""
-        # Note: count_translations doesn't avoid strings, it's a rough estimate
-        source = 'x = "para sempre"'
+        """Test that words in strings and comments are not counted."""
+        source = 'x = "para sempre"  # imprimir(x)\nimprimir(x)'
         keywords, functions = count_translations(source)
-        # This will count "para" even in string (rough estimate)
-        assert keywords >= 1
+        assert keywords == 0
+        assert functions == 1
+
+    def test_count_builtins_at_call_sites(self):
+        """Test that built-in names only count when called."""
+        keywords, functions = count_translations("x = soma\ny = soma([1])")
+        assert (keywords, functions) == (0, 1)
+
+
+class TestAnalyzeTranslations:
+    """Test analyze_translations() utility function."""
+
+    def test_terms_and_kinds(self):
+        """Test per-term counts and the keyword/builtin split."""
+        counts = analyze_translations(
+            "se x e y:\n    imprimir(x)\nse nao y:\n    imprimir(y)\n"
+        )
+        assert counts.terms == {"se": 2, "e": 1, "imprimir": 2, "nao": 1}
+        assert counts.keywords == 4
+        assert counts.builtins == 2
+
+    def test_positions(self):
+        """Test (line, column) positions of every replacement."""
+        source = "x = 1\r\nse x:\n    imprimir(f'{x se x senao 0}')\n"
+        counts = analyze_translations(source)
+        assert counts.positions == {
+            "se": [(2, 0), (3, 18)],
+            "imprimir": [(3, 4)],
+            "senao": [(3, 23)],
+        }
+
+    def test_fstring_fields_counted(self):
+        """Test that code in f-string replacement fields counts."""
+        counts = analyze_translations("x = f'se {comprimento(y)}'\n")
+        assert counts.terms == {"comprimento": 1}
+
+    def test_no_translations(self):
+        """Test a source without pt-BR code."""
+        counts = analyze_translations("x = 'se nao'\n")
+        assert (counts.keywords, counts.builtins, counts.terms) == (0, 0, {})
+        assert counts.positions == {}
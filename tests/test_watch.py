@@ -0,0 +1,193 @@
+"""Unit tests for watch mode (pt_br.watch).
+
+Tests coverage for:
+- Compiling files into the pt-BR bytecode cache
+- Refreshing and removing outputs of changed files
+- Change detection with polling and inotify
+- Debouncing bursts of saves
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from pt_br import cache, watch
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A small pt-BR source tree."""
+    src = tmp_path / "src"
+    (src / "pacote").mkdir(parents=True)
+    (src / "principal.py").write_text("imprimir(1)\n")
+    (src / "pacote" / "util.py").write_text("funcao f():\n    retorna nao 1\n")
+    return src
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll a condition until it holds or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class TestCompileFile:
+    """Test compile_file()."""
+
+    def test_writes_bytecode(self, tree):
+        """Test that the pt-BR bytecode cache file is written."""
+        path = str(tree / "principal.py")
+        assert watch.compile_file(path) is True
+        assert os.path.exists(cache.bytecode_path(path))
+
+    def test_up_to_date_file_skipped(self, tree):
+        """Test that a current cache file is not rewritten."""
+        path = str(tree / "principal.py")
+        watch.compile_file(path)
+        assert watch.compile_file(path) is False
+
+    def test_writes_even_without_bytecode(self, tree, monkeypatch):
+        """Test that sys.dont_write_bytecode does not stop the watcher."""
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+        path = str(tree / "principal.py")
+        assert watch.compile_file(path) is True
+
+    def test_plain_file_marked(self, tree):
+        """Test that a plain-Python file gets a marker, not pt-BR bytecode."""
+        path = tree / "simples.py"
+        path.write_text("x = 1\n")
+        assert watch.compile_file(str(path)) is True
+        assert os.path.exists(cache.plain_marker_path(str(path)))
+        assert not os.path.exists(cache.bytecode_path(str(path)))
+        assert watch.compile_file(str(path)) is False
+
+    def test_syntax_error(self, tree):
+        """Test that invalid code raises SyntaxError."""
+        path = tree / "ruim.py"
+        path.write_text("se se se\n")
+        with pytest.raises(SyntaxError):
+            watch.compile_file(str(path))
+
+
+class TestTreeWatcher:
+    """Test TreeWatcher refreshes."""
+
+    def make(self, tree, tmp_path, **kwargs):
+        lines = []
+        watcher = watch.TreeWatcher(
+            str(tree), str(tmp_path / "dest"), log=lines.append, **kwargs
+        )
+        return watcher, lines
+
+    def test_initial_pass(self, tree, tmp_path):
+        """Test that the first pass compiles and translates everything."""
+        watcher, _ = self.make(tree, tmp_path, poll=True)
+        try:
+            assert watcher.initial_pass() == 4
+        finally:
+            watcher.close()
+        assert (tmp_path / "dest" / "principal.py").read_text() == "print(1)\n"
+        assert os.path.exists(cache.bytecode_path(str(tree / "pacote" / "util.py")))
+
+    def test_refresh_changed_file(self, tree, tmp_path):
+        """Test that a changed file is translated and compiled again."""
+        watcher, lines = self.make(tree, tmp_path, poll=True)
+        try:
+            watcher.initial_pass()
+            path = tree / "principal.py"
+            path.write_text("x = nao 1\n")
+            assert watcher.refresh([str(path)]) == 1
+        finally:
+            watcher.close()
+        assert (tmp_path / "dest" / "principal.py").read_text() == "x = not 1\n"
+        assert lines[-1].startswith("Updated: principal.py")
+
+    def test_refresh_deleted_file(self, tree, tmp_path):
+        """Test that outputs of a deleted file are removed."""
+        watcher, lines = self.make(tree, tmp_path, poll=True)
+        try:
+            watcher.initial_pass()
+            path = tree / "principal.py"
+            bytecode = cache.bytecode_path(str(path))
+            path.unlink()
+            watcher.refresh([str(path)])
+        finally:
+            watcher.close()
+        assert not (tmp_path / "dest" / "principal.py").exists()
+        assert not os.path.exists(bytecode)
+        assert lines[-1] == "Removed: principal.py"
+
+    def test_refresh_reports_errors(self, tree, tmp_path):
+        """Test that a broken file is reported and does not stop the watcher."""
+        watcher, lines = self.make(tree, tmp_path, poll=True)
+        try:
+            path = tree / "ruim.py"
+            path.write_text("se se se\n")
+            assert watcher.refresh([str(path)]) == 0
+        finally:
+            watcher.close()
+        assert lines[-1].startswith("Error: ruim.py")
+
+
+@pytest.mark.parametrize("poll", [True, False])
+class TestWatching:
+    """Test the watch loop with both change detectors."""
+
+    def test_saved_file_is_compiled(self, tree, poll):
+        """Test that saving a file refreshes its bytecode cache."""
+        if not poll and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is only available on Linux")
+        lines = []
+        watcher = watch.TreeWatcher(str(tree), poll=poll, log=lines.append)
+        if poll:
+            watcher._watcher.interval = 0.05
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        try:
+            path = tree / "pacote" / "novo.py"
+            path.write_text("imprimir(2)\n")
+            assert wait_for(lambda: os.path.exists(cache.bytecode_path(str(path))))
+        finally:
+            watcher.stop()
+            thread.join()
+            watcher.close()
+        assert lines[0].startswith("Updated: " + os.path.join("pacote", "novo.py"))
+
+    def test_burst_handled_once(self, tree, poll):
+        """Test that several quick saves lead to a single refresh."""
+        if not poll and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is only available on Linux")
+        watcher = watch.TreeWatcher(
+            str(tree), poll=poll, debounce=0.3, log=lambda line: None
+        )
+        if poll:
+            watcher._watcher.interval = 0.05
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        try:
+            path = tree / "principal.py"
+            for i in range(5):
+                path.write_text(f"imprimir({i})\n")
+                time.sleep(0.02)
+            assert wait_for(lambda: watcher.updates >= 1)
+            time.sleep(0.4)
+        finally:
+            watcher.stop()
+            thread.join()
+            watcher.close()
+        assert watcher.updates == 1
+
+
+class TestVigiarCommand:
+    """Test 'python -m pt_br vigiar'."""
+
+    def test_missing_directory(self, tmp_path, capsys):
+        """Test the error for a missing source directory."""
+        assert watch.main([str(tmp_path / "nada")]) == 1
+        assert "not found" in capsys.readouterr().out